@@ -0,0 +1,240 @@
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from wpimath.geometry import Pose3d
+
+from photonlibpy.poseCandidates import (
+    compose,
+    inverse,
+    poseFromDoubles,
+    transformPoints,
+)
+
+# Side length of a 36h11 AprilTag's black border, in meters
+APRILTAG_36H11_SIZE_METERS = 0.1651
+
+# Step used for the numerical Jacobian, in meters and radians
+_JACOBIAN_STEP = 1e-6
+
+
+def tagVertices(sizeMeters: float = APRILTAG_36H11_SIZE_METERS) -> np.ndarray:
+    """Corners of a square tag in its own frame, in the order PhotonVision reports
+    detected corners in, shape (4, 3)."""
+    half = sizeMeters / 2.0
+    return np.array(
+        (
+            (0.0, -half, -half),
+            (0.0, half, -half),
+            (0.0, half, half),
+            (0.0, -half, half),
+        )
+    )
+
+
+def _exp(deltas: np.ndarray) -> np.ndarray:
+    """Small pose changes, translation then rotation vector, as poses, shape (..., 7)."""
+    rotationVectors = deltas[..., 3:]
+    angles = np.linalg.norm(rotationVectors, axis=-1, keepdims=True)
+    # sin(angle / 2) / angle, which tends to 1/2 for tiny angles
+    scale = np.where(angles > 1e-12, np.sin(angles / 2.0) / np.maximum(angles, 1e-12), 0.5)
+    return np.concatenate(
+        (deltas[..., :3], np.cos(angles / 2.0), rotationVectors * scale), axis=-1
+    )
+
+
+def _withPerturbations(pose: np.ndarray, perturbations: np.ndarray) -> np.ndarray:
+    return np.concatenate((pose[None, :], compose(pose, perturbations)))
+
+
+@dataclass
+class MultiTagSolution:
+    """The outcome of one on-RIO multi-tag solve."""
+
+    cameraPose: Pose3d
+    """The field to camera pose that best explains every tag corner"""
+
+    reprojectionError: float
+    """Root mean square distance between the detected and projected corners, in pixels"""
+
+    iterations: int
+    """Refinement steps taken"""
+
+    converged: bool
+    """Whether the refinement settled before running out of iterations or time"""
+
+    elapsedSeconds: float
+    """Time spent solving, in seconds"""
+
+
+class MultiTagSolver:
+    """
+    Finds the camera pose that best explains the detected corners of several AprilTags
+    at once, using Levenberg-Marquardt refinement of the reprojection error.
+
+    Every solve stops after a set number of iterations or a set amount of time,
+    whichever comes first, so it cannot overrun the robot loop.
+    """
+
+    def __init__(
+        self,
+        maxIterations: int = 10,
+        timeBudgetSeconds: float = 0.004,
+        tagSizeMeters: float = APRILTAG_36H11_SIZE_METERS,
+    ):
+        """
+        :param maxIterations: Most refinement steps taken in one solve.
+        :param timeBudgetSeconds: Time after which a solve stops refining and returns
+                                  the best pose found so far.
+        :param tagSizeMeters: Side length of the tags being detected.
+        """
+        self.maxIterations = maxIterations
+        self.timeBudgetSeconds = timeBudgetSeconds
+        self.tagVertices = tagVertices(tagSizeMeters)
+
+    def fieldCorners(self, tagPoses: np.ndarray) -> np.ndarray:
+        """
+        Field positions of every corner of some tags.
+
+        :param tagPoses: field pose of each tag, shape (N, 7)
+
+        :returns: the corners, tag by tag, shape (4 * N, 3)
+        """
+        return transformPoints(tagPoses[:, None, :], self.tagVertices).reshape(-1, 3)
+
+    def solve(
+        self,
+        corners: np.ndarray,
+        fieldCorners: np.ndarray,
+        cameraMatrix: np.ndarray,
+        distCoeffs: np.ndarray,
+        seeds: np.ndarray,
+    ) -> Optional[MultiTagSolution]:
+        """
+        Refine a camera pose against the detected corners of several tags.
+
+        :param corners: detected corners in pixels, shape (M, 2)
+        :param fieldCorners: field position of each detected corner, shape (M, 3)
+        :param cameraMatrix: the camera's 3x3 intrinsic matrix
+        :param distCoeffs: the camera's OpenCV distortion coefficients, up to 8
+        :param seeds: field to camera poses to start from, shape (S, 7). The one
+                      that already explains the corners best is refined.
+
+        :returns: the solution, or None if no seed sees every corner in front of it
+        """
+        start = time.perf_counter()
+        deadline = start + self.timeBudgetSeconds
+        projector = _Projector(fieldCorners, cameraMatrix, distCoeffs)
+
+        costs = projector.costs(seeds, corners)
+        if not np.isfinite(costs).any():
+            return None
+        best = int(np.argmin(costs))
+        pose = seeds[best]
+        cost = costs[best]
+
+        # Each pose is projected along with a small step along each of its axes,
+        # which gives the Jacobian there without a separate pass
+        perturbations = _exp(np.eye(6) * _JACOBIAN_STEP)
+        projections = projector.project(_withPerturbations(pose, perturbations))
+
+        damping = 1e-3
+        converged = False
+        iterations = 0
+        while iterations < self.maxIterations and time.perf_counter() < deadline:
+            iterations += 1
+
+            residuals = (projections[0] - corners).ravel()
+            jacobian = (
+                (projections[1:] - projections[0]).reshape(6, -1).T / _JACOBIAN_STEP
+            )
+            hessian = jacobian.T @ jacobian
+            gradient = jacobian.T @ residuals
+            step = np.linalg.solve(
+                hessian + damping * np.diag(np.diag(hessian) + 1e-9), -gradient
+            )
+            if np.linalg.norm(step) < 1e-8:
+                converged = True
+                break
+
+            candidate = compose(pose, _exp(step))
+            candidate[3:] /= np.linalg.norm(candidate[3:])
+            candidateProjections = projector.project(
+                _withPerturbations(candidate, perturbations)
+            )
+            candidateCost = np.sum((candidateProjections[0] - corners) ** 2)
+
+            if candidateCost < cost:
+                improvement = cost - candidateCost
+                pose, cost, projections = candidate, candidateCost, candidateProjections
+                damping = max(damping / 10.0, 1e-9)
+                if improvement < 1e-9 * (1.0 + cost):
+                    converged = True
+                    break
+            else:
+                # Also taken when the step puts a corner behind the camera, as
+                # its cost is NaN
+                damping *= 10.0
+                if damping > 1e8:
+                    # No step in any direction helps, so this is a minimum
+                    converged = True
+                    break
+
+        return MultiTagSolution(
+            cameraPose=poseFromDoubles(pose),
+            reprojectionError=float(np.sqrt(cost / len(corners))),
+            iterations=iterations,
+            converged=converged,
+            elapsedSeconds=time.perf_counter() - start,
+        )
+
+
+class _Projector:
+    """Projects field points into the image of a pinhole camera with OpenCV distortion."""
+
+    def __init__(
+        self, fieldPoints: np.ndarray, cameraMatrix: np.ndarray, distCoeffs: np.ndarray
+    ):
+        self.fieldPoints = fieldPoints
+        self.cameraMatrix = np.asarray(cameraMatrix, dtype=np.float64)
+        self.distCoeffs = np.zeros(8)
+        distCoeffs = np.asarray(distCoeffs, dtype=np.float64).ravel()[:8]
+        self.distCoeffs[: len(distCoeffs)] = distCoeffs
+        self.distorted = bool(self.distCoeffs.any())
+
+    def project(self, cameraPoses: np.ndarray) -> np.ndarray:
+        """
+        :param cameraPoses: field to camera poses, shape (S, 7)
+
+        :returns: pixel position of every point seen from each pose, shape (S, M, 2).
+                  Points behind a camera project to NaN.
+        """
+        # The camera frame has X forward, Y left and Z up, the image has x right
+        # and y down
+        local = transformPoints(inverse(cameraPoses)[:, None, :], self.fieldPoints)
+        depth = np.where(local[..., 0] > 1e-9, local[..., 0], np.nan)
+        x = -local[..., 1] / depth
+        y = -local[..., 2] / depth
+
+        if self.distorted:
+            k1, k2, p1, p2, k3, k4, k5, k6 = self.distCoeffs
+            r2 = x * x + y * y
+            radial = (1.0 + r2 * (k1 + r2 * (k2 + r2 * k3))) / (
+                1.0 + r2 * (k4 + r2 * (k5 + r2 * k6))
+            )
+            xd = x * radial + 2.0 * p1 * x * y + p2 * (r2 + 2.0 * x * x)
+            yd = y * radial + p1 * (r2 + 2.0 * y * y) + 2.0 * p2 * x * y
+        else:
+            xd, yd = x, y
+
+        k = self.cameraMatrix
+        return np.stack(
+            (k[0, 0] * xd + k[0, 1] * yd + k[0, 2], k[1, 1] * yd + k[1, 2]), axis=-1
+        )
+
+    def costs(self, cameraPoses: np.ndarray, corners: np.ndarray) -> np.ndarray:
+        """Sum of squared pixel errors from each pose, infinite when a point is
+        behind the camera, shape (S,)."""
+        errors = np.sum((self.project(cameraPoses) - corners) ** 2, axis=(1, 2))
+        return np.where(np.isnan(errors), np.inf, errors)
@@ -1,9 +1,17 @@
+import struct
 from dataclasses import dataclass, field
 from wpimath.geometry import Transform3d
 from photonlibpy.packet import Packet
 
+# Shared by every result without a pose; Transform3d is immutable
+_NO_TRANSFORM = Transform3d()
 
-@dataclass
+# Everything after the presence flag: best and alternate transforms, then the
+# best and alternate reprojection errors and the ambiguity
+_PNP_LAYOUT = struct.Struct(">7d7d3d")
+
+
+@dataclass(slots=True)
 class PNPResult:
     _NUM_BYTES_IN_FLOAT = 8
     PACK_SIZE_BYTES = 1 + (_NUM_BYTES_IN_FLOAT * 7 * 2) + (_NUM_BYTES_IN_FLOAT * 3)
@@ -18,32 +26,60 @@ class PNPResult:
     def createFromPacket(self, packet: Packet) -> Packet:
         self.isPresent = packet.decodeBoolean()
 
+        if not self.isPresent:
+            # Clear anything left over from a previous decode into this result
+            self.best = self.alt = _NO_TRANSFORM
+            self.ambiguity = self.bestReprojError = self.altReprojError = 0.0
+            return packet
+
+        values = packet.decodeStruct(_PNP_LAYOUT)
+        self.best = Packet.transformFromDoubles(values[0:7])
+        self.alt = Packet.transformFromDoubles(values[7:14])
+        self.bestReprojError, self.altReprojError, self.ambiguity = values[14:]
+        return packet
+
+    def populatePacket(self, packet: Packet) -> Packet:
+        packet.encodeBoolean(self.isPresent)
+
         if not self.isPresent:
             return packet
 
-        self.best = packet.decodeTransform()
-        self.alt = packet.decodeTransform()
-        self.bestReprojError = packet.decodeDouble()
-        self.altReprojError = packet.decodeDouble()
-        self.ambiguity = packet.decodeDouble()
+        packet.encodeStruct(
+            _PNP_LAYOUT,
+            *Packet.transformToDoubles(self.best),
+            *Packet.transformToDoubles(self.alt),
+            self.bestReprojError,
+            self.altReprojError,
+            self.ambiguity,
+        )
         return packet
 
 
-@dataclass
+@dataclass(slots=True)
 class MultiTargetPNPResult:
     _MAX_IDS = 32
     # pnpresult + MAX_IDS possible targets (arbitrary upper limit that should never be hit, ideally)
     _PACK_SIZE_BYTES = PNPResult.PACK_SIZE_BYTES + (1 * _MAX_IDS)
 
+    # The fixed table of fiducial ids, with unused slots set to -1
+    _IDS_LAYOUT = struct.Struct(f">{_MAX_IDS}h")
+
     estimatedPose: PNPResult = field(default_factory=PNPResult)
     fiducialIDsUsed: list[int] = field(default_factory=list)
 
     def createFromPacket(self, packet: Packet) -> Packet:
-        self.estimatedPose = PNPResult()
         self.estimatedPose.createFromPacket(packet)
-        self.fiducialIDsUsed = []
-        for _ in range(MultiTargetPNPResult._MAX_IDS):
-            fidId = packet.decode16()
-            if fidId >= 0:
-                self.fiducialIDsUsed.append(fidId)
-        return packet
\ No newline at end of file
+        # A new list, as a caller may still hold the one from an earlier decode
+        self.fiducialIDsUsed = [
+            fidId
+            for fidId in packet.decodeStruct(MultiTargetPNPResult._IDS_LAYOUT)
+            if fidId >= 0
+        ]
+        return packet
+
+    def populatePacket(self, packet: Packet) -> Packet:
+        self.estimatedPose.populatePacket(packet)
+        ids = self.fiducialIDsUsed[: MultiTargetPNPResult._MAX_IDS]
+        ids += [-1] * (MultiTargetPNPResult._MAX_IDS - len(ids))
+        packet.encodeStruct(MultiTargetPNPResult._IDS_LAYOUT, *ids)
+        return packet
@@ -0,0 +1,159 @@
+import threading
+from collections import deque
+from typing import Optional
+
+
+class NTTimeBase:
+    """
+    Converts NetworkTables server timestamps into robot (FPGA) time.
+
+    Every value received over NT carries the server time it was published at and the
+    local time it arrived at, both in microseconds. On the robot the local NT clock is
+    the FPGA clock.
+
+    When the local instance is the NT server, as the robot usually is, server times
+    are already on the local clock and are converted unchanged. Otherwise this class
+    follows ``local - server`` over the most recent samples, using the fastest
+    deliveries so transit jitter does not leak in, to get the clock offset and how it
+    drifts over time. The fastest delivery still took some time, so that fit is late
+    by the one-way transit. Given ntcore's own server time offset, which it measures
+    assuming half of a ping's round trip each way, the difference between the two is
+    taken as the transit and subtracted.
+    """
+
+    def __init__(self, windowSize: int = 100):
+        """
+        :param windowSize: Number of recent samples the offset and drift are fit over.
+        """
+        self._lock = threading.Lock()
+        self._samples: deque[tuple[int, int]] = deque(maxlen=windowSize)
+        self._referenceServerTime = 0
+        self._offsetMicros = 0.0
+        self._driftPerMicro = 0.0
+        self._localIsServer = False
+        self._serverTimeOffsetMicros: Optional[int] = None
+
+    def setLocalIsServer(self, localIsServer: bool) -> None:
+        """
+        :param localIsServer: whether the local NT instance is the server, so server
+                              times are already local times
+        """
+        with self._lock:
+            self._localIsServer = localIsServer
+
+    def setServerTimeOffset(self, offsetMicros: Optional[int]) -> None:
+        """
+        :param offsetMicros: ntcore's estimate of server minus local time, from
+                             NetworkTableInstance.getServerTimeOffset, or None if it
+                             has none yet
+        """
+        with self._lock:
+            self._serverTimeOffsetMicros = offsetMicros
+
+    def reset(self) -> None:
+        """Forget every sample, e.g. after the coprocessor reconnects."""
+        with self._lock:
+            self._samples.clear()
+            self._referenceServerTime = 0
+            self._offsetMicros = 0.0
+            self._driftPerMicro = 0.0
+
+    def addSample(self, serverTimeMicros: int, localTimeMicros: int) -> None:
+        """
+        Record when a value published at a server time arrived locally. Samples that
+        are not newer than the newest one already recorded are ignored, so the same
+        value can safely be reported more than once.
+
+        :param serverTimeMicros: server time the value was published at, in microseconds
+        :param localTimeMicros: local (FPGA) time the value arrived at, in microseconds
+        """
+        with self._lock:
+            if self._samples and serverTimeMicros <= self._samples[-1][0]:
+                return
+            self._samples.append((serverTimeMicros, localTimeMicros))
+            self._fit()
+
+    def getSampleCount(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def getOffsetSeconds(self) -> float:
+        """
+        :returns: how far the local clock is ahead of the server clock at the newest
+                  sample, in seconds
+        """
+        with self._lock:
+            if self._localIsServer or not self._samples:
+                return 0.0
+            return (self._offsetAt(self._samples[-1][0]) - self._transitMicros()) * 1e-6
+
+    def getTransitSeconds(self) -> float:
+        """
+        :returns: the one-way transit taken out of the fitted offset, in seconds
+        """
+        with self._lock:
+            return self._transitMicros() * 1e-6
+
+    def getDriftPpm(self) -> float:
+        """
+        :returns: how fast the offset is changing, in microseconds per second of
+                  server time
+        """
+        with self._lock:
+            return self._driftPerMicro * 1e6
+
+    def toFpgaSeconds(self, serverTimeMicros: int) -> float:
+        """
+        Convert a server timestamp into FPGA time.
+
+        :param serverTimeMicros: server time, in microseconds
+
+        :returns: the same instant in FPGA time, in seconds
+        """
+        with self._lock:
+            if self._localIsServer:
+                return serverTimeMicros * 1e-6
+            return (
+                serverTimeMicros
+                + self._offsetAt(serverTimeMicros)
+                - self._transitMicros()
+            ) * 1e-6
+
+    def _transitMicros(self) -> float:
+        if (
+            self._localIsServer
+            or self._serverTimeOffsetMicros is None
+            or not self._samples
+        ):
+            return 0.0
+        # The fit is local - server plus the transit; ntcore's offset is server - local
+        transit = self._offsetAt(self._samples[-1][0]) + self._serverTimeOffsetMicros
+        return max(transit, 0.0)
+
+    def _offsetAt(self, serverTimeMicros: int) -> float:
+        return self._offsetMicros + self._driftPerMicro * (
+            serverTimeMicros - self._referenceServerTime
+        )
+
+    def _fit(self) -> None:
+        # Network transit only ever delays a value, so in each half of the window the
+        # sample with the smallest local - server difference is the closest to the
+        # true clock offset. The line through those two samples gives the offset and
+        # its drift without picking up the transit jitter a least squares fit would.
+        samples = list(self._samples)
+        half = len(samples) // 2
+        late = min(samples[half:], key=_localMinusServer)
+        self._referenceServerTime = late[0]
+        self._offsetMicros = float(_localMinusServer(late))
+
+        self._driftPerMicro = 0.0
+        if half > 0:
+            early = min(samples[:half], key=_localMinusServer)
+            if late[0] > early[0]:
+                self._driftPerMicro = (
+                    _localMinusServer(late) - _localMinusServer(early)
+                ) / (late[0] - early[0])
+
+
+def _localMinusServer(sample: tuple[int, int]) -> int:
+    return sample[1] - sample[0]
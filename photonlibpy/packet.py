@@ -2,22 +2,42 @@ import struct
 from wpimath.geometry import Transform3d, Translation3d, Rotation3d, Quaternion
 import wpilib
 
+# Precompiled big-endian layouts for every primitive photonvision serializes
+_INT8 = struct.Struct(">b")
+_INT16 = struct.Struct(">h")
+_INT32 = struct.Struct(">l")
+_DOUBLE = struct.Struct(">d")
+# Translation (x, y, z) followed by rotation quaternion (w, x, y, z)
+_TRANSFORM = struct.Struct(">7d")
+# Double array layouts, compiled the first time each length is seen
+_DOUBLE_ARRAYS: dict[int, struct.Struct] = {}
+
+
+def _doubleArrayLayout(length: int) -> struct.Struct:
+    unpacker = _DOUBLE_ARRAYS.get(length)
+    if unpacker is None:
+        unpacker = _DOUBLE_ARRAYS[length] = struct.Struct(f">{length}d")
+    return unpacker
+
 
 class Packet:
-    def __init__(self, data: bytes):
+    def __init__(self, data: bytes = b""):
         """
-        * Constructs an empty packet.
+        * Constructs a packet. Leave data empty to build a packet with the encode methods.
         *
-        * @param self.size The self.size of the packet buffer.
+        * @param data The bytes to decode.
         """
         self.packetData = data
         self.size = len(data)
         self.readPos = 0
         self.outOfBytes = False
+        # Decoding unpacks straight out of this view, so no bytes are copied
+        self._view = memoryview(data)
 
     def clear(self):
         """Clears the packet and resets the read and write positions."""
-        self.packetData = [0] * self.size
+        self.packetData = bytes(self.size)
+        self._view = memoryview(self.packetData)
         self.readPos = 0
         self.outOfBytes = False
 
@@ -30,18 +50,25 @@ class Packet:
     matches the version of photonlib running in the robot code.
     """
 
-    def _getNextByteAsInt(self) -> int:
-        retVal = 0x00
+    def _hasRemaining(self, numBytes: int) -> bool:
+        """
+        * Checks that the next numBytes bytes can be read. The first time a read
+        * would run past the end of the packet an error is reported, the read
+        * position is moved to the end and every later read decodes as zero.
+        *
+        * @param numBytes The number of bytes about to be read.
+        * @return Whether the read can go ahead.
+        """
+        if self.outOfBytes:
+            return False
 
-        if not self.outOfBytes:
-            try:
-                retVal = 0x00FF & self.packetData[self.readPos]
-                self.readPos += 1
-            except IndexError:
-                wpilib.reportError(Packet._NO_MORE_BYTES_MESSAGE, True)
-                self.outOfBytes = True
+        if self.readPos + numBytes > self.size:
+            wpilib.reportError(Packet._NO_MORE_BYTES_MESSAGE, True)
+            self.outOfBytes = True
+            self.readPos = self.size
+            return False
 
-        return retVal
+        return True
 
     def getData(self) -> bytes:
         """
@@ -60,17 +87,59 @@ class Packet:
         self.clear()
         self.packetData = data
         self.size = len(self.packetData)
+        self._view = memoryview(data)
+
+    def decodeStruct(self, unpacker: struct.Struct) -> tuple:
+        """
+        * Returns every value of a fixed layout decoded in one step, advancing
+        * the read position past it. Decodes as all zeros if the packet is too short.
+        *
+        * @param unpacker The precompiled big-endian layout to read.
+        * @return The decoded values, in layout order.
+        """
+        if not self._hasRemaining(unpacker.size):
+            return unpacker.unpack(bytes(unpacker.size))
 
-    def _decodeGeneric(self, unpackFormat, numBytes):
-        # Read ints in from the data buffer
-        intList = []
-        for _ in range(numBytes):
-            intList.append(self._getNextByteAsInt())
+        values = unpacker.unpack_from(self._view, self.readPos)
+        self.readPos += unpacker.size
+        return values
 
-        # Interpret the bytes as a floating point number
-        value = struct.unpack(unpackFormat, bytes(intList))[0]
+    def decodeBytes(self, numBytes: int) -> memoryview:
+        """
+        * Returns the next numBytes raw bytes without copying them. Decodes as
+        * zeros if the packet is too short.
+        *
+        * @param numBytes The number of bytes to read.
+        * @return A read-only view of the bytes.
+        """
+        if not self._hasRemaining(numBytes):
+            return memoryview(bytes(numBytes))
 
-        return value
+        view = self._view[self.readPos : self.readPos + numBytes]
+        self.readPos += numBytes
+        return view.toreadonly()
+
+    def skip(self, numBytes: int) -> None:
+        """
+        * Advances the read position without decoding anything.
+        *
+        * @param numBytes The number of bytes to skip over.
+        """
+        if self._hasRemaining(numBytes):
+            self.readPos += numBytes
+
+    def slice(self, start: int, end: int) -> "Packet":
+        """
+        * Returns a packet over part of this one's data. No bytes are copied.
+        *
+        * @param start The position of the first byte in the new packet.
+        * @param end The position just past the last byte in the new packet.
+        * @return A packet that reads from start up to end.
+        """
+        return Packet(self._view[start:end])
+
+    def _decodeGeneric(self, unpacker: struct.Struct):
+        return self.decodeStruct(unpacker)[0]
 
     def decode8(self) -> int:
         """
@@ -78,7 +147,7 @@ class Packet:
         *
         * @return A decoded byte from the packet.
         """
-        return self._decodeGeneric(">b", 1)
+        return self._decodeGeneric(_INT8)
 
     def decode16(self) -> int:
         """
@@ -86,7 +155,7 @@ class Packet:
         *
         * @return A decoded byte from the packet.
         """
-        return self._decodeGeneric(">h", 2)
+        return self._decodeGeneric(_INT16)
 
     def decode32(self) -> int:
         """
@@ -94,7 +163,7 @@ class Packet:
         *
         * @return A decoded int from the packet.
         """
-        return self._decodeGeneric(">l", 4)
+        return self._decodeGeneric(_INT32)
 
     def decodeDouble(self) -> float:
         """
@@ -102,7 +171,7 @@ class Packet:
         *
         * @return A decoded double from the packet.
         """
-        return self._decodeGeneric(">d", 8)
+        return self._decodeGeneric(_DOUBLE)
 
     def decodeBoolean(self) -> bool:
         """
@@ -118,10 +187,7 @@ class Packet:
         *
         * @return A decoded array of floats from the packet.
         """
-        ret = []
-        for _ in range(length):
-            ret.append(self.decodeDouble())
-        return ret
+        return list(self.decodeStruct(_doubleArrayLayout(length)))
 
     def decodeTransform(self) -> Transform3d:
         """
@@ -129,15 +195,109 @@ class Packet:
         *
         * @return A decoded Tansform3d from the packet.
         """
-        x = self.decodeDouble()
-        y = self.decodeDouble()
-        z = self.decodeDouble()
-        translation = Translation3d(x, y, z)
+        return Packet.transformFromDoubles(self.decodeStruct(_TRANSFORM))
+
+    @staticmethod
+    def transformFromDoubles(values) -> Transform3d:
+        """
+        * Returns a Transform3d built from seven already decoded doubles
+        *
+        * @param values Translation x, y, z followed by quaternion w, x, y, z.
+        * @return The Transform3d they describe.
+        """
+        x, y, z, qw, qx, qy, qz = values
+        return Transform3d(Translation3d(x, y, z), Rotation3d(Quaternion(qw, qx, qy, qz)))
+
+    def _write(self, data: bytes) -> None:
+        # A bytearray can only grow while no view of it is held
+        self._view.release()
+        if not isinstance(self.packetData, bytearray):
+            self.packetData = bytearray(self.packetData)
+        self.packetData += data
+        self.size = len(self.packetData)
+        self._view = memoryview(self.packetData)
+
+    def encodeStruct(self, packer: struct.Struct, *values) -> None:
+        """
+        * Appends every value of a fixed layout in one step.
+        *
+        * @param packer The precompiled big-endian layout to write.
+        * @param values The values to write, in layout order.
+        """
+        self._write(packer.pack(*values))
+
+    def encode8(self, value: int) -> None:
+        """
+        * Appends a single byte to the packet.
+        *
+        * @param value The byte to encode.
+        """
+        self.encodeStruct(_INT8, value)
+
+    def encode16(self, value: int) -> None:
+        """
+        * Appends a short (16 bits) to the packet.
+        *
+        * @param value The short to encode.
+        """
+        self.encodeStruct(_INT16, value)
+
+    def encode32(self, value: int) -> None:
+        """
+        * Appends an int (32 bits) to the packet.
+        *
+        * @param value The int to encode.
+        """
+        self.encodeStruct(_INT32, value)
 
-        w = self.decodeDouble()
-        x = self.decodeDouble()
-        y = self.decodeDouble()
-        z = self.decodeDouble()
-        rotation = Rotation3d(Quaternion(w, x, y, z))
+    def encodeDouble(self, value: float) -> None:
+        """
+        * Appends a double to the packet.
+        *
+        * @param value The double to encode.
+        """
+        self.encodeStruct(_DOUBLE, value)
 
-        return Transform3d(translation, rotation)
\ No newline at end of file
+    def encodeBoolean(self, value: bool) -> None:
+        """
+        * Appends a boolean to the packet.
+        *
+        * @param value The boolean to encode.
+        """
+        self.encode8(1 if value else 0)
+
+    def encodeDoubleArray(self, values: list[float]) -> None:
+        """
+        * Appends an array of doubles to the packet. The length is not written.
+        *
+        * @param values The doubles to encode.
+        """
+        self.encodeStruct(_doubleArrayLayout(len(values)), *values)
+
+    def encodeTransform(self, transform: Transform3d) -> None:
+        """
+        * Appends a Transform3d to the packet.
+        *
+        * @param transform The Transform3d to encode.
+        """
+        self.encodeStruct(_TRANSFORM, *Packet.transformToDoubles(transform))
+
+    @staticmethod
+    def transformToDoubles(transform: Transform3d) -> tuple[float, ...]:
+        """
+        * Returns the seven doubles a Transform3d is serialized as
+        *
+        * @param transform The Transform3d to flatten.
+        * @return Translation x, y, z followed by quaternion w, x, y, z.
+        """
+        translation = transform.translation()
+        quaternion = transform.rotation().getQuaternion()
+        return (
+            translation.x,
+            translation.y,
+            translation.z,
+            quaternion.W(),
+            quaternion.X(),
+            quaternion.Y(),
+            quaternion.Z(),
+        )
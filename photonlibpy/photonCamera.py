@@ -1,11 +1,17 @@
+import atexit
 from enum import Enum
+from typing import TYPE_CHECKING, Optional
 import ntcore
 from wpilib import Timer
 import wpilib
+from photonlibpy.ntTimeBase import NTTimeBase
 from photonlibpy.packet import Packet
 from photonlibpy.photonPipelineResult import PhotonPipelineResult
 #from photonlibpy.version import PHOTONVISION_VERSION, PHOTONLIB_VERSION  # type: ignore[import-untyped]
 
+if TYPE_CHECKING:
+    import numpy as np
+
 #from photonlibpy.version import PHOTONVISION_VERSION, PHOTONLIB_VERSION
 PHOTONVISION_VERSION = ""
 PHOTONLIB_VERSION = ""
@@ -17,6 +23,9 @@ class VisionLEDMode(Enum):
     kBlink = 2
 
 
+# Frames kept for getAllUnreadResults, about 10 robot loops at 100 fps
+_UNREAD_QUEUE_DEPTH = 20
+
 _lastVersionTimeCheck = 0.0
 _VERSION_CHECK_ENABLED = False
 
@@ -27,15 +36,34 @@ def setVersionCheckEnabled(enabled: bool):
 
 
 class PhotonCamera:
-    def __init__(self, cameraName: str):
-        instance = ntcore.NetworkTableInstance.getDefault()
+    def __init__(
+        self,
+        cameraName: str,
+        lazyDecode: bool = False,
+        instance: ntcore.NetworkTableInstance | None = None,
+    ):
+        """
+        :param cameraName: Name of the camera, as set in the PhotonVision dashboard.
+        :param lazyDecode: Decode target transforms and corners, and the multi-tag
+                           result, only when they are first read. Suits callers that
+                           only need target ids, yaw and pitch.
+        :param instance: NetworkTables instance the coprocessor publishes on.
+                         Defaults to the default instance.
+        """
+        if instance is None:
+            instance = ntcore.NetworkTableInstance.getDefault()
         self._name = cameraName
+        self._lazyDecode = lazyDecode
         self._tableName = "photonvision"
         photonvision_root_table = instance.getTable(self._tableName)
         self._cameraTable = photonvision_root_table.getSubTable(cameraName)
         self._path = self._cameraTable.getPath()
         self._rawBytesEntry = self._cameraTable.getRawTopic("rawBytes").subscribe(
-            "rawBytes", bytes([]), ntcore.PubSubOptions(periodic=0.01, sendAll=True)
+            "rawBytes",
+            bytes([]),
+            ntcore.PubSubOptions(
+                periodic=0.01, sendAll=True, pollStorage=_UNREAD_QUEUE_DEPTH
+            ),
         )
 
         self._driverModePublisher = self._cameraTable.getBooleanTopic(
@@ -59,6 +87,12 @@ class PhotonCamera:
         self._heartbeatEntry = self._cameraTable.getIntegerTopic("heartbeat").subscribe(
             -1
         )
+        self._cameraIntrinsicsSubscriber = self._cameraTable.getDoubleArrayTopic(
+            "cameraIntrinsics"
+        ).subscribe([])
+        self._cameraDistortionSubscriber = self._cameraTable.getDoubleArrayTopic(
+            "cameraDistortion"
+        ).subscribe([])
 
         self._ledModeRequest = photonvision_root_table.getIntegerTopic(
             "ledModeRequest"
@@ -78,25 +112,207 @@ class PhotonCamera:
         self._prevHeartbeat = 0
         self._prevHeartbeatChangeTime = Timer.getFPGATimestamp()
 
+        self._timeBase = NTTimeBase()
+
+        # Last decoded result, reused until rawBytes gets a new value
+        self._resultCacheEnabled = True
+        self._cachedResult: PhotonPipelineResult | None = None
+        self._cachedResultTime = 0
+        self._resultCacheHits = 0
+        self._resultCacheMisses = 0
+
+        # Results decoded into again in turn instead of allocating new ones
+        self._resultPool: list[PhotonPipelineResult] = []
+        self._resultPoolIndex = 0
+
+        # Set while results are decoded on ntcore's listener thread
+        self._backgroundListener: int | None = None
+        self._backgroundResult = PhotonPipelineResult()
+
     def getLatestResult(self) -> PhotonPipelineResult:
+        """Get the most recent result sent by the coprocessor.
+
+        Calling this again before a new frame arrives returns the same result
+        object, so it must not be modified. See :meth:`setResultCacheEnabled`
+        and :meth:`setResultPoolSize`.
+        """
         self._versionCheck()
 
-        retVal = PhotonPipelineResult()
+        if self._backgroundListener is not None:
+            return self._backgroundResult
+
         packetWithTimestamp = self._rawBytesEntry.getAtomic()
+        if not self._resultCacheEnabled:
+            return self._decodeResult(packetWithTimestamp, self._nextPooledResult())
+
+        if (
+            self._cachedResult is not None
+            and packetWithTimestamp.time == self._cachedResultTime
+        ):
+            self._resultCacheHits += 1
+            return self._cachedResult
+
+        self._resultCacheMisses += 1
+        self._cachedResult = self._decodeResult(
+            packetWithTimestamp, self._nextPooledResult()
+        )
+        self._cachedResultTime = packetWithTimestamp.time
+        return self._cachedResult
+
+    def getAllUnreadResults(self) -> list[PhotonPipelineResult]:
+        """Get every result the coprocessor sent since the previous call, oldest
+        first, each with its own timestamp.
+
+        This empties the queue, so call it once per robot loop. The queue holds
+        the last 20 frames; older unread frames are dropped. It is independent of
+        getLatestResult, which always returns the newest frame. The results are
+        never pooled, so they can be kept for as long as needed.
+        """
+        self._versionCheck()
+
+        return [
+            self._decodeResult(packetWithTimestamp)
+            for packetWithTimestamp in self._rawBytesEntry.readQueue()
+        ]
+
+    def setBackgroundDecodingEnabled(self, enabled: bool) -> None:
+        """Set whether frames are decoded on a background thread as they arrive.
+
+        While enabled, getLatestResult returns the newest result the background
+        thread has finished decoding, without decoding anything itself. Results
+        are handed over whole and are never modified after that, so they must
+        not be modified by the caller either. Frames are decoded in full on the
+        background thread even if lazyDecode is set, so reading a result never
+        decodes on the caller's thread.
+
+        :param enabled: whether to decode in the background, off by default
+        """
+        instance = self._cameraTable.getInstance()
+        if enabled and self._backgroundListener is None:
+            self._backgroundResult = self._decodeResult(
+                self._rawBytesEntry.getAtomic(), self._nextPooledResult(), False
+            )
+            self._backgroundListener = instance.addListener(
+                self._rawBytesEntry,
+                ntcore.EventFlags.kValueAll,
+                self._onRawBytes,
+            )
+            # ntcore aborts at exit if a Python listener is still registered
+            atexit.register(self.setBackgroundDecodingEnabled, False)
+        elif not enabled and self._backgroundListener is not None:
+            instance.removeListener(self._backgroundListener)
+            self._backgroundListener = None
+            atexit.unregister(self.setBackgroundDecodingEnabled)
+
+    def _onRawBytes(self, event: ntcore.Event) -> None:
+        # Runs on ntcore's listener thread. The decoded result is only published
+        # by replacing the reference, so the robot loop never sees a partial one.
+        value = event.data.value
+        self._backgroundResult = self._decodeResult(
+            ntcore.TimestampedRaw(value.time(), value.server_time(), value.getRaw()),
+            self._nextPooledResult(),
+            False,
+        )
+
+    def setResultPoolSize(self, size: int) -> None:
+        """Set how many results getLatestResult and background decoding take turns
+        decoding into, instead of allocating a new result for every frame.
+
+        A pooled result, and every target and transform holder in it, is decoded
+        into again once size - 1 newer frames have been decoded, so only keep one
+        past that with :meth:`detachResult` or :meth:`PhotonPipelineResult.copy`.
+        With background decoding the robot loop may still be reading a result
+        while the next frame is decoded, so use a size of at least 3 there.
+
+        :param size: number of results in the pool, 0 (the default) to always
+                     decode into a new result
+        """
+        self._resultPool = [PhotonPipelineResult() for _ in range(max(size, 0))]
+        self._resultPoolIndex = 0
+        self.invalidateResultCache()
+
+    def detachResult(self, result: PhotonPipelineResult) -> PhotonPipelineResult:
+        """Take a result out of the pool so later frames are never decoded into it.
+
+        :param result: a result returned by this camera
+
+        :returns: the same result, now owned by the caller
+        """
+        for i, pooled in enumerate(self._resultPool):
+            if pooled is result:
+                self._resultPool[i] = PhotonPipelineResult()
+        return result
+
+    def _nextPooledResult(self) -> PhotonPipelineResult | None:
+        if not self._resultPool:
+            return None
+        result = self._resultPool[self._resultPoolIndex]
+        self._resultPoolIndex = (self._resultPoolIndex + 1) % len(self._resultPool)
+        return result
+
+    def setResultCacheEnabled(self, enabled: bool) -> None:
+        """Set whether getLatestResult reuses the last decoded result until a new
+        frame arrives. When disabled every call decodes a fresh result.
+
+        :param enabled: whether to cache results, on by default
+        """
+        self._resultCacheEnabled = enabled
+        self.invalidateResultCache()
+
+    def invalidateResultCache(self) -> None:
+        """Make the next getLatestResult call decode the latest frame again."""
+        self._cachedResult = None
+
+    def getResultCacheHits(self) -> int:
+        """Number of getLatestResult calls answered from the cache."""
+        return self._resultCacheHits
+
+    def getResultCacheMisses(self) -> int:
+        """Number of getLatestResult calls that had to decode a frame while the
+        cache was enabled."""
+        return self._resultCacheMisses
+
+    def _decodeResult(
+        self,
+        packetWithTimestamp,
+        retVal: PhotonPipelineResult | None = None,
+        lazy: bool | None = None,
+    ) -> PhotonPipelineResult:
         byteList = packetWithTimestamp.value
-        timestamp = packetWithTimestamp.time
+        serverTime = packetWithTimestamp.serverTime
 
         if len(byteList) < 1:
-            return retVal
+            return PhotonPipelineResult()
         else:
+            # Only results from the pool are decoded into again, so only they reuse
+            # their targets
+            reuse = retVal is not None
+            if retVal is None:
+                retVal = PhotonPipelineResult()
             pkt = Packet(byteList)
-            retVal.populateFromPacket(pkt)
+            retVal.populateFromPacket(
+                pkt, self._lazyDecode if lazy is None else lazy, reuse
+            )
             # NT4 allows us to correct the timestamp based on when the message was sent
+            instance = self._cameraTable.getInstance()
+            self._timeBase.setLocalIsServer(
+                bool(
+                    instance.getNetworkMode()
+                    & ntcore.NetworkTableInstance.NetworkMode.kNetModeServer
+                )
+            )
+            self._timeBase.setServerTimeOffset(instance.getServerTimeOffset())
+            self._timeBase.addSample(serverTime, packetWithTimestamp.time)
             retVal.setTimestampSeconds(
-                timestamp / 1e-6 - retVal.getLatencyMillis() / 1e-3
+                self._timeBase.toFpgaSeconds(serverTime)
+                - retVal.getLatencyMillis() * 1e-3
             )
             return retVal
 
+    def getTimeBase(self) -> NTTimeBase:
+        """Get the estimate used to convert this camera's NT timestamps into FPGA time."""
+        return self._timeBase
+
     def getDriverMode(self) -> bool:
         return self._driverModeSubscriber.get()
 
@@ -122,6 +338,33 @@ class PhotonCamera:
     def setLEDMode(self, led: VisionLEDMode) -> None:
         self._ledModeRequest.set(led.value)
 
+    def getCameraMatrix(self) -> Optional["np.ndarray"]:
+        """Get the camera's intrinsic matrix from its calibration.
+
+        :returns: the 3x3 matrix, or None if the camera has not been calibrated
+        """
+        values = self._cameraIntrinsicsSubscriber.get()
+        if len(values) != 9:
+            return None
+        import numpy as np
+
+        return np.array(values).reshape(3, 3)
+
+    def getDistCoeffs(self) -> Optional["np.ndarray"]:
+        """Get the camera's OpenCV distortion coefficients from its calibration.
+
+        :returns: the 8 coefficients, padded with zeros, or None if the camera has
+                  not been calibrated
+        """
+        values = self._cameraDistortionSubscriber.get()
+        if len(values) == 0 or len(values) > 8:
+            return None
+        import numpy as np
+
+        distCoeffs = np.zeros(8)
+        distCoeffs[: len(values)] = values
+        return distCoeffs
+
     def getName(self) -> str:
         return self._name
 
@@ -1,32 +1,178 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Optional
 
 from photonlibpy.multiTargetPNPResult import MultiTargetPNPResult
 from photonlibpy.packet import Packet
 from photonlibpy.photonTrackedTarget import PhotonTrackedTarget
 
+if TYPE_CHECKING:
+    from photonlibpy.targetColumns import TargetColumns
 
-@dataclass
+
+@dataclass(slots=True)
 class PhotonPipelineResult:
     latencyMillis: float = -1.0
     timestampSec: float = -1.0
     targets: list[PhotonTrackedTarget] = field(default_factory=list)
+    # Read and written through the multiTagResult property defined after the class
     multiTagResult: MultiTargetPNPResult = field(default_factory=MultiTargetPNPResult)
+    # Only ever set through the property, so it has no default to overwrite it
+    _multiTagResult: Optional[MultiTargetPNPResult] = field(
+        init=False, repr=False, compare=False
+    )
+    # Bytes of a lazily decoded multi-tag result that has not been read yet
+    _deferredPacket: Optional[Packet] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Multi-tag result of a reusing decode kept to decode into again, while a lazy
+    # decode's multi-tag result has not been read
+    _spareMultiTagResult: Optional[MultiTargetPNPResult] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _targetsById: dict[int, PhotonTrackedTarget] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    # Every target object decoded into by reusing decodes, reused by later ones
+    _targetPool: list[PhotonTrackedTarget] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    # Where each target starts in the packet this result was decoded from
+    _packet: Optional[Packet] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _targetOffsets: list[int] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    _columns: Optional["TargetColumns"] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        self._indexTargets()
+
+    def _indexTargets(self) -> None:
+        # First target seen for each fiducial id, matching a front to back scan
+        self._targetsById.clear()
+        for target in self.targets:
+            self._targetsById.setdefault(target.fiducialId, target)
+
+    def _getMultiTagResult(self) -> MultiTargetPNPResult:
+        if self._deferredPacket is not None:
+            multiTagResult = self._spareMultiTagResult or MultiTargetPNPResult()
+            self._spareMultiTagResult = None
+            multiTagResult.createFromPacket(self._deferredPacket)
+            self._deferredPacket = None
+            self._multiTagResult = multiTagResult
+        return self._multiTagResult
 
-    def populateFromPacket(self, packet: Packet) -> Packet:
+    def _setMultiTagResult(self, multiTagResult: MultiTargetPNPResult) -> None:
+        self._deferredPacket = None
+        self._multiTagResult = multiTagResult
+
+    def populateFromPacket(
+        self, packet: Packet, lazy: bool = False, reuse: bool = False
+    ) -> Packet:
+        """Decode a result from packet.
+
+        :param packet: packet holding a serialized pipeline result
+        :param lazy: only decode what is needed to find and aim at targets. Target
+                     transforms and corners, and the multi-tag result, are decoded
+                     from the packet the first time they are read.
+        :param reuse: decode into the target objects and multi-tag result of
+                      previous reusing decodes into this result, only allocating new
+                      targets when the packet holds more than any previous one.
+                      Targets and multi-tag results kept from those decodes change.
+        """
         self.targets = []
+        self._packet = packet
+        self._targetOffsets = []
+        self._columns = None
         self.latencyMillis = packet.decodeDouble()
         targetCount = packet.decode8()
 
-        for _ in range(targetCount):
-            target = PhotonTrackedTarget()
+        if reuse:
+            while len(self._targetPool) < targetCount:
+                # Skip the dataclass constructor; every field is set by the decode
+                self._targetPool.append(PhotonTrackedTarget.__new__(PhotonTrackedTarget))
+            targets = self._targetPool[:targetCount]
+        else:
+            targets = [
+                PhotonTrackedTarget.__new__(PhotonTrackedTarget)
+                for _ in range(targetCount)
+            ]
+
+        if lazy:
+            for target in targets:
+                self._targetOffsets.append(packet.readPos)
+                target.indexFromPacket(packet)
+                self.targets.append(target)
+            self._indexTargets()
+
+            # Keep the previous multi-tag result to decode into when it is read. If
+            # the previous decode was lazy and it was never read, the spare from
+            # before that is still there.
+            if not reuse:
+                self._spareMultiTagResult = None
+            elif self._deferredPacket is None and self._multiTagResult is not None:
+                self._spareMultiTagResult = self._multiTagResult
+            self._multiTagResult = None
+            # The multi-tag result is the last thing in the packet
+            self._deferredPacket = packet.slice(packet.readPos, packet.getSize())
+            packet.skip(packet.getSize() - packet.readPos)
+            return packet
+
+        if reuse:
+            multiTagResult = (
+                self._multiTagResult
+                if self._deferredPacket is None
+                else self._spareMultiTagResult
+            )
+        else:
+            multiTagResult = None
+        self._spareMultiTagResult = None
+        self.multiTagResult = multiTagResult or MultiTargetPNPResult()
+        for target in targets:
+            self._targetOffsets.append(packet.readPos)
             target.createFromPacket(packet)
             self.targets.append(target)
+        self._indexTargets()
 
-        self.multiTagResult = MultiTargetPNPResult()
         self.multiTagResult.createFromPacket(packet)
 
         return packet
 
+    def copy(self) -> "PhotonPipelineResult":
+        """Make a copy that later decodes into this result will not change.
+
+        Use this to keep a result from a pooling PhotonCamera past the next few frames.
+        """
+        multiTagResult = self.multiTagResult
+        copy = PhotonPipelineResult(
+            self.latencyMillis,
+            self.timestampSec,
+            [replace(target) for target in self.targets],
+            MultiTargetPNPResult(
+                replace(multiTagResult.estimatedPose),
+                list(multiTagResult.fiducialIDsUsed),
+            ),
+        )
+        # The packet bytes are never modified, so the copy can keep reading them
+        copy._packet = self._packet
+        copy._targetOffsets = list(self._targetOffsets)
+        return copy
+
+    def populatePacket(self, packet: Packet) -> Packet:
+        """Append this result to packet, in the layout populateFromPacket reads."""
+        packet.encodeDouble(self.latencyMillis)
+        packet.encode8(len(self.targets))
+
+        for target in self.targets:
+            target.populatePacket(packet)
+
+        self.multiTagResult.populatePacket(packet)
+
+        return packet
+
     def setTimestampSeconds(self, timestampSec: float) -> None:
         self.timestampSec = timestampSec
 
@@ -39,5 +185,47 @@ class PhotonPipelineResult:
     def getTargets(self) -> list[PhotonTrackedTarget]:
         return self.targets
 
+    def getTargetById(self, fiducialId: int) -> Optional[PhotonTrackedTarget]:
+        """Look up a target by its fiducial id without scanning every target.
+
+        The lookup is built when the result is decoded or constructed, so it does
+        not see changes made to ``targets`` afterwards.
+
+        :param fiducialId: the AprilTag id to look for
+
+        :returns: the first target with that id, or None if it was not seen
+        """
+        return self._targetsById.get(fiducialId)
+
+    def getTargetColumns(self) -> "TargetColumns":
+        """Get every target's fields as NumPy arrays, one row per target.
+
+        The arrays are read straight from the packet bytes when this result was
+        decoded from a packet, without materializing any target objects. They are
+        built once per result; treat them as read-only.
+
+        :returns: the columns, in the same order as ``targets``
+        """
+        if self._columns is None:
+            from photonlibpy.targetColumns import TargetColumns
+
+            if self._packet is not None and not self._packet.outOfBytes:
+                self._columns = TargetColumns.fromPacket(
+                    self._packet, self._targetOffsets
+                )
+            else:
+                self._columns = TargetColumns.fromTargets(self.targets)
+        return self._columns
+
+    def getMultiTagResult(self) -> MultiTargetPNPResult:
+        return self.multiTagResult
+
     def hasTargets(self) -> bool:
-        return len(self.targets) > 0
\ No newline at end of file
+        return len(self.targets) > 0
+
+
+# Replaces the field's slot, so the dataclass constructor, comparisons and repr all
+# go through it and a lazily decoded multi-tag result is decoded when first read
+PhotonPipelineResult.multiTagResult = property(  # type: ignore[assignment]
+    PhotonPipelineResult._getMultiTagResult, PhotonPipelineResult._setMultiTagResult
+)
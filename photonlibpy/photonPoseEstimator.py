@@ -1,14 +1,21 @@
 import enum
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import wpilib
-from robotpy_apriltag import AprilTagFieldLayout
 from wpimath.geometry import Transform3d, Pose3d, Pose2d
 
 from .photonPipelineResult import PhotonPipelineResult
 from .photonCamera import PhotonCamera
 from .estimatedRobotPose import EstimatedRobotPose
 
+if TYPE_CHECKING:
+    import numpy as np
+    from robotpy_apriltag import AprilTagFieldLayout
+
+    from .multiTagSolver import MultiTagSolution, MultiTagSolver
+    from .poseCandidates import PoseCandidates
+    from .targetColumns import TargetColumns
+
 
 class PoseStrategy(enum.Enum):
     """
@@ -52,7 +59,7 @@ class PhotonPoseEstimator:
 
     def __init__(
         self,
-        fieldTags: AprilTagFieldLayout,
+        fieldTags: "AprilTagFieldLayout",
         strategy: PoseStrategy,
         camera: PhotonCamera,
         robotToCamera: Transform3d,
@@ -61,8 +68,8 @@ class PhotonPoseEstimator:
 
         :param fieldTags: A WPILib AprilTagFieldLayout linking AprilTag IDs to Pose3d objects
                            with respect to the FIRST field using the Field Coordinate System.
-                           Note that setting the origin of this layout object will affect the
-                           results from this class.
+                           The tag poses are read once and cached, so after setting the origin
+                           of this layout object assign it to ``fieldTags`` again.
         :param strategy: The strategy it should use to determine the best pose.
         :param camera: PhotonCamera
         :param robotToCamera: Transform3d from the center of the robot to the camera mount position (i.e.,
@@ -71,36 +78,71 @@ class PhotonPoseEstimator:
         self._fieldTags = fieldTags
         self._primaryStrategy = strategy
         self._camera = camera
-        self.robotToCamera = robotToCamera
+        self._robotToCamera = robotToCamera
 
         self._multiTagFallbackStrategy = PoseStrategy.LOWEST_AMBIGUITY
         self._reportedErrors: set[int] = set()
         self._poseCacheTimestampSeconds = -1.0
         self._lastPose: Optional[Pose3d] = None
         self._referencePose: Optional[Pose3d] = None
+        self._multiTagSolver: Optional["MultiTagSolver"] = None
+        self._lastMultiTagSolution: Optional["MultiTagSolution"] = None
+
+        # Derived from fieldTags and robotToCamera the first time they are needed,
+        # and cleared by their setters
+        self._tagPoses: Optional[list[Optional[Pose3d]]] = None
+        self._tagPoseArray: Optional["np.ndarray"] = None
+        self._fieldOrigin: Optional[Pose3d] = None
+        self._cameraToRobot: Optional[Transform3d] = None
+        self._cameraToRobotArray: Optional["np.ndarray"] = None
 
         # TODO: Implement HAL reporting
 
     @property
-    def fieldTags(self) -> AprilTagFieldLayout:
+    def fieldTags(self) -> "AprilTagFieldLayout":
         """Get the AprilTagFieldLayout being used by the PositionEstimator.
 
-        Note: Setting the origin of this layout will affect the results from this class.
+        Note: The tag poses are cached, so after setting the origin of this layout assign it
+        to ``fieldTags`` again to use the new origin.
 
         :returns: the AprilTagFieldLayout
         """
         return self._fieldTags
 
     @fieldTags.setter
-    def fieldTags(self, fieldTags: AprilTagFieldLayout):
+    def fieldTags(self, fieldTags: "AprilTagFieldLayout"):
         """Set the AprilTagFieldLayout being used by the PositionEstimator.
 
-        Note: Setting the origin of this layout will affect the results from this class.
+        Note: The tag poses are cached, so after setting the origin of this layout assign it
+        again to use the new origin.
 
         :param fieldTags: the AprilTagFieldLayout
         """
         self._checkUpdate(self._fieldTags, fieldTags)
         self._fieldTags = fieldTags
+        # Always rebuilt, as the same layout may have been given a new origin
+        self._tagPoses = None
+        self._tagPoseArray = None
+        self._fieldOrigin = None
+
+    @property
+    def robotToCamera(self) -> Transform3d:
+        """Get the transform from the center of the robot to the camera.
+
+        :returns: the robot ➔ camera transform
+        """
+        return self._robotToCamera
+
+    @robotToCamera.setter
+    def robotToCamera(self, robotToCamera: Transform3d):
+        """Set the transform from the center of the robot to the camera.
+
+        :param robotToCamera: the robot ➔ camera transform in the Robot Coordinate System
+        """
+        self._checkUpdate(self._robotToCamera, robotToCamera)
+        self._robotToCamera = robotToCamera
+        self._cameraToRobot = None
+        self._cameraToRobotArray = None
 
     @property
     def primaryStrategy(self) -> PoseStrategy:
@@ -178,6 +220,79 @@ class PhotonPoseEstimator:
         self._checkUpdate(self._lastPose, lastPose)
         self._lastPose = lastPose
 
+    @property
+    def multiTagSolver(self) -> "MultiTagSolver":
+        """Get the solver used by **MULTI_TAG_PNP_ON_RIO**. Set its maxIterations and
+        timeBudgetSeconds to bound how long each update can take.
+
+        :returns: the solver
+        """
+        if self._multiTagSolver is None:
+            from .multiTagSolver import MultiTagSolver
+
+            self._multiTagSolver = MultiTagSolver()
+        return self._multiTagSolver
+
+    @property
+    def lastMultiTagSolution(self) -> Optional["MultiTagSolution"]:
+        """Return how the last **MULTI_TAG_PNP_ON_RIO** solve went, including whether it
+        converged and its reprojection error.
+
+        :returns: the last solution, or None if no solve has succeeded
+        """
+        return self._lastMultiTagSolution
+
+    def _getTagPose(self, fiducialId: int) -> Optional[Pose3d]:
+        # The strategies start from a target they have already picked and need its
+        # tag's field pose, so this indexes the layout rather than the result's
+        # targets (which is what PhotonPipelineResult.getTargetById is for)
+        if self._tagPoses is None:
+            self._buildTagPoses()
+        if 0 <= fiducialId < len(self._tagPoses):
+            return self._tagPoses[fiducialId]
+        return None
+
+    def _buildTagPoses(self) -> None:
+        # Indexed by fiducial id, with None for ids that are not on the field
+        tags = self._fieldTags.getTags()
+        self._tagPoses = [None] * (max((tag.ID for tag in tags), default=-1) + 1)
+        for tag in tags:
+            if tag.ID >= 0:
+                self._tagPoses[tag.ID] = self._fieldTags.getTagPose(tag.ID)
+        self._fieldOrigin = self._fieldTags.getOrigin()
+
+    def _getTagPoseArray(self) -> "np.ndarray":
+        """Every tag's field pose as translation then quaternion, indexed by fiducial id.
+        Rows of ids that are not on the field are NaN."""
+        if self._tagPoseArray is None:
+            from .poseCandidates import poseToDoubles
+            import numpy as np
+
+            if self._tagPoses is None:
+                self._buildTagPoses()
+            self._tagPoseArray = np.full((len(self._tagPoses), 7), np.nan)
+            for fiducialId, tagPose in enumerate(self._tagPoses):
+                if tagPose is not None:
+                    self._tagPoseArray[fiducialId] = poseToDoubles(tagPose)
+        return self._tagPoseArray
+
+    def _getFieldOrigin(self) -> Pose3d:
+        if self._fieldOrigin is None:
+            self._buildTagPoses()
+        return self._fieldOrigin
+
+    def _getCameraToRobot(self) -> Transform3d:
+        if self._cameraToRobot is None:
+            self._cameraToRobot = self._robotToCamera.inverse()
+        return self._cameraToRobot
+
+    def _getCameraToRobotArray(self) -> "np.ndarray":
+        if self._cameraToRobotArray is None:
+            from .poseCandidates import poseToDoubles
+
+            self._cameraToRobotArray = poseToDoubles(self._getCameraToRobot())
+        return self._cameraToRobotArray
+
     def _invalidatePoseCache(self) -> None:
         self._poseCacheTimestampSeconds = -1.0
 
@@ -186,7 +301,10 @@ class PhotonPoseEstimator:
             self._invalidatePoseCache()
 
     def update(
-        self, cameraResult: Optional[PhotonPipelineResult] = None
+        self,
+        cameraResult: Optional[PhotonPipelineResult] = None,
+        cameraMatrix: Optional["np.ndarray"] = None,
+        distCoeffs: Optional["np.ndarray"] = None,
     ) -> Optional[EstimatedRobotPose]:
         """
         Updates the estimated position of the robot. Returns empty if:
@@ -197,6 +315,10 @@ class PhotonPoseEstimator:
          - No targets were found in the pipeline results.
 
         :param cameraResult: The latest pipeline result from the camera
+        :param cameraMatrix: Camera calibration data for **MULTI_TAG_PNP_ON_RIO**. Read from
+                             the camera if not given.
+        :param distCoeffs: Camera calibration data for **MULTI_TAG_PNP_ON_RIO**. Read from
+                           the camera if not given.
 
         :returns: an :class:`EstimatedRobotPose` with an estimated pose, timestamp, and targets used to
                    create the estimate.
@@ -226,15 +348,43 @@ class PhotonPoseEstimator:
         if not cameraResult.targets:
             return None
 
-        return self._update(cameraResult, self._primaryStrategy)
+        if self._primaryStrategy is PoseStrategy.MULTI_TAG_PNP_ON_RIO and self._camera:
+            if cameraMatrix is None:
+                cameraMatrix = self._camera.getCameraMatrix()
+            if distCoeffs is None:
+                distCoeffs = self._camera.getDistCoeffs()
+
+        return self._update(
+            cameraResult, self._primaryStrategy, cameraMatrix, distCoeffs
+        )
 
     def _update(
-        self, cameraResult: PhotonPipelineResult, strat: PoseStrategy
+        self,
+        cameraResult: PhotonPipelineResult,
+        strat: PoseStrategy,
+        cameraMatrix: Optional["np.ndarray"] = None,
+        distCoeffs: Optional["np.ndarray"] = None,
     ) -> Optional[EstimatedRobotPose]:
         if strat is PoseStrategy.LOWEST_AMBIGUITY:
             estimatedPose = self._lowestAmbiguityStrategy(cameraResult)
+        elif strat is PoseStrategy.CLOSEST_TO_CAMERA_HEIGHT:
+            estimatedPose = self._closestToCameraHeightStrategy(cameraResult)
+        elif strat is PoseStrategy.CLOSEST_TO_REFERENCE_POSE:
+            estimatedPose = self._closestToReferencePoseStrategy(
+                cameraResult, self._referencePose, strat
+            )
+        elif strat is PoseStrategy.CLOSEST_TO_LAST_POSE:
+            estimatedPose = self._closestToReferencePoseStrategy(
+                cameraResult, self._lastPose, strat
+            )
+        elif strat is PoseStrategy.AVERAGE_BEST_TARGETS:
+            estimatedPose = self._averageBestTargetsStrategy(cameraResult)
         elif strat is PoseStrategy.MULTI_TAG_PNP_ON_COPROCESSOR:
             estimatedPose = self._multiTagOnCoprocStrategy(cameraResult)
+        elif strat is PoseStrategy.MULTI_TAG_PNP_ON_RIO:
+            estimatedPose = self._multiTagOnRioStrategy(
+                cameraResult, cameraMatrix, distCoeffs
+            )
         else:
             wpilib.reportError(
                 "[PhotonPoseEstimator] Unknown Position Estimation Strategy!", False
@@ -243,6 +393,8 @@ class PhotonPoseEstimator:
 
         if not estimatedPose:
             self._lastPose = None
+        else:
+            self._lastPose = estimatedPose.estimatedPose
 
         return estimatedPose
 
@@ -252,10 +404,9 @@ class PhotonPoseEstimator:
         if result.multiTagResult.estimatedPose.isPresent:
             best_tf = result.multiTagResult.estimatedPose.best
             best = (
-                Pose3d()
-                .transformBy(best_tf)  # field-to-camera
-                .relativeTo(self._fieldTags.getOrigin())
-                .transformBy(self.robotToCamera.inverse())  # field-to-robot
+                Pose3d(best_tf.translation(), best_tf.rotation())  # field-to-camera
+                .relativeTo(self._getFieldOrigin())
+                .transformBy(self._getCameraToRobot())  # field-to-robot
             )
             return EstimatedRobotPose(
                 best,
@@ -266,6 +417,72 @@ class PhotonPoseEstimator:
         else:
             return self._update(result, self._multiTagFallbackStrategy)
 
+    def _multiTagOnRioStrategy(
+        self,
+        result: PhotonPipelineResult,
+        cameraMatrix: Optional["np.ndarray"],
+        distCoeffs: Optional["np.ndarray"],
+    ) -> Optional[EstimatedRobotPose]:
+        """
+        Return the robot pose that best explains the detected corners of every visible tag,
+        found by refining the single tag poses and the last pose against all corners at once.
+        Falls back to the multi-tag fallback strategy when fewer than two tags can be used.
+
+        :param result: pipeline result
+        :param cameraMatrix: the camera's 3x3 intrinsic matrix
+        :param distCoeffs: the camera's distortion coefficients
+
+        :returns: the estimated position of the robot in the FCS and the estimated timestamp of this
+                  estimation.
+        """
+        if cameraMatrix is None or distCoeffs is None:
+            wpilib.reportError(
+                "[PhotonPoseEstimator] No camera calibration data provided for multi-tag-on-rio!",
+                False,
+            )
+            return self._update(result, self._multiTagFallbackStrategy)
+
+        if len(result.targets) < 2:
+            return self._update(result, self._multiTagFallbackStrategy)
+
+        from .poseCandidates import PoseCandidates, poseToDoubles
+        import numpy as np
+
+        columns = result.getTargetColumns()
+        rows, tagPoses = self._knownTags(
+            columns, np.flatnonzero(columns.numDetectedCorners == 4)
+        )
+        if len(rows) < 2:
+            return self._update(result, self._multiTagFallbackStrategy)
+
+        # Start from whichever single tag pose, or the last pose, fits every corner best
+        candidates = PoseCandidates.fromColumns(
+            columns, rows, tagPoses, self._getCameraToRobotArray()
+        )
+        seeds = candidates.cameraPoses.reshape(-1, 7)
+        if self._lastPose is not None:
+            lastCameraPose = poseToDoubles(self._lastPose.transformBy(self.robotToCamera))
+            seeds = np.concatenate((seeds, lastCameraPose[None, :]))
+
+        solver = self.multiTagSolver
+        solution = solver.solve(
+            columns.detectedCorners[rows, :4].reshape(-1, 2),
+            solver.fieldCorners(tagPoses),
+            cameraMatrix,
+            distCoeffs,
+            seeds,
+        )
+        if solution is None:
+            return self._update(result, self._multiTagFallbackStrategy)
+        self._lastMultiTagSolution = solution
+
+        return EstimatedRobotPose(
+            solution.cameraPose.transformBy(self._getCameraToRobot()),
+            result.timestampSec,
+            result.targets,
+            PoseStrategy.MULTI_TAG_PNP_ON_RIO,
+        )
+
     def _lowestAmbiguityStrategy(
         self, result: PhotonPipelineResult
     ) -> Optional[EstimatedRobotPose]:
@@ -297,7 +514,7 @@ class PhotonPoseEstimator:
 
         targetFiducialId = lowestAmbiguityTarget.fiducialId
 
-        targetPosition = self._fieldTags.getTagPose(targetFiducialId)
+        targetPosition = self._getTagPose(targetFiducialId)
 
         if not targetPosition:
             self._reportFiducialPoseError(targetFiducialId)
@@ -306,12 +523,148 @@ class PhotonPoseEstimator:
         return EstimatedRobotPose(
             targetPosition.transformBy(
                 lowestAmbiguityTarget.getBestCameraToTarget().inverse()
-            ).transformBy(self.robotToCamera.inverse()),
+            ).transformBy(self._getCameraToRobot()),
             result.timestampSec,
             result.targets,
             PoseStrategy.LOWEST_AMBIGUITY,
         )
 
+    def _poseCandidates(
+        self, result: PhotonPipelineResult
+    ) -> Optional["PoseCandidates"]:
+        """
+        Compute the best and alternate robot pose candidates of every target in a
+        pipeline result at once.
+
+        :param result: pipeline result
+
+        :returns: the candidates of every target whose tag is on the field, or None if
+                  there are none
+        """
+        from .poseCandidates import PoseCandidates
+        import numpy as np
+
+        columns = result.getTargetColumns()
+        targetIndices, tagPoses = self._knownTags(columns, np.arange(len(columns)))
+        if len(targetIndices) == 0:
+            return None
+
+        return PoseCandidates.fromColumns(
+            columns,
+            targetIndices,
+            tagPoses,
+            self._getCameraToRobotArray(),
+        )
+
+    def _knownTags(
+        self, columns: "TargetColumns", rows: "np.ndarray"
+    ) -> tuple["np.ndarray", "np.ndarray"]:
+        """
+        Look up the field poses of some of a frame's targets' tags, skipping tags that are
+        not on the field.
+
+        :param columns: the frame's targets
+        :param rows: rows of the targets to look up
+
+        :returns: the rows of the targets whose tags are on the field, shape (N,), and those
+                  tags' poses, shape (N, 7)
+        """
+        import numpy as np
+
+        tagPoseArray = self._getTagPoseArray()
+        fiducialIds = columns.fiducialIds[rows]
+        inRange = (fiducialIds >= 0) & (fiducialIds < len(tagPoseArray))
+        tagPoses = np.full((len(rows), 7), np.nan)
+        tagPoses[inRange] = tagPoseArray[fiducialIds[inRange]]
+
+        known = ~np.isnan(tagPoses[:, 0])
+        for fiducialId in fiducialIds[~known].tolist():
+            self._reportFiducialPoseError(fiducialId)
+        return rows[known], tagPoses[known]
+
+    def _closestToCameraHeightStrategy(
+        self, result: PhotonPipelineResult
+    ) -> Optional[EstimatedRobotPose]:
+        """
+        Return the estimated position of the robot with the camera height closest to the
+        height of the camera on the robot.
+
+        :param result: pipeline result
+
+        :returns: the estimated position of the robot in the FCS and the estimated timestamp of this
+                  estimation.
+        """
+        candidates = self._poseCandidates(result)
+        if candidates is None:
+            return None
+
+        return EstimatedRobotPose(
+            candidates.closestToCameraHeight(self.robotToCamera.z),
+            result.timestampSec,
+            result.targets,
+            PoseStrategy.CLOSEST_TO_CAMERA_HEIGHT,
+        )
+
+    def _closestToReferencePoseStrategy(
+        self,
+        result: PhotonPipelineResult,
+        referencePose: Optional[Pose3d],
+        strategy: PoseStrategy,
+    ) -> Optional[EstimatedRobotPose]:
+        """
+        Return the estimated position of the robot using the target with the lowest delta
+        in the vector magnitude between it and the reference pose.
+
+        :param result: pipeline result
+        :param referencePose: reference pose to check vector magnitude difference against.
+        :param strategy: the strategy to report the estimate as
+
+        :returns: the estimated position of the robot in the FCS and the estimated timestamp of this
+                  estimation.
+        """
+        if referencePose is None:
+            wpilib.reportError(
+                "[PhotonPoseEstimator] Tried to use reference pose strategy without setting the reference!",
+                False,
+            )
+            return None
+
+        candidates = self._poseCandidates(result)
+        if candidates is None:
+            return None
+
+        return EstimatedRobotPose(
+            candidates.closestToTranslation(referencePose.translation()),
+            result.timestampSec,
+            result.targets,
+            strategy,
+        )
+
+    def _averageBestTargetsStrategy(
+        self, result: PhotonPipelineResult
+    ) -> Optional[EstimatedRobotPose]:
+        """
+        Return the average of the best target poses using ambiguity as weight.
+
+        :param result: pipeline result
+
+        :returns: the estimated position of the robot in the FCS and the estimated timestamp of this
+                  estimation.
+        """
+        candidates = self._poseCandidates(result)
+        if candidates is None:
+            return None
+        averagePose = candidates.averageOfBest()
+        if averagePose is None:
+            return None
+
+        return EstimatedRobotPose(
+            averagePose,
+            result.timestampSec,
+            result.targets,
+            PoseStrategy.AVERAGE_BEST_TARGETS,
+        )
+
     def _reportFiducialPoseError(self, fiducialId: int) -> None:
         if fiducialId not in self._reportedErrors:
             wpilib.reportError(
@@ -1,15 +1,87 @@
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
 from dataclasses import dataclass, field
+from typing import Optional
 from wpimath.geometry import Transform3d
 from photonlibpy.packet import Packet
 
+# Everything serialized ahead of the detected corners: yaw, pitch, area, skew,
+# fiducial id, best and alternate camera-to-target transforms, pose ambiguity,
+# the four min area rect corners and the number of detected corners that follow
+_FIXED_LAYOUT = struct.Struct(">4dl7d7dd8db")
+_CORNER_NUM_BYTES = 2 * 8
 
-@dataclass
+# Fields a lazily created target only decodes the first time one of them is read
+_DEFERRED_FIELDS = frozenset(
+    ("bestCameraToTarget", "altCameraToTarget", "minAreaRectCorners", "detectedCorners")
+)
+
+
+@dataclass(frozen=True, slots=True)
 class TargetCorner:
     x: float
     y: float
 
 
-@dataclass
+class TargetCornerArray(Sequence):
+    """
+    Corners stored as interleaved x, y doubles in a single array instead of one
+    object per corner. Indexing returns a read-only TargetCorner built on access.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: array | Sequence[TargetCorner] = ()):
+        """
+        :param data: either an array('d') of interleaved x, y values, which is used
+                     as is, or TargetCorners to copy
+        """
+        if isinstance(data, array):
+            self._data = data
+        else:
+            self._data = array("d", (value for c in data for value in (c.x, c.y)))
+
+    @classmethod
+    def fromBigEndian(cls, data: memoryview) -> "TargetCornerArray":
+        """Build from interleaved x, y doubles in the packet's big-endian layout."""
+        values = array("d")
+        values.frombytes(data)
+        if sys.byteorder == "little":
+            values.byteswap()
+        return cls(values)
+
+    def getData(self) -> array:
+        """The interleaved x, y values backing this array. Do not modify."""
+        return self._data
+
+    def __len__(self) -> int:
+        return len(self._data) // 2
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("corner index out of range")
+        return TargetCorner(self._data[2 * index], self._data[2 * index + 1])
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TargetCornerArray):
+            return self._data == other._data
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"TargetCornerArray({list(self)!r})"
+
+
+@dataclass(slots=True)
 class PhotonTrackedTarget:
     _MAX_CORNERS = 8
     _NUM_BYTES_IN_FLOAT = 8
@@ -22,9 +94,20 @@ class PhotonTrackedTarget:
     fiducialId: int = -1
     bestCameraToTarget: Transform3d = field(default_factory=Transform3d)
     altCameraToTarget: Transform3d = field(default_factory=Transform3d)
-    minAreaRectCorners: list[TargetCorner] | None = None
-    detectedCorners: list[TargetCorner] | None = None
+    minAreaRectCorners: TargetCornerArray = field(default_factory=TargetCornerArray)
+    detectedCorners: TargetCornerArray = field(default_factory=TargetCornerArray)
     poseAmbiguity: float = 0.0
+    # Bytes of a lazily created target that have not been decoded yet
+    _deferredPacket: Optional[Packet] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        # Corners given as plain lists are packed like decoded ones
+        if not isinstance(self.minAreaRectCorners, TargetCornerArray):
+            self.minAreaRectCorners = TargetCornerArray(self.minAreaRectCorners)
+        if not isinstance(self.detectedCorners, TargetCornerArray):
+            self.detectedCorners = TargetCornerArray(self.detectedCorners)
 
     def getYaw(self) -> float:
         return self.yaw
@@ -44,10 +127,10 @@ class PhotonTrackedTarget:
     def getPoseAmbiguity(self) -> float:
         return self.poseAmbiguity
 
-    def getMinAreaRectCorners(self) -> list[TargetCorner] | None:
+    def getMinAreaRectCorners(self) -> TargetCornerArray:
         return self.minAreaRectCorners
 
-    def getDetectedCorners(self) -> list[TargetCorner] | None:
+    def getDetectedCorners(self) -> TargetCornerArray:
         return self.detectedCorners
 
     def getBestCameraToTarget(self) -> Transform3d:
@@ -56,27 +139,88 @@ class PhotonTrackedTarget:
     def getAlternateCameraToTarget(self) -> Transform3d:
         return self.altCameraToTarget
 
-    def _decodeTargetList(self, packet: Packet, numTargets: int) -> list[TargetCorner]:
-        retList = []
-        for _ in range(numTargets):
-            cx = packet.decodeDouble()
-            cy = packet.decodeDouble()
-            retList.append(TargetCorner(cx, cy))
-        return retList
-
     def createFromPacket(self, packet: Packet) -> Packet:
-        self.yaw = packet.decodeDouble()
-        self.pitch = packet.decodeDouble()
-        self.area = packet.decodeDouble()
-        self.skew = packet.decodeDouble()
-        self.fiducialId = packet.decode32()
-
-        self.bestCameraToTarget = packet.decodeTransform()
-        self.altCameraToTarget = packet.decodeTransform()
-
-        self.poseAmbiguity = packet.decodeDouble()
-
-        self.minAreaRectCorners = self._decodeTargetList(packet, 4)  # always four
-        numCorners = packet.decode8()
-        self.detectedCorners = self._decodeTargetList(packet, numCorners)
-        return packet
\ No newline at end of file
+        self._deferredPacket = None
+        values = packet.decodeStruct(_FIXED_LAYOUT)
+
+        self.yaw, self.pitch, self.area, self.skew, self.fiducialId = values[:5]
+
+        self.bestCameraToTarget = Packet.transformFromDoubles(values[5:12])
+        self.altCameraToTarget = Packet.transformFromDoubles(values[12:19])
+
+        self.poseAmbiguity = values[19]
+
+        self.minAreaRectCorners = TargetCornerArray(array("d", values[20:28]))
+        numCorners = max(values[28], 0)
+        self.detectedCorners = TargetCornerArray.fromBigEndian(
+            packet.decodeBytes(_CORNER_NUM_BYTES * numCorners)
+        )
+        return packet
+
+    def populatePacket(self, packet: Packet) -> Packet:
+        """Append this target to packet, in the layout createFromPacket reads."""
+        minAreaRectCorners = list(self.minAreaRectCorners.getData()[:8])
+        minAreaRectCorners += [0.0] * (8 - len(minAreaRectCorners))
+        packet.encodeStruct(
+            _FIXED_LAYOUT,
+            self.yaw,
+            self.pitch,
+            self.area,
+            self.skew,
+            self.fiducialId,
+            *Packet.transformToDoubles(self.bestCameraToTarget),
+            *Packet.transformToDoubles(self.altCameraToTarget),
+            self.poseAmbiguity,
+            *minAreaRectCorners,
+            len(self.detectedCorners),
+        )
+        packet.encodeDoubleArray(self.detectedCorners.getData())
+        return packet
+
+    @classmethod
+    def createLazyFromPacket(cls, packet: Packet) -> "PhotonTrackedTarget":
+        """Index the next target in packet into a new target. See indexFromPacket.
+
+        :param packet: packet positioned at the start of a serialized target
+
+        :returns: the target, with the packet advanced past it
+        """
+        # Skip the dataclass constructor so no placeholder transforms are built
+        target = cls.__new__(cls)
+        target.indexFromPacket(packet)
+        return target
+
+    def indexFromPacket(self, packet: Packet) -> Packet:
+        """Index the next target in packet, decoding only its scalar fields.
+
+        The transforms and corners are decoded from the packet the first time any
+        of them is read, through either the attribute or its getter.
+
+        :param packet: packet positioned at the start of a serialized target
+        """
+        start = packet.readPos
+        values = packet.decodeStruct(_FIXED_LAYOUT)
+        packet.skip(_CORNER_NUM_BYTES * max(values[28], 0))
+
+        self.yaw, self.pitch, self.area, self.skew, self.fiducialId = values[:5]
+        self.poseAmbiguity = values[19]
+        # Clear anything decoded from a previous packet so it is read from this one
+        for name in _DEFERRED_FIELDS:
+            try:
+                delattr(self, name)
+            except AttributeError:
+                pass
+        self._deferredPacket = packet.slice(start, packet.readPos)
+        return packet
+
+    def __getattr__(self, name: str):
+        # Only reached for attributes that are not set, i.e. the deferred fields
+        # of a lazily created target that have not been read yet
+        packet = self._deferredPacket if name in _DEFERRED_FIELDS else None
+        if packet is None:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        self._deferredPacket = None
+        self.createFromPacket(packet)
+        return getattr(self, name)
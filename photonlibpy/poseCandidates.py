@@ -0,0 +1,211 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from wpimath.geometry import Pose3d, Quaternion, Rotation3d, Translation3d
+
+from photonlibpy.targetColumns import TargetColumns
+
+# Each candidate pair is stored as (alternate, best), the order PhotonLib checks
+# them in, so ties resolve to the same candidate
+ALTERNATE = 0
+BEST = 1
+
+
+def poseToDoubles(pose) -> np.ndarray:
+    """Flatten a Pose3d or Transform3d into translation x, y, z followed by
+    rotation quaternion w, x, y, z."""
+    translation = pose.translation()
+    quaternion = pose.rotation().getQuaternion()
+    return np.array(
+        (
+            translation.x,
+            translation.y,
+            translation.z,
+            quaternion.W(),
+            quaternion.X(),
+            quaternion.Y(),
+            quaternion.Z(),
+        )
+    )
+
+
+def poseFromDoubles(values) -> Pose3d:
+    """Build a Pose3d from translation x, y, z and rotation quaternion w, x, y, z."""
+    x, y, z, qw, qx, qy, qz = (float(value) for value in values)
+    return Pose3d(Translation3d(x, y, z), Rotation3d(Quaternion(qw, qx, qy, qz)))
+
+
+def _normalized(quaternions: np.ndarray) -> np.ndarray:
+    return quaternions / np.linalg.norm(quaternions, axis=-1, keepdims=True)
+
+
+def _multiply(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    aw, ax, ay, az = a[..., 0], a[..., 1], a[..., 2], a[..., 3]
+    bw, bx, by, bz = b[..., 0], b[..., 1], b[..., 2], b[..., 3]
+    return np.stack(
+        (
+            aw * bw - ax * bx - ay * by - az * bz,
+            aw * bx + ax * bw + ay * bz - az * by,
+            aw * by - ax * bz + ay * bw + az * bx,
+            aw * bz + ax * by - ay * bx + az * bw,
+        ),
+        axis=-1,
+    )
+
+
+def _rotationFromOuterProduct() -> np.ndarray:
+    # Every rotation matrix entry is a fixed combination of the products of pairs
+    # of unit quaternion components, so all of them come out of one matrix product
+    # with the flattened outer product of each quaternion with itself
+    w, x, y, z = range(4)
+    entries = (
+        ((1, w, w), (1, x, x), (-1, y, y), (-1, z, z)),
+        ((1, x, y), (1, y, x), (-1, w, z), (-1, z, w)),
+        ((1, x, z), (1, z, x), (1, w, y), (1, y, w)),
+        ((1, x, y), (1, y, x), (1, w, z), (1, z, w)),
+        ((1, w, w), (-1, x, x), (1, y, y), (-1, z, z)),
+        ((1, y, z), (1, z, y), (-1, w, x), (-1, x, w)),
+        ((1, x, z), (1, z, x), (-1, w, y), (-1, y, w)),
+        ((1, y, z), (1, z, y), (1, w, x), (1, x, w)),
+        ((1, w, w), (-1, x, x), (-1, y, y), (1, z, z)),
+    )
+    combination = np.zeros((16, 9))
+    for entry, terms in enumerate(entries):
+        for sign, i, j in terms:
+            combination[4 * i + j, entry] += sign
+    return combination
+
+
+_ROTATION_FROM_OUTER_PRODUCT = _rotationFromOuterProduct()
+
+
+def _rotationMatrices(quaternions: np.ndarray) -> np.ndarray:
+    outer = quaternions[..., :, None] * quaternions[..., None, :]
+    flat = outer.reshape(quaternions.shape[:-1] + (16,)) @ _ROTATION_FROM_OUTER_PRODUCT
+    return flat.reshape(quaternions.shape[:-1] + (3, 3))
+
+
+def _rotate(quaternions: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    # A matrix product is much cheaper than np.cross for small batches
+    return (_rotationMatrices(quaternions) @ vectors[..., None])[..., 0]
+
+
+def compose(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Apply transforms b on top of poses a, like Pose3d.transformBy, row by row."""
+    return np.concatenate(
+        (a[..., :3] + _rotate(a[..., 3:], b[..., :3]), _multiply(a[..., 3:], b[..., 3:])),
+        axis=-1,
+    )
+
+
+def inverse(transforms: np.ndarray) -> np.ndarray:
+    """Invert transforms row by row, like Transform3d.inverse."""
+    conjugate = transforms[..., 3:] * np.array((1.0, -1.0, -1.0, -1.0))
+    return np.concatenate((-_rotate(conjugate, transforms[..., :3]), conjugate), axis=-1)
+
+
+def transformPoints(poses: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Map points given in each pose's own frame into the frame the poses are in."""
+    return poses[..., :3] + _rotate(poses[..., 3:], points)
+
+
+@dataclass
+class PoseCandidates:
+    """The robot poses every target in a frame could imply, computed in one pass.
+
+    Each target with a known field pose gives two candidates, one from its best
+    and one from its alternate camera to target transform. Poses are stored as
+    translation x, y, z followed by rotation quaternion w, x, y, z.
+    """
+
+    targetIndices: np.ndarray
+    """Row of each candidate pair's target in the pipeline result, shape (N,)"""
+
+    poseAmbiguity: np.ndarray
+    """Pose ambiguity of each candidate pair's target, shape (N,)"""
+
+    cameraPoses: np.ndarray
+    """Field to camera poses, alternate then best, shape (N, 2, 7)"""
+
+    robotPoses: np.ndarray
+    """Field to robot poses, alternate then best, shape (N, 2, 7)"""
+
+    def __len__(self) -> int:
+        return len(self.targetIndices)
+
+    @classmethod
+    def fromColumns(
+        cls,
+        columns: TargetColumns,
+        targetIndices,
+        tagPoses,
+        cameraToRobot: np.ndarray,
+    ) -> "PoseCandidates":
+        """Compute the candidates for some of a frame's targets.
+
+        :param columns: the frame's targets
+        :param targetIndices: rows of the targets to use, shape (N,)
+        :param tagPoses: field pose of each of those targets' tags, shape (N, 7)
+        :param cameraToRobot: the inverse of the robot to camera transform, shape (7,)
+        """
+        targetIndices = np.asarray(targetIndices, dtype=np.intp)
+        tagPoses = np.asarray(tagPoses, dtype=np.float64)
+        cameraToTargets = np.stack(
+            (
+                columns.altCameraToTarget[targetIndices],
+                columns.bestCameraToTarget[targetIndices],
+            ),
+            axis=1,
+        )
+        cameraToTargets[..., 3:] = _normalized(cameraToTargets[..., 3:])
+        cameraPoses = compose(tagPoses[:, None, :], inverse(cameraToTargets))
+        robotPoses = compose(cameraPoses, np.broadcast_to(cameraToRobot, cameraPoses.shape))
+        return cls(
+            targetIndices=targetIndices,
+            poseAmbiguity=columns.poseAmbiguity[targetIndices],
+            cameraPoses=cameraPoses,
+            robotPoses=robotPoses,
+        )
+
+    def closestToCameraHeight(self, cameraHeight: float) -> Pose3d:
+        """The robot pose whose camera is closest to the given height off the floor."""
+        return self._closest(np.abs(cameraHeight - self.cameraPoses[..., 2]))
+
+    def closestToTranslation(self, translation: Translation3d) -> Pose3d:
+        """The robot pose closest to a point on the field."""
+        point = np.array((translation.x, translation.y, translation.z))
+        return self._closest(
+            np.linalg.norm(self.robotPoses[..., :3] - point, axis=-1)
+        )
+
+    def averageOfBest(self) -> Optional[Pose3d]:
+        """The average of the best robot poses, weighted by the inverse of each
+        target's ambiguity. A target with no ambiguity at all is used on its own.
+        Targets whose ambiguity was not computed, which PhotonVision reports as -1,
+        are left out, and None is returned if that leaves nothing.
+        """
+        fiducial = self.poseAmbiguity >= 0
+        if not fiducial.any():
+            return None
+        best = self.robotPoses[fiducial, BEST]
+        poseAmbiguity = self.poseAmbiguity[fiducial]
+        exact = np.flatnonzero(poseAmbiguity == 0)
+        if len(exact) > 0:
+            return poseFromDoubles(best[exact[0]])
+
+        weights = 1.0 / poseAmbiguity
+        weights /= weights.sum()
+        translation = weights @ best[:, :3]
+
+        # q and -q are the same rotation, so flip each onto the first one's side
+        # before taking the normalized weighted sum
+        quaternions = best[:, 3:] * np.where(best[:, 3:] @ best[0, 3:] < 0, -1.0, 1.0)[:, None]
+        rotation = _normalized(weights @ quaternions)
+        return poseFromDoubles(np.concatenate((translation, rotation)))
+
+    def _closest(self, distances: np.ndarray) -> Pose3d:
+        # argmin takes the first of equal distances, matching a strict less-than
+        # scan over each target's alternate then best candidate
+        row, candidate = np.unravel_index(np.argmin(distances), distances.shape)
+        return poseFromDoubles(self.robotPoses[row, candidate])
@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from photonlibpy.packet import Packet
+from photonlibpy.photonTrackedTarget import PhotonTrackedTarget
+
+# One serialized target up to its detected corners, as laid out on the wire
+_TARGET_DTYPE = np.dtype(
+    [
+        ("yaw", ">f8"),
+        ("pitch", ">f8"),
+        ("area", ">f8"),
+        ("skew", ">f8"),
+        ("fiducialId", ">i4"),
+        ("best", ">f8", (7,)),
+        ("alt", ">f8", (7,)),
+        ("poseAmbiguity", ">f8"),
+        ("minAreaRectCorners", ">f8", (4, 2)),
+        ("numCorners", "i1"),
+    ]
+)
+_MAX_CORNERS = PhotonTrackedTarget._MAX_CORNERS
+_CORNERS_NUM_BYTES = _MAX_CORNERS * 2 * 8
+
+
+@dataclass
+class TargetColumns:
+    """Every target in a pipeline result, one NumPy array per field.
+
+    Row i of each array describes the same target. Transforms are stored as
+    translation x, y, z followed by rotation quaternion w, x, y, z.
+    """
+
+    fiducialIds: np.ndarray
+    """Fiducial ids, shape (N,)"""
+
+    yaw: np.ndarray
+    """Yaw in degrees, shape (N,)"""
+
+    pitch: np.ndarray
+    """Pitch in degrees, shape (N,)"""
+
+    area: np.ndarray
+    """Area as a percentage of the image, shape (N,)"""
+
+    skew: np.ndarray
+    """Skew, shape (N,)"""
+
+    poseAmbiguity: np.ndarray
+    """Pose ambiguity, -1 for targets that are not fiducials, shape (N,)"""
+
+    bestCameraToTarget: np.ndarray
+    """Best camera to target transforms, shape (N, 7)"""
+
+    altCameraToTarget: np.ndarray
+    """Alternate camera to target transforms, shape (N, 7)"""
+
+    minAreaRectCorners: np.ndarray
+    """Min area rect corners in pixels, shape (N, 4, 2)"""
+
+    detectedCorners: np.ndarray
+    """Detected corners in pixels, padded with NaN past each target's count, shape (N, 8, 2)"""
+
+    numDetectedCorners: np.ndarray
+    """Number of detected corners for each target, shape (N,)"""
+
+    def __len__(self) -> int:
+        return len(self.fiducialIds)
+
+    @classmethod
+    def fromPacket(cls, packet: Packet, targetOffsets: list[int]) -> "TargetColumns":
+        """Build the columns straight from the bytes of a decoded packet.
+
+        :param packet: the packet the targets were decoded from
+        :param targetOffsets: byte offset of each target within the packet
+        """
+        buffer = np.frombuffer(packet.getData(), dtype=np.uint8)
+        offsets = np.asarray(targetOffsets, dtype=np.intp)
+
+        prefixIndex = offsets[:, None] + np.arange(_TARGET_DTYPE.itemsize)
+        prefix = buffer[prefixIndex].view(_TARGET_DTYPE)[:, 0]
+
+        # Read a full set of corner slots for every target, then blank out the
+        # ones past each target's own count. Slots past the end of the packet
+        # are clipped and always blanked.
+        cornerIndex = (offsets[:, None] + _TARGET_DTYPE.itemsize) + np.arange(
+            _CORNERS_NUM_BYTES
+        )
+        corners = (
+            buffer.take(cornerIndex, mode="clip")
+            .view(">f8")
+            .reshape(len(offsets), _MAX_CORNERS, 2)
+            .astype(np.float64)
+        )
+        numCorners = np.clip(prefix["numCorners"], 0, _MAX_CORNERS).astype(np.intp)
+        corners[np.arange(_MAX_CORNERS) >= numCorners[:, None]] = np.nan
+
+        return cls(
+            fiducialIds=prefix["fiducialId"].astype(np.int32),
+            yaw=prefix["yaw"].astype(np.float64),
+            pitch=prefix["pitch"].astype(np.float64),
+            area=prefix["area"].astype(np.float64),
+            skew=prefix["skew"].astype(np.float64),
+            poseAmbiguity=prefix["poseAmbiguity"].astype(np.float64),
+            bestCameraToTarget=prefix["best"].astype(np.float64),
+            altCameraToTarget=prefix["alt"].astype(np.float64),
+            minAreaRectCorners=prefix["minAreaRectCorners"].astype(np.float64),
+            detectedCorners=corners,
+            numDetectedCorners=numCorners,
+        )
+
+    @classmethod
+    def fromTargets(cls, targets: list[PhotonTrackedTarget]) -> "TargetColumns":
+        """Build the columns from already decoded targets.
+
+        :param targets: the targets to gather, in row order
+        """
+        n = len(targets)
+        columns = cls(
+            fiducialIds=np.array([t.fiducialId for t in targets], dtype=np.int32),
+            yaw=np.array([t.yaw for t in targets], dtype=np.float64),
+            pitch=np.array([t.pitch for t in targets], dtype=np.float64),
+            area=np.array([t.area for t in targets], dtype=np.float64),
+            skew=np.array([t.skew for t in targets], dtype=np.float64),
+            poseAmbiguity=np.array([t.poseAmbiguity for t in targets], dtype=np.float64),
+            bestCameraToTarget=np.empty((n, 7)),
+            altCameraToTarget=np.empty((n, 7)),
+            minAreaRectCorners=np.full((n, 4, 2), np.nan),
+            detectedCorners=np.full((n, _MAX_CORNERS, 2), np.nan),
+            numDetectedCorners=np.zeros(n, dtype=np.intp),
+        )
+
+        for i, target in enumerate(targets):
+            columns.bestCameraToTarget[i] = Packet.transformToDoubles(target.bestCameraToTarget)
+            columns.altCameraToTarget[i] = Packet.transformToDoubles(target.altCameraToTarget)
+            for j, corner in enumerate(target.minAreaRectCorners[:4]):
+                columns.minAreaRectCorners[i, j] = (corner.x, corner.y)
+            detectedCorners = target.detectedCorners[:_MAX_CORNERS]
+            columns.numDetectedCorners[i] = len(detectedCorners)
+            for j, corner in enumerate(detectedCorners):
+                columns.detectedCorners[i, j] = (corner.x, corner.y)
+
+        return columns
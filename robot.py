@@ -1,21 +1,70 @@
-import wpilib
-from subsystems.drivetrain import SwerveDrive
-from subsystems.shooter import Shooter
-from subsystems.arm import Arm
-from subsystems.photoelectric_sensor import PhotoelectricSensor
-from subsystems.vision import Vision
+import os
+from subsystems.startup_profiler import StartupProfiler
+
+# Set STARTUP_PROFILE=1 to print how long each import and subsystem takes.
+profiler = StartupProfiler(os.environ.get("STARTUP_PROFILE") == "1")
+
+with profiler.measure("import wpilib"):
+    import wpilib
 
 class TheRinger(wpilib.TimedRobot):
     def robotInit(self):
         # Set brownout voltage
         wpilib.RobotController.setBrownoutVoltage(6.3)
 
+        # Import the subsystems here rather than when robot.py is loaded, so loading robot.py stays fast and each import is in the startup profile.
+        with profiler.measure("import wpimath.geometry"):
+            from wpimath.geometry import Pose2d
+        with profiler.measure("import subsystems.telemetry"):
+            from subsystems.telemetry import telemetry
+        with profiler.measure("import subsystems.actuator_output"):
+            from subsystems.actuator_output import get_write_totals
+        with profiler.measure("import subsystems.device_configurator"):
+            from subsystems.device_configurator import device_configurator
+        with profiler.measure("import subsystems.drivetrain"):
+            from subsystems.drivetrain import SwerveDrive
+        with profiler.measure("import subsystems.shooter"):
+            from subsystems.shooter import Shooter
+        with profiler.measure("import subsystems.arm"):
+            from subsystems.arm import Arm
+        with profiler.measure("import subsystems.photoelectric_sensor"):
+            from subsystems.photoelectric_sensor import PhotoelectricSensor
+        with profiler.measure("import subsystems.vision"):
+            from subsystems.vision import Vision
+        with profiler.measure("import subsystems.odometry"):
+            from subsystems.odometry import Odometry
+
         # Initialize components
-        self.drivetrain = SwerveDrive()
-        self.shooter = Shooter(40, 41, 42, True, False, False)
-        self.arm = Arm(50, 51, True, False, 0, 0.16469017911725448)
-        self.photoelectric_sensor = PhotoelectricSensor(1)
-        self.vision = Vision()
+        with profiler.measure("SwerveDrive()"):
+            self.drivetrain = SwerveDrive()
+        with profiler.measure("Shooter()"):
+            self.shooter = Shooter(40, 41, 42, True, False, False)
+        with profiler.measure("Arm()"):
+            self.arm = Arm(50, 51, True, False, 0, 0.16469017911725448)
+        with profiler.measure("PhotoelectricSensor()"):
+            self.photoelectric_sensor = PhotoelectricSensor(1)
+        with profiler.measure("Vision()"):
+            self.vision = Vision()
+
+        # Configure every motor at once, then read the steering motors again now that they are configured.
+        with profiler.measure("Device configuration"):
+            device_configurator.configure_all(verbose = profiler.enabled)
+            self.drivetrain.determine_steering_motor_offsets()
+
+        with profiler.measure("Odometry()"):
+            self.odometry = Odometry(self.drivetrain)
+        self.telemetry = telemetry
+        self.device_config_time_entry = telemetry.add_double("Device Config Time (ms)", round(device_configurator.total_seconds * 1000, 1))
+        self.robot_pose_entry = telemetry.add_struct("Robot Pose", Pose2d, self.odometry.get_pose())
+
+        # Show how many motor commands were sent and how many were skipped as unchanged, to see the CAN traffic saved.
+        self.get_write_totals = get_write_totals
+        self.can_writes_sent_entry = telemetry.add_double("CAN Writes Sent")
+        self.can_writes_suppressed_entry = telemetry.add_double("CAN Writes Suppressed")
+
+        # Sample the Swerve Modules faster than the robot loop on the real robot.
+        if wpilib.RobotBase.isReal():
+            self.drivetrain.start_odometry_thread(self.odometry)
 
         # Initialize controllers
         self.drivetrain_controller = wpilib.XboxController(0)
@@ -44,6 +93,28 @@ class TheRinger(wpilib.TimedRobot):
         # State of autonomous
         self.autonomous_state = "None"
 
+        profiler.report()
+
+    def robotPeriodic(self):
+        # Read the Swerve Modules once for the whole loop.
+        self.drivetrain.refresh_signals()
+
+        # Track the robot's pose, correcting it with vision when AprilTags are seen.
+        if not self.drivetrain.is_odometry_thread_running():
+            self.odometry.update()
+        estimated_robot_pose = self.vision.get_estimated_robot_pose()
+        if estimated_robot_pose is not None:
+            self.odometry.add_vision_measurement(estimated_robot_pose.estimatedPose.toPose2d(), estimated_robot_pose.timestampSeconds)
+        self.robot_pose_entry.set(self.odometry.get_pose())
+
+        # Report the motor commands sent and skipped so far.
+        sent, suppressed = self.get_write_totals()
+        self.can_writes_sent_entry.set(sent)
+        self.can_writes_suppressed_entry.set(suppressed)
+
+        # Send everything the subsystems published this loop.
+        self.telemetry.publish()
+
     def autonomousInit(self):
         # Reset timers
         self.timer.restart()
@@ -73,6 +144,7 @@ class TheRinger(wpilib.TimedRobot):
         # Reset Drivetrain
         self.drivetrain.reset_drivetrain()
         self.drivetrain.reset_gyro()
+        self.odometry.reset_pose()
             
         # Reset shooter
         self.shooter.reset()
@@ -172,6 +244,7 @@ class TheRinger(wpilib.TimedRobot):
         # Reset Drivetrain
         self.drivetrain.reset_drivetrain()
         self.drivetrain.reset_gyro()
+        self.odometry.reset_pose()
         
         # Reset shooter
         self.shooter.reset()
@@ -192,6 +265,7 @@ class TheRinger(wpilib.TimedRobot):
         if self.drivetrain_controller.getAButtonPressed() and self.drivetrain_controller.getLeftBumperPressed() and self.drivetrain_controller.getRightBumperPressed():
             self.drivetrain.stop_robot()
             self.drivetrain.reset_gyro()
+            self.odometry.reset_pose()
             self.drivetrain_timer.restart()
             self.drivetrain.change_drivetrain_state("Resetting Gyro")
         
@@ -0,0 +1,83 @@
+import wpilib
+from weakref import WeakSet
+
+# Every output created, for reporting how many writes were saved.
+_outputs = WeakSet()
+
+class ActuatorOutput():
+    """Sends a motor's commands only when they change, so the same control request is not resent every loop."""
+
+    def __init__(self, name, send, deadband=0.0, keep_alive=0.25):
+        """
+        Constructor for Actuator Output.
+
+        :param name: Name of the device, used when reporting write counts.
+        :type name: str
+        :param send: Function that sends a command to the device, usually by updating a preallocated control request.
+        :type send: function
+        :param deadband: Commands within this much of the last command sent are not sent.
+        :type deadband: float
+        :param keep_alive: Seconds after which the last command is sent again even if it has not changed.
+        :type keep_alive: float
+        """
+        self.name = name
+        self.send = send
+        self.deadband = deadband
+        self.keep_alive = keep_alive
+        self.last_value = None
+        self.last_send_time = 0
+        self.sent_count = 0
+        self.suppressed_count = 0
+        _outputs.add(self)
+
+    def set(self, value, force=False):
+        """
+        Send a command to the device unless it is within the deadband of the last command sent.
+
+        :param value: Command to send, in the units the send function expects.
+        :type value: float
+        :param force: Send the command even if it has not changed.
+        :type force: bool
+        :return: Whether the command was sent.
+        :rtype: bool
+        """
+        now = wpilib.Timer.getFPGATimestamp()
+        if (not force and self.last_value is not None
+                and abs(value - self.last_value) <= self.deadband
+                and now - self.last_send_time < self.keep_alive):
+            self.suppressed_count += 1
+            return False
+
+        self.send(value)
+        self.last_value = value
+        self.last_send_time = now
+        self.sent_count += 1
+        return True
+
+    def invalidate(self):
+        """
+        Forget the last command sent so the next one is always sent. Call this after commanding the device some other way.
+        """
+        self.last_value = None
+
+def get_write_counts():
+    """
+    Get how many commands every actuator output has sent and suppressed.
+
+    :return: Sent and suppressed counts by device name.
+    :rtype: dict
+    """
+    return {output.name: (output.sent_count, output.suppressed_count) for output in _outputs}
+
+def get_write_totals():
+    """
+    Get how many commands all actuator outputs together have sent and suppressed.
+
+    :return: Sent and suppressed counts.
+    :rtype: tuple
+    """
+    sent = suppressed = 0
+    for output in _outputs:
+        sent += output.sent_count
+        suppressed += output.suppressed_count
+    return sent, suppressed
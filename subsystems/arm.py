@@ -4,6 +4,9 @@ from wpilib import DutyCycleEncoder
 from wpimath.controller import ProfiledPIDController
 from wpimath.trajectory import TrapezoidProfile
 from math import pi, cos
+from .actuator_output import ActuatorOutput
+from .telemetry import telemetry
+from .device_configurator import device_configurator
 
 class Arm():
     """Class for controlling arm on robot."""
@@ -46,13 +49,19 @@ class Arm():
         # Arm Configs
         self.current_angle = None
         self.arm_setpoint = None
-        self.arm_angle_entry = Shuffleboard.getTab("Drivers").add(f"Arm Angle", "None").withSize(2, 2).getEntry()
-        self.arm_setpoint_entry = Shuffleboard.getTab("Drivers").add(f"Arm Setpoint", "0").withSize(2, 2).getEntry()
+        self.arm_angle_entry = telemetry.add_widget("Drivers", "Arm Angle", 0.0)
+        self.arm_setpoint_entry = telemetry.add_widget("Drivers", "Arm Setpoint", 0.0)
         
-        self._configure_arm_motor(self.left_motor, left_motor_inverted)
-        self._configure_arm_motor(self.right_motor, right_motor_inverted)
+        self._configure_arm_motor("Arm Left Motor", self.left_motor, left_motor_inverted)
+        self._configure_arm_motor("Arm Right Motor", self.right_motor, right_motor_inverted)
 
-    def _configure_arm_motor(self, motor, inverted_module):
+        # Control requests, reused every loop
+        self.left_voltage_request = phoenix6.controls.VoltageOut(0)
+        self.right_voltage_request = phoenix6.controls.VoltageOut(0)
+        self.left_motor_output = ActuatorOutput("Arm Left Motor", self._send_left_motor_voltage, deadband = 0.01)
+        self.right_motor_output = ActuatorOutput("Arm Right Motor", self._send_right_motor_voltage, deadband = 0.01)
+
+    def _configure_arm_motor(self, name, motor, inverted_module):
         # Arm Motor Configs
         talonfx_configs = phoenix6.configs.TalonFXConfiguration()
         
@@ -60,8 +69,14 @@ class Arm():
         if inverted_module:
             talonfx_configs.motor_output.inverted = phoenix6.signals.InvertedValue.CLOCKWISE_POSITIVE
 
-        # Apply the configs to the driving motor
-        motor.configurator.apply(talonfx_configs) 
+        # Apply the configs to the arm motor along with every other device
+        device_configurator.add_talonfx(name, motor, talonfx_configs)
+
+    def _send_left_motor_voltage(self, voltage):
+        self.left_motor.set_control(self.left_voltage_request.with_output(voltage))
+
+    def _send_right_motor_voltage(self, voltage):
+        self.right_motor.set_control(self.right_voltage_request.with_output(voltage))
 
     def _get_encoder_value(self):
         return (self.encoder.getAbsolutePosition() * -1) + 1
@@ -89,7 +104,7 @@ class Arm():
         #self.arm_controller.setPID(self.p_widget.getFloat(0.0), self.i_widget.getFloat(0.0), self.d_widget.getFloat(0.0))
         self.arm_controller.setGoal(self.encoder_0_position + (angle / 360))
         self.arm_setpoint = angle
-        self.arm_setpoint_entry.setString(str(angle))
+        self.arm_setpoint_entry.set(angle)
 
     def set_carry_position(self):
         """
@@ -139,12 +154,12 @@ class Arm():
         motor_speed = self.arm_controller.calculate(encoder_position)
 
         angle = encoder_position - self.encoder_0_position
-        self.arm_angle_entry.setString(f"{angle * 360}") 
+        self.arm_angle_entry.set(angle * 360)
 
         angle_radians = 2.0 * pi * angle
         feedforward = (self.gravity_gain * cos(angle_radians))
 
         desired_voltage = motor_speed + feedforward
 
-        self.left_motor.set_control(phoenix6.controls.VoltageOut(desired_voltage))
-        self.right_motor.set_control(phoenix6.controls.VoltageOut(desired_voltage))
\ No newline at end of file
+        self.left_motor_output.set(desired_voltage)
+        self.right_motor_output.set(desired_voltage)
\ No newline at end of file
@@ -0,0 +1,143 @@
+import phoenix5
+import phoenix6
+import wpilib
+from concurrent.futures import ThreadPoolExecutor
+from math import isclose
+from time import perf_counter
+
+# Steps that TalonFXs store these configs in, measured by reading back applied configs.
+_CONFIG_STEPS = {
+    "k_s": 1 / 1024,
+    "k_g": 1 / 1024,
+    "duty_cycle_neutral_deadband": 1 / 1024,
+    "peak_forward_duty_cycle": 1 / 1024,
+    "peak_reverse_duty_cycle": 1 / 1024,
+    "peak_differential_duty_cycle": 1 / 1024,
+    "stator_current_limit": 0.1,
+    "supply_current_limit": 0.1,
+    "peak_forward_torque_current": 0.1,
+    "peak_reverse_torque_current": 0.1,
+    "peak_differential_torque_current": 0.1,
+    "peak_forward_voltage": 0.01,
+    "peak_reverse_voltage": 0.01,
+    "torque_neutral_deadband": 0.01,
+}
+
+# Every other number is stored to within this fraction of its value.
+_CONFIG_RELATIVE_STEP = 2 ** -13
+
+def _configs_match(desired_config, stored_config):
+    """
+    Check whether a TalonFX's stored configuration already matches the desired one.
+    Numbers match when they are within half of the step the device stores them in, so any change the device can store is applied.
+    """
+    for group_name, desired_group in vars(desired_config).items():
+        if group_name == "future_proof_configs":
+            continue
+        stored_group = getattr(stored_config, group_name)
+        for name, desired_value in vars(desired_group).items():
+            stored_value = getattr(stored_group, name)
+            if isinstance(desired_value, (int, float)) and not isinstance(desired_value, bool):
+                step = _CONFIG_STEPS.get(name)
+                if step is None:
+                    matches = isclose(desired_value, stored_value, rel_tol=_CONFIG_RELATIVE_STEP / 2, abs_tol=1e-9)
+                else:
+                    matches = abs(desired_value - stored_value) <= step / 2 + 1e-9
+                if not matches:
+                    return False
+            elif desired_value != stored_value:
+                return False
+    return True
+
+class DeviceConfigurator():
+    """Applies every motor's configuration at once on a thread pool, skipping motors that already have it."""
+
+    def __init__(self, max_workers=12, timeout=0.1):
+        """
+        Constructor for Device Configurator.
+
+        :param max_workers: Most devices configured at the same time.
+        :type max_workers: int
+        :param timeout: Seconds to wait for each device to respond to a read or write.
+        :type timeout: float
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.devices = []
+        self.report = {}
+        self.total_seconds = 0
+
+    def add_talonfx(self, name, motor, config):
+        """
+        Add a TalonFX to configure.
+
+        :param name: Name of the device, used in the report.
+        :type name: str
+        :param motor: The TalonFX.
+        :type motor: phoenix6.hardware.TalonFX
+        :param config: Full configuration for the TalonFX.
+        :type config: phoenix6.configs.TalonFXConfiguration
+        """
+        self.devices.append((name, self._configure_talonfx, (motor, config)))
+
+    def add_victorspx(self, name, motor, voltage_compensation):
+        """
+        Add a VictorSPX to configure.
+
+        :param name: Name of the device, used in the report.
+        :type name: str
+        :param motor: The VictorSPX.
+        :type motor: phoenix5.VictorSPX
+        :param voltage_compensation: Voltage the motor's output is scaled to.
+        :type voltage_compensation: float
+        """
+        self.devices.append((name, self._configure_victorspx, (motor, voltage_compensation)))
+
+    def _configure_talonfx(self, motor, config):
+        stored_config = phoenix6.configs.TalonFXConfiguration()
+        if motor.configurator.refresh(stored_config, self.timeout).is_ok() and _configs_match(config, stored_config):
+            return "Skipped"
+        return "Applied" if motor.configurator.apply(config, self.timeout).is_ok() else "Failed"
+
+    def _configure_victorspx(self, motor, voltage_compensation):
+        timeout_ms = int(self.timeout * 1000)
+        stored_voltage_compensation = motor.configGetParameter(phoenix5.ParamEnum.eNominalBatteryVoltage, 0, timeout_ms)
+        if isclose(stored_voltage_compensation, voltage_compensation, abs_tol=0.01):
+            return "Skipped"
+        error = motor.configVoltageCompSaturation(voltage_compensation, timeout_ms)
+        return "Applied" if error == phoenix5.ErrorCode.OK else "Failed"
+
+    def _configure(self, configure, arguments):
+        start = perf_counter()
+        result = configure(*arguments)
+        return result, perf_counter() - start
+
+    def configure_all(self, verbose=False):
+        """
+        Configure every device added so far at the same time. Devices that fail are reported to the Driver Station.
+        How each device went and how long it took is kept in report.
+
+        :param verbose: Whether to print the report.
+        :type verbose: bool
+        :return: Whether every device was configured.
+        :rtype: bool
+        """
+        start = perf_counter()
+        self.report = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [(name, executor.submit(self._configure, configure, arguments)) for name, configure, arguments in self.devices]
+            for name, future in futures:
+                self.report[name] = future.result()
+        self.devices.clear()
+        self.total_seconds = perf_counter() - start
+
+        for name, (result, seconds) in self.report.items():
+            if result == "Failed":
+                wpilib.reportWarning(f"Device config: {name} could not be configured")
+            if verbose:
+                print(f"Device config: {name}: {result} in {seconds * 1000:.1f} ms")
+        if verbose:
+            print(f"Device config: {len(self.report)} devices in {self.total_seconds * 1000:.1f} ms")
+        return all(result != "Failed" for result, _ in self.report.values())
+
+device_configurator = DeviceConfigurator()
@@ -1,9 +1,16 @@
 from wpimath.geometry import Translation2d, Rotation2d
 from wpimath.controller import PIDController
-from wpilib.shuffleboard import Shuffleboard
-from wpimath.kinematics import SwerveDrive4Kinematics, ChassisSpeeds
+from wpimath.kinematics import SwerveDrive4Kinematics
 from .swerve_module import SwerveModule
+from .swerve_kinematics import SwerveKinematics
+from .telemetry import telemetry
+from .status_signals import StatusSignalRegistry
+from .odometry_thread import OdometryThread, PhoenixSignalSource, MockSignalSource
+from contextlib import nullcontext
+from math import radians
 import navx 
+import numpy as np
+import wpilib
 
 class SwerveDrive():
     """Class for controlling Swerve Drive on robot."""
@@ -25,13 +32,27 @@ class SwerveDrive():
         self.back_left_module = SwerveModule("BL", 22, 12, 32, "CANivore", "CANivore", "rio", -0.474609, False)
         self.back_right_module = SwerveModule("BR", 21, 11, 31, "CANivore", "CANivore", "rio", -0.011475, True)
 
+        # Swerve Modules indexed in the same order as the kinematics.
+        self.modules = (self.front_left_module, self.front_right_module, self.back_left_module, self.back_right_module)
+        self.swerve_kinematics = SwerveKinematics((front_left_location, front_right_location, back_left_location, back_right_location), 5.21208)
+        self.module_angles = np.zeros(len(self.modules))
+
+        # Register every status signal read from the Swerve Modules and stop the devices sending the rest.
+        signal_frequencies = {"odometry": 250, "steering_offset": 10}
+        self.status_signals = StatusSignalRegistry()
+        for module in self.modules:
+            for group, bus, signals in module.get_status_signals():
+                self.status_signals.register(group, bus, signals, signal_frequencies[group])
+            self.status_signals.add_devices(module.get_devices())
+        self.status_signals.optimize_bus_utilization()
+
         # Initialize Gyro
         self.gyro = navx.AHRS.create_spi()
-        self.drivers_tab_gyro = Shuffleboard.getTab("Drivers").add(f"Current Robot Angle (From Gyro)", round(self.get_current_robot_angle(), 2)).withSize(2, 2).getEntry()
+        self.drivers_tab_gyro = telemetry.add_widget("Drivers", "Current Robot Angle (From Gyro)", self.get_current_robot_angle())
 
         # Max Drivetrain speed
         self.max_drivetrain_speed = 0.25
-        self.drivers_tab_speed = Shuffleboard.getTab("Drivers").add(f"Max Swerve Drive Speed", self.max_drivetrain_speed).withSize(2, 2).getEntry()
+        self.drivers_tab_speed = telemetry.add_widget("Drivers", "Max Swerve Drive Speed", self.max_drivetrain_speed)
 
         # Pid Controller for Aligning to Speaker
         self.align_to_speaker_controller = PIDController(1/20, 0, 0)
@@ -40,38 +61,68 @@ class SwerveDrive():
 
         # Drivetrain state
         self.drivetrain_state = "Disabled"
-        self.drivers_tab_state = Shuffleboard.getTab("Drivers").add(f"Swerve Drive State", self.drivetrain_state).withSize(2, 2).getEntry()
+        self.drivers_tab_state = telemetry.add_widget("Drivers", "Swerve Drive State", self.drivetrain_state)
+
+        # Background odometry, off until started
+        self.odometry_thread = None
 
     def reset_drivetrain(self):
         """
         Reset Swerve Modules.
         """
-        self.front_left_module.reset()
-        self.front_right_module.reset()
-        self.back_left_module.reset()
-        self.back_right_module.reset()
+        with self._odometry_thread_paused():
+            self.status_signals.refresh()
+            for module in self.modules:
+                module.reset()
         self.change_drivetrain_state("Enabled")
 
+    def determine_steering_motor_offsets(self):
+        """
+        Determine every Swerve Module's steering motor offset. Call this once the motors are configured.
+        The offsets are left unchanged if the steering motor and CANcoder positions could not be refreshed.
+
+        :return: Whether the offsets were determined.
+        :rtype: bool
+        """
+        with self._odometry_thread_paused():
+            if not self.status_signals.refresh(("odometry", "steering_offset")):
+                return False
+            for module in self.modules:
+                module.determine_steering_motor_offset()
+            return True
+
+    def refresh_signals(self):
+        """
+        Refresh every status signal read from the Swerve Modules with one call per CAN bus. Call this once per loop before reading the modules.
+        The odometry signals are left to the odometry thread while it is running.
+
+        :return: Whether every signal refreshed without error.
+        :rtype: bool
+        """
+        if self.is_odometry_thread_running():
+            return self.status_signals.refresh(("steering_offset",))
+        return self.status_signals.refresh()
+
     def reset_gyro(self):
         """
         Reset Gyro.
         """
         self.gyro.reset()
-        self.drivers_tab_gyro.setFloat(0)
+        self.drivers_tab_gyro.set(0.0)
 
     def change_max_drivetrain_speed(self, speed):
         """
         Change max drivetrain speed.
         """
         self.max_drivetrain_speed = speed
-        self.drivers_tab_speed.setFloat(self.max_drivetrain_speed)
+        self.drivers_tab_speed.set(self.max_drivetrain_speed)
 
     def change_drivetrain_state(self, state):
         """
         Change the drivetrain's state.
         """
         self.drivetrain_state = state
-        self.drivers_tab_state.setString(self.drivetrain_state)
+        self.drivers_tab_state.set(self.drivetrain_state)
 
     def get_drivetrain_state(self):
         """
@@ -111,6 +162,66 @@ class SwerveDrive():
 
         return current_robot_angle
 
+    def get_gyro_rotation(self):
+        """
+        Get the robot's heading from the gyro, counterclockwise positive.
+        """
+        return Rotation2d.fromDegrees(self.gyro.getAngle() * -1)
+
+    def get_module_positions(self):
+        """
+        Get the positions of the Swerve Modules in the same order as the kinematics, as of the last refresh_signals call.
+        While the odometry thread runs, this is as of the last update it made instead.
+        """
+        if self.is_odometry_thread_running():
+            module_positions = self.odometry_thread.get_module_positions()
+            if module_positions is not None:
+                return module_positions
+        with self._odometry_thread_paused():
+            return tuple(module.get_position() for module in self.modules)
+
+    def start_odometry_thread(self, odometry, frequency=250, signal_source=None):
+        """
+        Start updating odometry on a background thread every time the Swerve Modules send new positions.
+
+        :param odometry: Odometry to update. Stop updating it from the robot loop while the thread runs.
+        :type odometry: subsystems.odometry.Odometry
+        :param frequency: Rate the module positions are sent at in hertz.
+        :type frequency: float
+        :param signal_source: Where module positions are read from. Defaults to the modules' status signals, or a mock source in simulation.
+        :type signal_source: subsystems.odometry_thread.PhoenixSignalSource or subsystems.odometry_thread.MockSignalSource
+        """
+        self.stop_odometry_thread()
+        if signal_source is None:
+            if wpilib.RobotBase.isSimulation():
+                signal_source = MockSignalSource(frequency)
+            else:
+                signal_source = PhoenixSignalSource(self.modules, self.get_gyro_rotation, frequency)
+        self.odometry_thread = OdometryThread(odometry, signal_source, frequency)
+        self.odometry_thread.start()
+
+    def stop_odometry_thread(self):
+        """
+        Stop the background odometry thread if it is running.
+        """
+        if self.odometry_thread is not None:
+            self.odometry_thread.stop()
+            self.odometry_thread = None
+
+    def is_odometry_thread_running(self):
+        """
+        Get whether the background odometry thread is running.
+        """
+        return self.odometry_thread is not None and self.odometry_thread.is_running()
+
+    def _odometry_thread_paused(self):
+        """
+        Hold the odometry thread, if there is one, between updates while the robot loop uses the odometry status signals.
+        """
+        if self.odometry_thread is None:
+            return nullcontext()
+        return self.odometry_thread.paused()
+
     def move_robot(self, forward_speed, strafe_speed, rotation_speed):
         """
         Move the robot by a forward speed, strafe speed, and rotation speed.
@@ -118,30 +229,23 @@ class SwerveDrive():
         Strafe speed is positive toward the left field boundary.
         Rotation speed is positive in the counterclockwise direction.
         """
-        # Get desired Swerve Modules' speeds and angles.
+        # Get desired Swerve Modules' speeds and angles, reversing any module that would turn more than 90 degrees.
         current_robot_angle = self.get_current_robot_angle()
-        self.drivers_tab_gyro.setFloat(round(current_robot_angle, 2))
-        robot_speeds = ChassisSpeeds.fromFieldRelativeSpeeds(forward_speed * 5.21208, strafe_speed * 5.21208, rotation_speed * 14.6934998988, Rotation2d.fromDegrees(current_robot_angle))
-        front_left_module_state, front_right_module_state, back_left_module_state, back_right_module_state = self.kinematics.desaturateWheelSpeeds(self.kinematics.toSwerveModuleStates(robot_speeds), 5.21208)
-        
-        # Optimize desired Swerve Modules' angles.
-        front_left_module_state = front_left_module_state.optimize(front_left_module_state, self.front_left_module.current_angle)
-        front_right_module_state = front_right_module_state.optimize(front_right_module_state, self.front_right_module.current_angle)
-        back_left_module_state = back_left_module_state.optimize(back_left_module_state, self.back_left_module.current_angle)
-        back_right_module_state = back_right_module_state.optimize(back_right_module_state, self.back_right_module.current_angle)
+        self.drivers_tab_gyro.set(current_robot_angle)
+        for index, module in enumerate(self.modules):
+            self.module_angles[index] = module.current_angle
+        np.radians(self.module_angles, out=self.module_angles)
+        module_speeds, module_angles = self.swerve_kinematics.calculate(forward_speed * 5.21208, strafe_speed * 5.21208, rotation_speed * 14.6934998988, radians(current_robot_angle), self.module_angles)
+        np.degrees(module_angles, out=self.module_angles)
 
         # Set the Swerve Modules to the desired speeds and angles.
-        self.front_left_module.set(self.max_drivetrain_speed * front_left_module_state.speed, front_left_module_state.angle)
-        self.front_right_module.set(self.max_drivetrain_speed * front_right_module_state.speed, front_right_module_state.angle)
-        self.back_left_module.set(self.max_drivetrain_speed * back_left_module_state.speed, back_left_module_state.angle)
-        self.back_right_module.set(self.max_drivetrain_speed * back_right_module_state.speed, back_right_module_state.angle)
+        for index, module in enumerate(self.modules):
+            module.set(self.max_drivetrain_speed * module_speeds[index], self.module_angles[index])
 
     def stop_robot(self):
         """
         Stop moving the robot and hold its current position.
         """
         # Stop all of the Swerve Modules. 
-        self.front_left_module.stop()
-        self.front_right_module.stop()
-        self.back_left_module.stop()
-        self.back_right_module.stop()
\ No newline at end of file
+        for module in self.modules:
+            module.stop()
\ No newline at end of file
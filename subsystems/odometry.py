@@ -0,0 +1,141 @@
+import wpilib
+from math import sqrt
+from threading import Lock
+from wpimath.geometry import Twist2d
+from wpimath.kinematics import SwerveDrive4Odometry
+from .pose_history import PoseHistory
+
+class Odometry():
+    """Class for tracking the robot's pose on the field from the swerve modules, the gyro, and vision."""
+
+    def __init__(self, drivetrain, history_size=512, max_vision_delay=1.5, state_std_devs=(0.1, 0.1, 0.1), vision_std_devs=(0.9, 0.9, 0.9)):
+        """
+        Constructor for Odometry.
+
+        :param drivetrain: Swerve Drive to read module positions and the gyro from.
+        :type drivetrain: subsystems.drivetrain.SwerveDrive
+        :param history_size: Number of past poses kept for applying delayed vision measurements.
+        :type history_size: int
+        :param max_vision_delay: Vision measurements older than this many seconds are ignored.
+        :type max_vision_delay: float
+        :param state_std_devs: Trust in odometry as standard deviations of x and y in meters and heading in radians.
+        :type state_std_devs: tuple
+        :param vision_std_devs: Trust in vision as standard deviations of x and y in meters and heading in radians.
+        :type vision_std_devs: tuple
+        """
+        self.drivetrain = drivetrain
+        # Guards the pose when an odometry thread updates it alongside the robot loop.
+        self.lock = Lock()
+        self.max_vision_delay = max_vision_delay
+        self.pose_history = PoseHistory(history_size)
+        self.set_vision_std_devs(state_std_devs, vision_std_devs)
+
+        self.gyro_angle = self.drivetrain.get_gyro_rotation()
+        self.module_positions = self.drivetrain.get_module_positions()
+        self.odometry = SwerveDrive4Odometry(self.drivetrain.kinematics, self.gyro_angle, self.module_positions)
+        self.pose = self.odometry.getPose()
+
+    def set_vision_std_devs(self, state_std_devs, vision_std_devs):
+        """
+        Set how much vision measurements are trusted compared to odometry.
+
+        :param state_std_devs: Trust in odometry as standard deviations of x and y in meters and heading in radians.
+        :type state_std_devs: tuple
+        :param vision_std_devs: Trust in vision as standard deviations of x and y in meters and heading in radians.
+        :type vision_std_devs: tuple
+        """
+        # Same steady state gain per axis as WPILib's pose estimators.
+        self.vision_gains = []
+        for state_std_dev, vision_std_dev in zip(state_std_devs, vision_std_devs):
+            q = state_std_dev ** 2
+            r = vision_std_dev ** 2
+            self.vision_gains.append(q / (q + sqrt(q * r)) if q > 0 else 0)
+
+    def update(self, timestamp=None, gyro_angle=None, module_positions=None):
+        """
+        Update the robot's pose from the swerve modules and gyro and record it in the pose history.
+
+        :param timestamp: FPGA time in seconds the sensors were read at. Defaults to now.
+        :type timestamp: float
+        :param gyro_angle: Robot heading read at that time. Defaults to reading the gyro.
+        :type gyro_angle: wpimath.geometry.Rotation2d
+        :param module_positions: Swerve Module positions read at that time. Defaults to reading the modules.
+        :type module_positions: tuple
+        :return: The robot's new pose.
+        :rtype: wpimath.geometry.Pose2d
+        """
+        if timestamp is None:
+            timestamp = wpilib.Timer.getFPGATimestamp()
+        if gyro_angle is None:
+            gyro_angle = self.drivetrain.get_gyro_rotation()
+        if module_positions is None:
+            module_positions = self.drivetrain.get_module_positions()
+
+        with self.lock:
+            self.gyro_angle = gyro_angle
+            self.module_positions = module_positions
+            self.pose = self.odometry.update(self.gyro_angle, self.module_positions)
+            self.pose_history.add(timestamp, self.pose)
+            return self.pose
+
+    def add_vision_measurement(self, vision_pose, timestamp):
+        """
+        Correct the robot's pose with a pose measured by vision.
+        The measurement is compared with where odometry had the robot when the camera frame was captured, not where it is now.
+
+        :param vision_pose: Robot pose measured by vision.
+        :type vision_pose: wpimath.geometry.Pose2d
+        :param timestamp: FPGA time in seconds the camera frame was captured at.
+        :type timestamp: float
+        :return: Whether the measurement was applied. Measurements older than the pose history are dropped.
+        :rtype: bool
+        """
+        if timestamp < wpilib.Timer.getFPGATimestamp() - self.max_vision_delay:
+            return False
+
+        with self.lock:
+            measured_pose = self.pose_history.sample(timestamp)
+            if measured_pose is None:
+                return False
+
+            # Move part of the way from the odometry pose at capture time toward the vision pose.
+            twist = measured_pose.log(vision_pose)
+            corrected_pose = measured_pose.exp(Twist2d(
+                self.vision_gains[0] * twist.dx,
+                self.vision_gains[1] * twist.dy,
+                self.vision_gains[2] * twist.dtheta,
+            ))
+
+            # Carry the correction through everything odometry measured since the frame was captured.
+            correction_start = min(timestamp, self.pose_history.get_newest_timestamp())
+            self.pose_history.correct_since(correction_start, measured_pose, corrected_pose)
+            self.pose = corrected_pose.transformBy(self.pose - measured_pose)
+            self.odometry.resetPosition(self.gyro_angle, self.module_positions, self.pose)
+            return True
+
+    def reset_pose(self, pose=None):
+        """
+        Reset the robot's pose, and forget the pose history.
+        Call this after resetting the gyro to keep the current pose.
+
+        :param pose: The robot's new pose. Defaults to the current pose.
+        :type pose: wpimath.geometry.Pose2d
+        """
+        # Read before taking the lock, since reading may wait for an odometry thread that is waiting for the lock.
+        gyro_angle = self.drivetrain.get_gyro_rotation()
+        module_positions = self.drivetrain.get_module_positions()
+        with self.lock:
+            if pose is None:
+                pose = self.pose
+            self.gyro_angle = gyro_angle
+            self.module_positions = module_positions
+            self.odometry.resetPosition(self.gyro_angle, self.module_positions, pose)
+            self.pose = pose
+            self.pose_history.clear()
+
+    def get_pose(self):
+        """
+        Get the robot's current pose on the field.
+        """
+        with self.lock:
+            return self.pose
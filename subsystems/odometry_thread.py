@@ -0,0 +1,227 @@
+import phoenix6
+import wpilib
+from contextlib import contextmanager
+from threading import Event, Lock, RLock, Thread
+from time import sleep
+from wpimath.geometry import Rotation2d
+from wpimath.kinematics import SwerveModulePosition
+
+class PhoenixSignalSource():
+    """
+    Reads the Swerve Modules' positions from their Phoenix 6 status signals as they arrive together on the CAN bus.
+    Status signals are not thread safe, so the robot loop must not refresh or read these signals while the odometry thread runs. See OdometryThread.paused.
+    """
+
+    def __init__(self, modules, gyro_rotation_supplier, frequency):
+        """
+        Constructor for Phoenix Signal Source.
+
+        :param modules: Swerve Modules in the same order as the kinematics.
+        :type modules: tuple
+        :param gyro_rotation_supplier: Function returning the robot's heading. The gyro is not on the CAN bus, so it is read when the signals arrive.
+        :type gyro_rotation_supplier: function
+        :param frequency: Rate the signals are sent at in hertz.
+        :type frequency: float
+        """
+        self.modules = modules
+        self.gyro_rotation_supplier = gyro_rotation_supplier
+        self.signals = []
+        for module in self.modules:
+            self.signals.extend(module.get_odometry_signals())
+        phoenix6.BaseStatusSignal.set_update_frequency_for_all(frequency, self.signals)
+
+    def wait_for_update(self, timeout):
+        """
+        Block until every module has sent new positions.
+
+        :param timeout: Most time to wait in seconds.
+        :type timeout: float
+        :return: Whether all of the signals arrived in time.
+        :rtype: bool
+        """
+        return phoenix6.BaseStatusSignal.wait_for_all(timeout, self.signals).is_ok()
+
+    def get_gyro_rotation(self):
+        """
+        Get the robot's heading.
+        """
+        return self.gyro_rotation_supplier()
+
+    def get_module_positions(self):
+        """
+        Get the Swerve Module positions, compensated for the time the signals spent on the CAN bus.
+        """
+        module_positions = []
+        for module in self.modules:
+            driving_position, driving_velocity, steering_position, steering_velocity = module.get_odometry_signals()
+            module_positions.append(module.position_from_rotations(
+                phoenix6.BaseStatusSignal.get_latency_compensated_value(driving_position, driving_velocity),
+                phoenix6.BaseStatusSignal.get_latency_compensated_value(steering_position, steering_velocity),
+            ))
+        return tuple(module_positions)
+
+class MockSignalSource():
+    """Stands in for the Phoenix 6 status signals in simulation, sending whatever positions it is given at a fixed rate."""
+
+    def __init__(self, frequency=250, module_count=4):
+        """
+        Constructor for Mock Signal Source.
+
+        :param frequency: Rate new positions are sent at in hertz.
+        :type frequency: float
+        :param module_count: Number of Swerve Modules.
+        :type module_count: int
+        """
+        self.frequency = frequency
+        self.lock = Lock()
+        self.gyro_rotation = Rotation2d()
+        self.module_positions = tuple(SwerveModulePosition() for _ in range(module_count))
+        self.connected = True
+
+    def set_gyro_rotation(self, gyro_rotation):
+        """
+        Set the robot's heading sent with the next update.
+        """
+        with self.lock:
+            self.gyro_rotation = gyro_rotation
+
+    def set_module_positions(self, module_positions):
+        """
+        Set the Swerve Module positions sent with the next update.
+        """
+        with self.lock:
+            self.module_positions = tuple(module_positions)
+
+    def set_connected(self, connected):
+        """
+        Set whether updates arrive. While disconnected every wait times out, like an unplugged CAN bus.
+        """
+        self.connected = connected
+
+    def wait_for_update(self, timeout):
+        """
+        Block until the next update is due.
+
+        :param timeout: Most time to wait in seconds.
+        :type timeout: float
+        :return: Whether an update arrived in time.
+        :rtype: bool
+        """
+        period = 1 / self.frequency
+        if not self.connected or period > timeout:
+            sleep(timeout)
+            return False
+        sleep(period)
+        return True
+
+    def get_gyro_rotation(self):
+        """
+        Get the robot's heading.
+        """
+        with self.lock:
+            return self.gyro_rotation
+
+    def get_module_positions(self):
+        """
+        Get the Swerve Module positions.
+        """
+        with self.lock:
+            return self.module_positions
+
+class OdometryThread():
+    """Background thread that updates odometry every time new module positions arrive, instead of once per robot loop."""
+
+    def __init__(self, odometry, signal_source, frequency=250):
+        """
+        Constructor for Odometry Thread.
+
+        :param odometry: Odometry to update.
+        :type odometry: subsystems.odometry.Odometry
+        :param signal_source: Where module positions and the gyro heading are read from.
+        :type signal_source: PhoenixSignalSource or MockSignalSource
+        :param frequency: Rate updates are expected at in hertz.
+        :type frequency: float
+        """
+        self.odometry = odometry
+        self.signal_source = signal_source
+        # Give late signals a second period before counting them as missed.
+        self.timeout = 2 / frequency
+        self.update_count = 0
+        self.missed_update_count = 0
+        self.stop_event = Event()
+        self.thread = None
+        # Held by the thread while it uses the signals, and by the robot loop while it has the thread paused.
+        self.signal_lock = RLock()
+        # Cleared while the robot loop wants the thread to wait between updates.
+        self.resume_event = Event()
+        self.resume_event.set()
+        # Positions from the last update, for the robot loop to read without touching the signals.
+        self.snapshot_lock = Lock()
+        self.module_positions = None
+
+    def start(self):
+        """
+        Start updating odometry in the background.
+        """
+        if self.is_running():
+            return
+        self.stop_event.clear()
+        self.thread = Thread(target=self._run, name="Odometry", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stop updating odometry and wait for the thread to finish.
+        """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def is_running(self):
+        """
+        Get whether the thread is updating odometry.
+        """
+        return self.thread is not None and self.thread.is_alive()
+
+    def get_module_positions(self):
+        """
+        Get the Swerve Module positions from the thread's last update.
+
+        :return: The positions, or None if the thread has not made an update yet.
+        :rtype: tuple
+        """
+        with self.snapshot_lock:
+            return self.module_positions
+
+    @contextmanager
+    def paused(self):
+        """
+        Hold the thread between updates for the duration of a with block, so the robot loop can refresh and read the signals it uses.
+        Waits for the update in progress, if any, to finish. The thread carries on afterwards.
+        """
+        self.resume_event.clear()
+        with self.signal_lock:
+            try:
+                yield
+            finally:
+                self.resume_event.set()
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            # Wait here, between updates, while the robot loop has the thread paused.
+            if not self.resume_event.wait(self.timeout):
+                continue
+            with self.signal_lock:
+                if not self.signal_source.wait_for_update(self.timeout):
+                    self.missed_update_count += 1
+                    continue
+
+                # The positions are compensated up to now, so they are timestamped now.
+                timestamp = wpilib.Timer.getFPGATimestamp()
+                gyro_angle = self.signal_source.get_gyro_rotation()
+                module_positions = self.signal_source.get_module_positions()
+            with self.snapshot_lock:
+                self.module_positions = module_positions
+            self.odometry.update(timestamp, gyro_angle, module_positions)
+            self.update_count += 1
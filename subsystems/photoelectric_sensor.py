@@ -1,5 +1,5 @@
 from wpilib import DigitalInput 
-from wpilib.shuffleboard import Shuffleboard
+from .telemetry import telemetry
 
 class PhotoelectricSensor():
     """
@@ -11,15 +11,12 @@ class PhotoelectricSensor():
         Constructor for photoelectric sensor.
         """
         self.photoelectric_sensor = DigitalInput(channel)
-        self.ring_entry = Shuffleboard.getTab("Drivers").add(f"Ring Detected", "None").withSize(2, 2).getEntry()
+        self.ring_entry = telemetry.add_widget("Drivers", "Ring Detected", False)
     
     def detects_ring(self):
         """
         Check for a ring in the robot.
         """
-        if self.photoelectric_sensor.get() == False:
-            self.ring_entry.setString("True")
-            return True
-        else:
-            self.ring_entry.setString("False")
-            return False
\ No newline at end of file
+        ring_detected = self.photoelectric_sensor.get() == False
+        self.ring_entry.set(ring_detected)
+        return ring_detected
\ No newline at end of file
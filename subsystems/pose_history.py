@@ -0,0 +1,128 @@
+import numpy as np
+from math import atan2, cos, sin
+from wpimath.geometry import Pose2d, Rotation2d
+
+class PoseHistory():
+    """Fixed size ring buffer of timestamped robot poses that can be sampled at any time it covers."""
+
+    def __init__(self, size):
+        """
+        Constructor for Pose History.
+
+        :param size: Number of poses kept. Once full, each new pose replaces the oldest one.
+        :type size: int
+        """
+        # Preallocated so the history never grows past its size.
+        self.timestamps = np.zeros(size)
+        self.poses = np.zeros((size, 3))
+        self.size = size
+        self.count = 0
+        self.next_index = 0
+
+    def clear(self):
+        """
+        Forget every recorded pose.
+        """
+        self.count = 0
+        self.next_index = 0
+
+    def add(self, timestamp, pose):
+        """
+        Record the robot's pose at a point in time. Timestamps must not go backwards.
+
+        :param timestamp: FPGA time the pose was measured at in seconds.
+        :type timestamp: float
+        :param pose: Pose of the robot on the field.
+        :type pose: wpimath.geometry.Pose2d
+        """
+        self.timestamps[self.next_index] = timestamp
+        self.poses[self.next_index] = (pose.X(), pose.Y(), pose.rotation().radians())
+        self.next_index = (self.next_index + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def get_oldest_timestamp(self):
+        """
+        Get the timestamp of the oldest pose still recorded, or None if there are none.
+        """
+        if self.count == 0:
+            return None
+        return float(self.timestamps[self._ordered_indices()[0]])
+
+    def get_newest_timestamp(self):
+        """
+        Get the timestamp of the newest pose recorded, or None if there are none.
+        """
+        if self.count == 0:
+            return None
+        return float(self.timestamps[(self.next_index - 1) % self.size])
+
+    def sample(self, timestamp):
+        """
+        Get the robot's pose at a point in time, interpolated between the recorded poses around it.
+
+        :param timestamp: FPGA time in seconds.
+        :type timestamp: float
+        :return: The pose, the newest pose for times after it, or None for times before the oldest pose.
+        :rtype: wpimath.geometry.Pose2d
+        """
+        if self.count == 0:
+            return None
+
+        indices = self._ordered_indices()
+        timestamps = self.timestamps[indices]
+        after = int(np.searchsorted(timestamps, timestamp))
+        if after == 0:
+            if timestamp < timestamps[0]:
+                return None
+            return self._pose_at(indices[0])
+        if after == self.count:
+            return self._pose_at(indices[-1])
+
+        # Interpolate linearly, taking the short way around for the heading.
+        start = self.poses[indices[after - 1]]
+        end = self.poses[indices[after]]
+        fraction = (timestamp - timestamps[after - 1]) / (timestamps[after] - timestamps[after - 1])
+        heading_change = atan2(sin(end[2] - start[2]), cos(end[2] - start[2]))
+        return Pose2d(
+            start[0] + (end[0] - start[0]) * fraction,
+            start[1] + (end[1] - start[1]) * fraction,
+            Rotation2d(start[2] + heading_change * fraction),
+        )
+
+    def correct_since(self, timestamp, measured_pose, corrected_pose):
+        """
+        Move every pose recorded at or after a point in time by the correction that takes measured_pose to corrected_pose.
+        The poses keep their position and heading relative to measured_pose.
+
+        :param timestamp: FPGA time in seconds the correction starts at.
+        :type timestamp: float
+        :param measured_pose: Pose that was recorded at that time.
+        :type measured_pose: wpimath.geometry.Pose2d
+        :param corrected_pose: Where that pose should have been.
+        :type corrected_pose: wpimath.geometry.Pose2d
+        """
+        indices = self._ordered_indices()
+        indices = indices[self.timestamps[indices] >= timestamp]
+        if len(indices) == 0:
+            return
+
+        heading_change = (corrected_pose.rotation() - measured_pose.rotation()).radians()
+        c, s = cos(heading_change), sin(heading_change)
+        poses = self.poses[indices]
+        dx = poses[:, 0] - measured_pose.X()
+        dy = poses[:, 1] - measured_pose.Y()
+        poses[:, 0] = corrected_pose.X() + c * dx - s * dy
+        poses[:, 1] = corrected_pose.Y() + s * dx + c * dy
+        poses[:, 2] += heading_change
+        self.poses[indices] = poses
+
+    def _ordered_indices(self):
+        """
+        Get the buffer indices of every recorded pose from oldest to newest.
+        """
+        start = (self.next_index - self.count) % self.size
+        return (start + np.arange(self.count)) % self.size
+
+    def _pose_at(self, index):
+        x, y, heading = self.poses[index]
+        return Pose2d(x, y, Rotation2d(heading))
@@ -1,6 +1,8 @@
 import phoenix5
-from wpilib.shuffleboard import Shuffleboard
 from math import atan, degrees
+from .actuator_output import ActuatorOutput
+from .telemetry import telemetry
+from .device_configurator import device_configurator
 
 class Shooter():
     """Class for controlling shooter on robot."""
@@ -27,9 +29,9 @@ class Shooter():
         self.flywheel_right_motor = phoenix5.VictorSPX(flywheel_right_motor_id)
 
         # Configure motors
-        self._configure_motor(self.intake_motor)
-        self._configure_motor(self.flywheel_left_motor)
-        self._configure_motor(self.flywheel_right_motor)
+        self._configure_motor("Intake Motor", self.intake_motor)
+        self._configure_motor("Flywheel Left Motor", self.flywheel_left_motor)
+        self._configure_motor("Flywheel Right Motor", self.flywheel_right_motor)
         
         # Invert motors
         if intake_motor_inverted:
@@ -40,11 +42,16 @@ class Shooter():
 
         if flywheel_right_inverted:
             self._invert_motor(self.flywheel_right_motor)
+
+        # Only send motor speeds when they change
+        self.intake_motor_output = ActuatorOutput("Intake Motor", self._send_intake_motor_speed, deadband = 0.001)
+        self.flywheel_left_motor_output = ActuatorOutput("Flywheel Left Motor", self._send_flywheel_left_motor_speed, deadband = 0.001)
+        self.flywheel_right_motor_output = ActuatorOutput("Flywheel Right Motor", self._send_flywheel_right_motor_speed, deadband = 0.001)
   
         # Set Shooter State
         self.shooter_state = "Idle"
         self.next_shooter_state = "None"
-        self.drivers_tab_state = Shuffleboard.getTab("Drivers").add(f"Shooter State", self.shooter_state).withSize(2, 2).getEntry()
+        self.drivers_tab_state = telemetry.add_widget("Drivers", "Shooter State", self.shooter_state)
 
         # Arm offset
         self.arm_offset = 40
@@ -62,22 +69,34 @@ class Shooter():
         """
         motor.setInverted(True)
 
-    def _configure_motor(self, motor):
+    def _configure_motor(self, name, motor):
         """
         Configures a flywheel motor.
 
+        :param name: Name of the motor
+        :type name: str
         :param motor: Motor that will be configured
         :type motor: VictorSPX
         """
-        motor.configVoltageCompSaturation(12.0)
+        device_configurator.add_victorspx(name, motor, 12.0)
         motor.enableVoltageCompensation(True)
 
+    def _send_intake_motor_speed(self, speed):
+        self.intake_motor.set(phoenix5.ControlMode.PercentOutput, speed)
+
+    def _send_flywheel_left_motor_speed(self, speed):
+        self.flywheel_left_motor.set(phoenix5.ControlMode.PercentOutput, speed)
+
+    def _send_flywheel_right_motor_speed(self, speed):
+        self.flywheel_right_motor.set(phoenix5.ControlMode.PercentOutput, speed)
+
     def reset(self):
         """
-        Reset motors.
+        Reset motors. The stop is always sent, even if the last command sent was also a stop.
         """
-        self.set_intake_motor(0)
-        self.set_flywheel_motors(0)
+        self.intake_motor_output.set(0, force = True)
+        self.flywheel_left_motor_output.set(0, force = True)
+        self.flywheel_right_motor_output.set(0, force = True)
 
         self.change_shooter_state("Idle")
         self.change_next_shooter_state("None")
@@ -102,7 +121,7 @@ class Shooter():
         :type state: str
         """
         self.shooter_state = state
-        self.drivers_tab_state.setString(self.shooter_state)
+        self.drivers_tab_state.set(self.shooter_state)
 
     def change_next_shooter_state(self, state):
         """
@@ -125,7 +144,7 @@ class Shooter():
         elif speed < -1:
             speed = -1
 
-        self.intake_motor.set(phoenix5.ControlMode.PercentOutput, speed)
+        self.intake_motor_output.set(speed)
 
     def set_flywheel_motors(self, speed):
         """
@@ -139,8 +158,8 @@ class Shooter():
         elif speed < -1:
             speed = -1
             
-        self.flywheel_left_motor.set(phoenix5.ControlMode.PercentOutput, speed)
-        self.flywheel_right_motor.set(phoenix5.ControlMode.PercentOutput, speed)
+        self.flywheel_left_motor_output.set(speed)
+        self.flywheel_right_motor_output.set(speed)
 
     def set_left_flywheel_motor(self, speed):
         if speed > 1:
@@ -148,7 +167,7 @@ class Shooter():
         elif speed < -1:
             speed = -1
             
-        self.flywheel_left_motor.set(phoenix5.ControlMode.PercentOutput, speed)
+        self.flywheel_left_motor_output.set(speed)
     
     def set_right_flywheel_motor(self, speed):
         if speed > 1:
@@ -156,7 +175,7 @@ class Shooter():
         elif speed < -1:
             speed = -1
             
-        self.flywheel_right_motor.set(phoenix5.ControlMode.PercentOutput, speed)
+        self.flywheel_right_motor_output.set(speed)
 
     def predict_speaker_shooting_state(self, distance):
         """
@@ -0,0 +1,45 @@
+from contextlib import contextmanager
+from time import perf_counter
+
+class StartupProfiler():
+    """Times each module import and subsystem construction while the robot starts."""
+
+    def __init__(self, enabled):
+        """
+        Constructor for Startup Profiler.
+
+        :param enabled: Whether to print the report. Times are always recorded, since recording them is cheap.
+        :type enabled: bool
+        """
+        self.enabled = enabled
+        self.records = []
+        self.start_time = perf_counter()
+
+    @contextmanager
+    def measure(self, name):
+        """
+        Time the code inside a with block.
+
+        :param name: Name the time is reported under.
+        :type name: str
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.records.append((name, perf_counter() - start))
+
+    def report(self):
+        """
+        Print every recorded time, slowest first, if the profiler is enabled.
+
+        :return: The report.
+        :rtype: str
+        """
+        total_seconds = perf_counter() - self.start_time
+        lines = [f"{name:<48} {seconds * 1000:8.1f} ms" for name, seconds in sorted(self.records, key=lambda record: record[1], reverse=True)]
+        lines.append(f"{'Total':<48} {total_seconds * 1000:8.1f} ms")
+        report = "\n".join(lines)
+        if self.enabled:
+            print(f"Startup profile:\n{report}")
+        return report
@@ -0,0 +1,81 @@
+import phoenix6
+import wpilib
+
+class StatusSignalRegistry():
+    """Holds the Phoenix 6 status signals a subsystem reads so they can be refreshed with one batched call per CAN bus."""
+
+    def __init__(self):
+        """
+        Constructor for Status Signal Registry.
+        """
+        # Signals of each group, split by the CAN bus they are on. Phoenix 6 can only refresh signals on one bus at a time.
+        self.groups = {}
+        self.devices = []
+        # Signals to refresh on each CAN bus for each combination of groups, built the first time it is refreshed.
+        self.refresh_lists = {}
+        # Status of the last refresh on each CAN bus.
+        self.statuses = {}
+
+    def register(self, group, bus, signals, frequency):
+        """
+        Register signals under a group and set how often the devices send them.
+
+        :param group: Name of the group the signals are refreshed with.
+        :type group: str
+        :param bus: CAN bus the signals' device is on.
+        :type bus: str
+        :param signals: Status signals to register.
+        :type signals: list
+        :param frequency: Rate the signals are sent at in hertz.
+        :type frequency: float
+        """
+        signals = list(signals)
+        phoenix6.BaseStatusSignal.set_update_frequency_for_all(frequency, signals)
+        self.groups.setdefault(group, {}).setdefault(bus, []).extend(signals)
+        self.refresh_lists.clear()
+
+    def add_devices(self, devices):
+        """
+        Add devices whose unregistered status signals are turned off by optimize_bus_utilization.
+
+        :param devices: TalonFXs and CANcoders.
+        :type devices: list
+        """
+        self.devices.extend(devices)
+
+    def optimize_bus_utilization(self):
+        """
+        Stop the devices from sending any status signal that is not registered, freeing up the CAN bus.
+        """
+        phoenix6.hardware.ParentDevice.optimize_bus_utilization_for_all(self.devices)
+
+    def refresh(self, groups=None):
+        """
+        Refresh registered signals with one call per CAN bus instead of one call per device.
+        A bus that fails to refresh is reported to the Driver Station when its status changes.
+
+        :param groups: Names of the groups to refresh. Defaults to every group.
+        :type groups: tuple
+        :return: Whether every signal refreshed without error.
+        :rtype: bool
+        """
+        if groups is None:
+            groups = tuple(self.groups)
+        refresh_list = self.refresh_lists.get(groups)
+        if refresh_list is None:
+            signals_by_bus = {}
+            for group in groups:
+                for bus, signals in self.groups[group].items():
+                    signals_by_bus.setdefault(bus, []).extend(signals)
+            refresh_list = tuple(signals_by_bus.items())
+            self.refresh_lists[groups] = refresh_list
+
+        refreshed = True
+        for bus, signals in refresh_list:
+            status = phoenix6.BaseStatusSignal.refresh_all(signals)
+            if not status.is_ok():
+                refreshed = False
+                if self.statuses.get(bus) != status:
+                    wpilib.reportWarning(f"Status signals on the {bus} CAN bus failed to refresh: {status.name}")
+            self.statuses[bus] = status
+        return refreshed
@@ -0,0 +1,91 @@
+import numpy as np
+from math import cos, pi, sin
+
+class SwerveKinematics():
+    """
+    Inverse kinematics, desaturation, and angle optimization for every Swerve Module in one vectorized pass.
+    Gives the same module speeds and angles as WPILib's SwerveDrive4Kinematics and SwerveModuleState.optimize, without creating any wpimath objects.
+    """
+
+    def __init__(self, module_locations, max_module_speed):
+        """
+        Constructor for Swerve Kinematics.
+
+        :param module_locations: Location of each Swerve Module relative to the center of the robot.
+        :type module_locations: tuple
+        :param max_module_speed: Fastest any module can drive in meters per second.
+        :type max_module_speed: float
+        """
+        locations = np.array([(location.X(), location.Y()) for location in module_locations])
+        module_count = len(locations)
+        self.max_module_speed = max_module_speed
+
+        # Each module's x and y velocity from the robot's x velocity, y velocity, and rotation speed.
+        self.inverse_kinematics = np.zeros((2 * module_count, 3))
+        self.inverse_kinematics[0::2, 0] = 1
+        self.inverse_kinematics[0::2, 2] = -locations[:, 1]
+        self.inverse_kinematics[1::2, 1] = 1
+        self.inverse_kinematics[1::2, 2] = locations[:, 0]
+
+        # Preallocated so calculate never creates arrays.
+        self.chassis_speeds = np.zeros(3)
+        self.module_velocities = np.zeros(2 * module_count)
+        self.module_x_velocities = self.module_velocities[0::2]
+        self.module_y_velocities = self.module_velocities[1::2]
+        self.headings = np.zeros(module_count)
+        self.angle_changes = np.zeros(module_count)
+        self.reversed = np.zeros(module_count, dtype=bool)
+        self.speeds = np.zeros(module_count)
+        self.angles = np.zeros(module_count)
+
+    def calculate(self, forward_speed, strafe_speed, rotation_speed, robot_angle, current_angles):
+        """
+        Calculate the speed and angle of every Swerve Module for field relative robot speeds.
+        When the robot is not moving, the modules keep the headings they were last given.
+
+        :param forward_speed: Speed toward the opponent's alliance station wall in meters per second.
+        :type forward_speed: float
+        :param strafe_speed: Speed toward the left field boundary in meters per second.
+        :type strafe_speed: float
+        :param rotation_speed: Counterclockwise rotation speed in radians per second.
+        :type rotation_speed: float
+        :param robot_angle: Angle of the robot on the field in radians.
+        :type robot_angle: float
+        :param current_angles: Angle each module is facing in radians, used to choose whether to reverse it.
+        :type current_angles: numpy.ndarray
+        :return: Module speeds in meters per second and angles in radians, not wrapped to any range. The arrays are reused by the next call.
+        :rtype: tuple
+        """
+        # Rotate the field relative speeds into the robot's frame.
+        robot_angle_cos = cos(robot_angle)
+        robot_angle_sin = sin(robot_angle)
+        x_speed = forward_speed * robot_angle_cos + strafe_speed * robot_angle_sin
+        y_speed = forward_speed * -robot_angle_sin + strafe_speed * robot_angle_cos
+
+        if x_speed == 0 and y_speed == 0 and rotation_speed == 0:
+            self.speeds.fill(0)
+        else:
+            self.chassis_speeds[0] = x_speed
+            self.chassis_speeds[1] = y_speed
+            self.chassis_speeds[2] = rotation_speed
+            np.matmul(self.inverse_kinematics, self.chassis_speeds, out=self.module_velocities)
+            np.hypot(self.module_x_velocities, self.module_y_velocities, out=self.speeds)
+            np.arctan2(self.module_y_velocities, self.module_x_velocities, out=self.headings)
+            # A module that is not moving faces forward, like Rotation2d with a zero length vector.
+            np.less_equal(self.speeds, 1e-6, out=self.reversed)
+            np.copyto(self.headings, 0, where=self.reversed)
+
+            # Slow every module by the same ratio if any of them would be too fast.
+            fastest_speed = self.speeds.max()
+            if fastest_speed > self.max_module_speed:
+                np.divide(self.speeds, fastest_speed, out=self.speeds)
+                np.multiply(self.speeds, self.max_module_speed, out=self.speeds)
+
+        # Reverse any module that would have to turn more than 90 degrees, which is when the cosine of the turn is negative.
+        np.subtract(self.headings, current_angles, out=self.angle_changes)
+        np.cos(self.angle_changes, out=self.angle_changes)
+        np.less(self.angle_changes, 0, out=self.reversed)
+        np.copyto(self.angles, self.headings)
+        np.negative(self.speeds, out=self.speeds, where=self.reversed)
+        np.add(self.angles, pi, out=self.angles, where=self.reversed)
+        return self.speeds, self.angles
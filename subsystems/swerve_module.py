@@ -1,6 +1,9 @@
 import phoenix6
 from wpilib.shuffleboard import Shuffleboard
 from wpimath.geometry import Rotation2d
+from wpimath.kinematics import SwerveModulePosition
+from .actuator_output import ActuatorOutput
+from .device_configurator import device_configurator
 
 class SwerveModule():
     """Class for controlling swerve module on robot."""
@@ -40,8 +43,15 @@ class SwerveModule():
         self.cancoder_0_position_value = cancoder_0_position_value
         self._get_cancoder_0_position_value()
         
+        # Status signals read by the module. Their values are only as fresh as the last refresh.
+        self.driving_position_signal = self.driving_motor.get_position()
+        self.driving_velocity_signal = self.driving_motor.get_velocity()
+        self.steering_position_signal = self.steering_motor.get_position()
+        self.steering_velocity_signal = self.steering_motor.get_velocity()
+        self.cancoder_absolute_position_signal = self.cancoder.get_absolute_position()
+
         # Swerve Module Configs
-        self._determine_steering_motor_offset()   
+        self.determine_steering_motor_offset()
         self.current_angle = None
 
     def _configure_driving_motor(self, inverted_module):
@@ -71,11 +81,12 @@ class SwerveModule():
         talonfx_configs.motion_magic.motion_magic_acceleration = 100
         talonfx_configs.motion_magic.motion_magic_jerk = 1500
 
-        # Apply the configs to the driving motor
-        self.driving_motor.configurator.apply(talonfx_configs) 
+        # Apply the configs to the driving motor along with every other device
+        device_configurator.add_talonfx(f"{self.module_position} Driving Motor", self.driving_motor, talonfx_configs)
 
         # Create PID object
         self.driving_pid = phoenix6.controls.MotionMagicVelocityVoltage(velocity = 0, enable_foc = False)
+        self.driving_output = ActuatorOutput(f"{self.module_position} Driving Motor", self._send_driving_velocity, deadband = 0.01)
 
     def _configure_steering_motor(self):
         """
@@ -95,11 +106,18 @@ class SwerveModule():
         talonfx_configs.slot0.k_i = 0
         talonfx_configs.slot0.k_d = 0
 
-        # Apply the configs to the steering motor
-        self.steering_motor.configurator.apply(talonfx_configs) 
+        # Apply the configs to the steering motor along with every other device
+        device_configurator.add_talonfx(f"{self.module_position} Steering Motor", self.steering_motor, talonfx_configs)
 
         # Create PID object
         self.steering_pid = phoenix6.controls.PositionVoltage(position = 0, enable_foc = False)
+        self.steering_output = ActuatorOutput(f"{self.module_position} Steering Motor", self._send_steering_position, deadband = 0.0001)
+
+    def _send_driving_velocity(self, velocity):
+        self.driving_motor.set_control(self.driving_pid.with_velocity(velocity))
+
+    def _send_steering_position(self, position):
+        self.steering_motor.set_control(self.steering_pid.with_position(position))
 
     def _get_cancoder_0_position_value(self):
         """
@@ -107,31 +125,86 @@ class SwerveModule():
         """
         self.cancoder_0_position_value = Shuffleboard.getTab("Swerve Drive").add(f"{self.module_position} 0 Position CANcoder Value", self.cancoder_0_position_value).withSize(2, 2).getEntry().getFloat(self.cancoder_0_position_value)  
 
-    def _determine_steering_motor_offset(self):
+    def determine_steering_motor_offset(self):
         """
         Determine the steering motor offset to allow the swerve module to face forward.
+        Refresh the module's status signals first.
         """
         # Calculate CANcoder offsets for 0 degree position
-        cancoder_offset = self.cancoder_0_position_value - self.cancoder.get_absolute_position().value
+        cancoder_offset = self.cancoder_0_position_value - self.cancoder_absolute_position_signal.value
 
         # Set steering motor offset
-        self.steering_motor_offset = self.steering_motor.get_position().value - cancoder_offset
+        self.steering_motor_offset = self.steering_position_signal.value - cancoder_offset
 
     def reset(self):
         """
         Reset the swerve module's main variables and set it to hold its position.
+        Refresh the module's status signals first.
         """
         self._get_cancoder_0_position_value()
-        self._determine_steering_motor_offset()
-        self.current_angle = Rotation2d.fromDegrees(0)
-        self.driving_motor.set_control(self.driving_pid.with_velocity(0))
-        self.steering_motor.set_control(self.steering_pid.with_position(self.steering_motor_offset)) 
+        self.determine_steering_motor_offset()
+        self.current_angle = 0
+        self.driving_output.set(0, force = True)
+        self.steering_output.set(self.steering_motor_offset, force = True)
 
     def stop(self):
         """
         Stop the driving motor but continue to hold the last position received from the joystick.
         """
-        self.driving_motor.set_control(self.driving_pid.with_velocity(0))
+        self.driving_output.set(0)
+
+    def get_position(self):
+        """
+        Get the distance the Swerve Module has driven and the angle it is facing, as of the last status signal refresh.
+
+        :return: Distance driven in meters and angle of the module.
+        :rtype: wpimath.kinematics.SwerveModulePosition
+        """
+        return self.position_from_rotations(self.driving_position_signal.value, self.steering_position_signal.value)
+
+    def get_devices(self):
+        """
+        Get the module's TalonFXs and CANcoder.
+        """
+        return (self.steering_motor, self.driving_motor, self.cancoder)
+
+    def get_odometry_signals(self):
+        """
+        Get the status signals odometry reads from the module.
+
+        :return: Driving motor position and velocity, then steering motor position and velocity.
+        :rtype: tuple
+        """
+        return (self.driving_position_signal, self.driving_velocity_signal, self.steering_position_signal, self.steering_velocity_signal)
+
+    def get_status_signals(self):
+        """
+        Get every status signal the module reads, with the group it is refreshed in and the CAN bus it is on.
+
+        :return: Tuples of the group name, CAN bus, and status signals.
+        :rtype: tuple
+        """
+        return (
+            ("odometry", self.driving_motor.network, (self.driving_position_signal, self.driving_velocity_signal)),
+            ("odometry", self.steering_motor.network, (self.steering_position_signal, self.steering_velocity_signal)),
+            ("steering_offset", self.cancoder.network, (self.cancoder_absolute_position_signal,)),
+        )
+
+    def position_from_rotations(self, driving_motor_rotations, steering_motor_rotations):
+        """
+        Convert motor positions into the distance the Swerve Module has driven and the angle it is facing.
+
+        :param driving_motor_rotations: Position of the driving motor in rotations.
+        :type driving_motor_rotations: float
+        :param steering_motor_rotations: Position of the steering motor in rotations.
+        :type steering_motor_rotations: float
+        :return: Distance driven in meters and angle of the module.
+        :rtype: wpimath.kinematics.SwerveModulePosition
+        """
+        # 100 rotations per second of the driving motor is 5.21208 meters per second.
+        distance = driving_motor_rotations * (5.21208 / 100)
+        angle = Rotation2d.fromDegrees((steering_motor_rotations - self.steering_motor_offset) * -360)
+        return SwerveModulePosition(distance, angle)
 
     def set(self, speed, angle):
         """
@@ -139,15 +212,15 @@ class SwerveModule():
     
         :param speed: Desired speed of the module in meters per second.
         :type speed: float
-        :param angle: Desired angle of the module. Must already be optimized. Use wpimath.kinematics.SwerveModuleState.optimize to optimize the angle.
+        :param angle: Desired angle of the module in degrees, counterclockwise positive. Must already be optimized so the module never turns more than 90 degrees.
         :type angle: float
         """
         # Determine speed, position, and module direction
         desired_speed = speed
-        desired_angle = ((angle.degrees() * -1) + 360) % 360
+        desired_angle = ((angle * -1) + 360) % 360
         desired_position = self.steering_motor_offset + (desired_angle / 360)
         self.current_angle = angle
 
         # Set the motors to the desired speed and angle
-        self.driving_motor.set_control(self.driving_pid.with_velocity((desired_speed / 5.21208) * 100))
-        self.steering_motor.set_control(self.steering_pid.with_position(desired_position)) 
\ No newline at end of file
+        self.driving_output.set((desired_speed / 5.21208) * 100)
+        self.steering_output.set(desired_position)
\ No newline at end of file
@@ -0,0 +1,157 @@
+import ntcore
+import wpilib
+from time import perf_counter
+from weakref import WeakSet
+from wpilib.shuffleboard import Shuffleboard
+
+class TelemetryTopic():
+    """One value published to NetworkTables, sent only when it changes and no faster than its period."""
+
+    def __init__(self, publisher, default, period):
+        """
+        Constructor for Telemetry Topic.
+
+        :param publisher: Typed NetworkTables publisher the value is sent with.
+        :type publisher: ntcore.DoublePublisher, ntcore.BooleanPublisher, ntcore.StringPublisher, or ntcore.StructPublisher
+        :param default: Value published until the first change.
+        :type default: float, bool, str, or a WPILib struct type
+        :param period: Fewest seconds between two publishes of this value.
+        :type period: float
+        """
+        self.publisher = publisher
+        self.period = period
+        self.value = default
+        self.published_value = default
+        self.next_publish_time = 0
+        self.publisher.set(default)
+
+    def set(self, value):
+        """
+        Set the value to publish. It is sent by the next Telemetry.publish call its period allows.
+        """
+        self.value = value
+
+    def publish(self, now):
+        """
+        Publish the value if it has changed and its period has passed.
+
+        :param now: FPGA time in seconds.
+        :type now: float
+        :return: Whether the value was published.
+        :rtype: bool
+        """
+        if self.value == self.published_value or now < self.next_publish_time:
+            return False
+        self.publisher.set(self.value)
+        self.published_value = self.value
+        self.next_publish_time = now + self.period
+        return True
+
+class Telemetry():
+    """Publishes values from every subsystem with typed NetworkTables publishers, only when they change, once per loop."""
+
+    def __init__(self, period=0.1, table="Telemetry"):
+        """
+        Constructor for Telemetry.
+
+        :param period: Default fewest seconds between two publishes of the same value. 0.1 seconds is 10 hertz.
+        :type period: float
+        :param table: NetworkTables table for values that are not Shuffleboard widgets.
+        :type table: str
+        """
+        self.period = period
+        self.table = table
+        # Topics live as long as the subsystem holding them.
+        self.topics = WeakSet()
+        self.publish_seconds = 0
+        self.publish_time_topic = None
+
+    def add_widget(self, tab, title, default, period=None):
+        """
+        Add a 2 by 2 Shuffleboard widget and publish to it with a publisher of the default value's type.
+
+        :param tab: Shuffleboard tab to add the widget to.
+        :type tab: str
+        :param title: Title of the widget.
+        :type title: str
+        :param default: Value shown until the first change. A bool, float, or str.
+        :type default: bool, float, or str
+        :param period: Fewest seconds between two publishes. Defaults to the telemetry's period.
+        :type period: float
+        :return: The topic to set values on.
+        :rtype: TelemetryTopic
+        """
+        # An int would make the widget an integer topic that the double publisher cannot publish to.
+        if isinstance(default, int) and not isinstance(default, bool):
+            default = float(default)
+        topic = Shuffleboard.getTab(tab).add(title, default).withSize(2, 2).getEntry().getTopic()
+        instance = topic.getInstance()
+        if isinstance(default, bool):
+            publisher = instance.getBooleanTopic(topic.getName()).publish()
+        elif isinstance(default, float):
+            publisher = instance.getDoubleTopic(topic.getName()).publish()
+        else:
+            publisher = instance.getStringTopic(topic.getName()).publish()
+        return self._add_topic(publisher, default, period)
+
+    def add_double(self, name, default=0.0, period=None):
+        """
+        Add a number published under the telemetry table.
+
+        :param name: Name of the value.
+        :type name: str
+        :param default: Value published until the first change.
+        :type default: float
+        :param period: Fewest seconds between two publishes. Defaults to the telemetry's period.
+        :type period: float
+        :return: The topic to set values on.
+        :rtype: TelemetryTopic
+        """
+        publisher = ntcore.NetworkTableInstance.getDefault().getTable(self.table).getDoubleTopic(name).publish()
+        return self._add_topic(publisher, float(default), period)
+
+    def add_struct(self, name, struct_type, default, period=None):
+        """
+        Add a WPILib struct, such as a Pose2d, published under the telemetry table.
+
+        :param name: Name of the value.
+        :type name: str
+        :param struct_type: Type of the value, such as wpimath.geometry.Pose2d.
+        :type struct_type: type
+        :param default: Value published until the first change.
+        :type default: struct_type
+        :param period: Fewest seconds between two publishes. Defaults to the telemetry's period.
+        :type period: float
+        :return: The topic to set values on.
+        :rtype: TelemetryTopic
+        """
+        publisher = ntcore.NetworkTableInstance.getDefault().getTable(self.table).getStructTopic(name, struct_type).publish()
+        return self._add_topic(publisher, default, period)
+
+    def _add_topic(self, publisher, default, period):
+        topic = TelemetryTopic(publisher, default, self.period if period is None else period)
+        self.topics.add(topic)
+        return topic
+
+    def publish(self):
+        """
+        Publish every value that has changed and is due. Call this once per loop.
+
+        :return: Number of values published.
+        :rtype: int
+        """
+        start = perf_counter()
+        now = wpilib.Timer.getFPGATimestamp()
+        published = 0
+        for topic in self.topics:
+            if topic.publish(now):
+                published += 1
+
+        # Report how long publishing took. The report goes out with a later publish.
+        if self.publish_time_topic is None:
+            self.publish_time_topic = self.add_double("Publish Time (us)")
+        self.publish_seconds = perf_counter() - start
+        self.publish_time_topic.set(round(self.publish_seconds * 1e6))
+        return published
+
+telemetry = Telemetry()
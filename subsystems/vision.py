@@ -1,6 +1,7 @@
 from photonlibpy import photonCamera, photonUtils
+from wpimath.geometry import Transform3d, Translation3d, Rotation3d
 from math import radians
-from wpilib.shuffleboard import Shuffleboard 
+from .telemetry import telemetry
 from wpilib import DriverStation
 
 class Vision():
@@ -12,8 +13,10 @@ class Vision():
         :type camera: str
         """
         self.camera = photonCamera.PhotonCamera('main')
-        self.speaker_distance = Shuffleboard.getTab("Drivers").add(f"Distance to Speaker", "None").withSize(2, 2).getEntry()
-        self.speaker_yaw = Shuffleboard.getTab("Drivers").add(f"Yaw to Speaker", "None").withSize(2, 2).getEntry()
+        self.camera.setBackgroundDecodingEnabled(True)
+        self.speaker_visible = telemetry.add_widget("Drivers", "Speaker AprilTag Visible", False)
+        self.speaker_distance = telemetry.add_widget("Drivers", "Distance to Speaker", 0.0)
+        self.speaker_yaw = telemetry.add_widget("Drivers", "Yaw to Speaker", 0.0)
         
         if DriverStation.getAlliance() == DriverStation.Alliance.kBlue:
             self.tag = 7
@@ -24,9 +27,15 @@ class Vision():
         self.target_height = 1.431925
         self.camera_pitch = radians(30)
 
+        # Camera is on the robot's center line, tilted up by the camera pitch.
+        self.robot_to_camera = Transform3d(Translation3d(0, 0, self.camera_height), Rotation3d(0, -self.camera_pitch, 0))
+        # Imported here rather than when this module is loaded, since robotpy_apriltag and the field layout are only needed once the robot starts.
+        from photonlibpy.photonPoseEstimator import PhotonPoseEstimator, PoseStrategy
+        from robotpy_apriltag import AprilTagField, loadAprilTagLayoutField
+        self.pose_estimator = PhotonPoseEstimator(loadAprilTagLayoutField(AprilTagField.k2024Crescendo), PoseStrategy.MULTI_TAG_PNP_ON_COPROCESSOR, self.camera, self.robot_to_camera)
+
     def reset(self):
-        self.speaker_distance.setString("None")
-        self.speaker_yaw.setString("None")
+        self.speaker_visible.set(False)
         
         if DriverStation.getAlliance() == DriverStation.Alliance.kBlue:
             self.tag = 7
@@ -34,33 +43,35 @@ class Vision():
             self.tag = 4
     
     def get_new_data_to_speaker(self):
-        result = self.camera.getLatestResult()
-        if result.hasTargets() == True:
-            targets = result.getTargets()
-            for target in targets:
-                if target.getFiducialId() == self.tag:
-                    distance = photonUtils.PhotonUtils.calculateDistanceToWallMeters(self.camera_height, self.target_height, self.camera_pitch, (radians(target.getPitch())))
-                    yaw = target.getYaw()
-                    self.speaker_distance.setString(str(distance))
-                    self.speaker_yaw.setString(str(yaw))
-                    return distance, yaw
+        return self._get_data_to_speaker(photonUtils.PhotonUtils.calculateDistanceToWallMeters)
+
+    def get_data_to_speaker(self):
+        return self._get_data_to_speaker(photonUtils.PhotonUtils.calculateDistanceToTargetMeters)
+
+    def _get_data_to_speaker(self, calculate_distance):
+        """
+        Get the distance and yaw to the speaker's AprilTag.
 
-        self.speaker_distance.setString("Can't find AprilTag.")
-        self.speaker_yaw.setString("Can't find AprilTag.")
+        :param calculate_distance: PhotonUtils function used to turn the tag's pitch into a distance.
+        :type calculate_distance: function
+        """
+        target = self.camera.getLatestResult().getTargetById(self.tag)
+        if target is not None:
+            distance = calculate_distance(self.camera_height, self.target_height, self.camera_pitch, (radians(target.getPitch())))
+            yaw = target.getYaw()
+            self.speaker_visible.set(True)
+            self.speaker_distance.set(distance)
+            self.speaker_yaw.set(yaw)
+            return distance, yaw
+
+        self.speaker_visible.set(False)
         return None, None
 
-    def get_data_to_speaker(self):
-        result = self.camera.getLatestResult()
-        if result.hasTargets() == True:
-            targets = result.getTargets()
-            for target in targets:
-                if target.getFiducialId() == self.tag:
-                    distance = photonUtils.PhotonUtils.calculateDistanceToTargetMeters(self.camera_height, self.target_height, self.camera_pitch, (radians(target.getPitch())))
-                    yaw = target.getYaw()
-                    self.speaker_distance.setString(str(distance))
-                    self.speaker_yaw.setString(str(yaw))
-                    return distance, yaw
+    def get_estimated_robot_pose(self):
+        """
+        Get the robot's pose on the field from the AprilTags in the newest camera frame.
 
-        self.speaker_distance.setString("Can't find AprilTag.")
-        self.speaker_yaw.setString("Can't find AprilTag.")
-        return None, None
\ No newline at end of file
+        :return: The pose and the FPGA time the frame was captured at, or None if there is no new frame with AprilTags.
+        :rtype: photonlibpy.estimatedRobotPose.EstimatedRobotPose
+        """
+        return self.pose_estimator.update()
@@ -0,0 +1,55 @@
+'''
+    Tests for the actuator output layer that skips unchanged motor commands.
+'''
+
+from subsystems.actuator_output import ActuatorOutput, get_write_counts, get_write_totals
+
+
+def test_suppresses_commands_within_deadband():
+    sent = []
+    output = ActuatorOutput('Test Motor', sent.append, deadband=0.01, keep_alive=10)
+
+    assert output.set(1.0)
+    assert not output.set(1.005)
+    assert not output.set(0.995)
+    assert output.set(1.02)
+    assert output.set(1.02, force=True)
+
+    assert sent == [1.0, 1.02, 1.02]
+    assert (output.sent_count, output.suppressed_count) == (3, 2)
+    assert get_write_counts()['Test Motor'] == (3, 2)
+
+
+def test_resends_after_keep_alive():
+    sent = []
+    output = ActuatorOutput('Keep Alive Motor', sent.append, keep_alive=0.05)
+
+    output.set(0.5)
+    assert not output.set(0.5)
+    # As if the keep-alive interval had passed since the last send
+    output.last_send_time -= 0.06
+    assert output.set(0.5)
+    assert sent == [0.5, 0.5]
+
+
+def test_invalidate_sends_next_command():
+    sent = []
+    output = ActuatorOutput('Invalidated Motor', sent.append, keep_alive=10)
+
+    output.set(0)
+    output.invalidate()
+    assert output.set(0)
+    assert sent == [0, 0]
+
+
+def test_write_totals_add_up_every_output():
+    sent_before, suppressed_before = get_write_totals()
+    first = ActuatorOutput('First Total Motor', lambda value: None, keep_alive=10)
+    second = ActuatorOutput('Second Total Motor', lambda value: None, keep_alive=10)
+
+    first.set(1.0)
+    first.set(1.0)
+    second.set(2.0)
+
+    sent, suppressed = get_write_totals()
+    assert (sent - sent_before, suppressed - suppressed_before) == (2, 1)
@@ -0,0 +1,56 @@
+'''
+    Tests for the parallel, idempotent device configurator, using simulated TalonFXs.
+'''
+
+import phoenix6
+
+from subsystems.device_configurator import DeviceConfigurator, _configs_match
+
+
+def make_config(k_s=0.18, k_p=0.11, stator_current_limit=55):
+    config = phoenix6.configs.TalonFXConfiguration()
+    config.slot0.k_s = k_s
+    config.slot0.k_p = k_p
+    config.current_limits.stator_current_limit_enable = True
+    config.current_limits.stator_current_limit = stator_current_limit
+    return config
+
+
+def test_configs_match_within_storage_step():
+    desired_config = make_config()
+
+    # Values as a TalonFX reads them back after storing them.
+    assert _configs_match(desired_config, make_config(k_s=0.1796875, k_p=0.1100001335144043, stator_current_limit=55.00000762939453))
+
+    # Changes the device can store are not skipped, however small.
+    assert not _configs_match(desired_config, make_config(k_s=0.18 - 1 / 1024))
+    assert not _configs_match(desired_config, make_config(k_p=0.1101))
+    assert not _configs_match(desired_config, make_config(stator_current_limit=55.1))
+
+    stored_config = make_config()
+    stored_config.current_limits.stator_current_limit_enable = False
+    assert not _configs_match(desired_config, stored_config)
+
+
+def test_applies_then_skips_configured_device():
+    motor = phoenix6.hardware.TalonFX(62, "CANivore")
+    motor.get_position().wait_for_update(1.0)
+    # Start from a different stored configuration, since the simulated device keeps it between runs.
+    assert motor.configurator.apply(make_config(k_p=0.2), 1.0).is_ok()
+
+    device_configurator = DeviceConfigurator()
+    device_configurator.add_talonfx("Test Motor", motor, make_config())
+    assert device_configurator.configure_all()
+    assert device_configurator.report["Test Motor"][0] == "Applied"
+
+    device_configurator.add_talonfx("Test Motor", motor, make_config())
+    assert device_configurator.configure_all()
+    assert device_configurator.report["Test Motor"][0] == "Skipped"
+
+
+def test_reports_device_that_does_not_respond():
+    device_configurator = DeviceConfigurator(timeout=0.01)
+    device_configurator.add_talonfx("Missing Motor", phoenix6.hardware.TalonFX(63, "Missing Bus"), make_config())
+
+    assert not device_configurator.configure_all()
+    assert device_configurator.report["Missing Motor"][0] == "Failed"
@@ -0,0 +1,136 @@
+'''
+    Tests for the pose history and for applying delayed vision measurements
+    to odometry.
+'''
+
+import pytest
+import wpilib
+from math import pi, sqrt
+from wpimath.geometry import Pose2d, Rotation2d, Translation2d
+from wpimath.kinematics import SwerveDrive4Kinematics, SwerveModulePosition
+
+from subsystems.odometry import Odometry
+from subsystems.pose_history import PoseHistory
+
+
+class MockDrivetrain():
+    kinematics = SwerveDrive4Kinematics(
+        Translation2d(0.250825, 0.250825),
+        Translation2d(0.250825, -0.250825),
+        Translation2d(-0.250825, 0.250825),
+        Translation2d(-0.250825, -0.250825),
+    )
+
+    def get_gyro_rotation(self):
+        return Rotation2d()
+
+    def get_module_positions(self):
+        return module_positions(0)
+
+
+def module_positions(distance):
+    return tuple(SwerveModulePosition(distance, Rotation2d()) for _ in range(4))
+
+
+def pose_values(pose):
+    return (pose.X(), pose.Y(), pose.rotation().radians())
+
+
+def test_sample_interpolates_between_poses():
+    history = PoseHistory(8)
+    history.add(1.0, Pose2d(0, 0, Rotation2d(0)))
+    history.add(2.0, Pose2d(2, -4, Rotation2d(1)))
+
+    assert pose_values(history.sample(1.25)) == pytest.approx((0.5, -1, 0.25))
+    assert pose_values(history.sample(1.0)) == pytest.approx((0, 0, 0))
+    # Before the oldest pose there is nothing to go on, after the newest it holds
+    assert history.sample(0.5) is None
+    assert pose_values(history.sample(3.0)) == pytest.approx((2, -4, 1))
+    assert PoseHistory(8).sample(1.0) is None
+
+
+def test_sample_takes_the_short_way_around():
+    history = PoseHistory(8)
+    history.add(1.0, Pose2d(0, 0, Rotation2d(pi - 0.1)))
+    history.add(2.0, Pose2d(0, 0, Rotation2d(-pi + 0.1)))
+
+    # Halfway is facing straight back, not forward
+    assert abs(history.sample(1.5).rotation().radians()) == pytest.approx(pi)
+
+
+def test_ring_buffer_keeps_the_newest_poses():
+    history = PoseHistory(4)
+    for i in range(10):
+        history.add(float(i), Pose2d(i, 0, Rotation2d()))
+
+    assert history.count == 4
+    assert history.get_oldest_timestamp() == 6.0
+    assert history.get_newest_timestamp() == 9.0
+    assert history.sample(5.5) is None
+    assert history.sample(8.5).X() == pytest.approx(8.5)
+
+    history.clear()
+    assert history.get_newest_timestamp() is None
+    assert history.sample(8.5) is None
+
+
+def test_correct_since_moves_later_poses():
+    history = PoseHistory(8)
+    for i in range(4):
+        history.add(float(i), Pose2d(i, 0, Rotation2d()))
+
+    # The pose at 2 s was really 1 m further left and turned a quarter turn
+    history.correct_since(2.0, Pose2d(2, 0, Rotation2d()), Pose2d(2, 1, Rotation2d(pi / 2)))
+
+    assert pose_values(history.sample(1.0)) == pytest.approx((1, 0, 0))
+    assert pose_values(history.sample(2.0)) == pytest.approx((2, 1, pi / 2))
+    # The pose after it keeps its place relative to the corrected pose
+    assert pose_values(history.sample(3.0)) == pytest.approx((2, 2, pi / 2))
+
+
+def test_vision_measurement_gain():
+    state_std_devs = (0.1, 0.2, 0.1)
+    vision_std_devs = (0.9, 0.9, 0.9)
+    odometry = Odometry(MockDrivetrain(), state_std_devs=state_std_devs, vision_std_devs=vision_std_devs)
+    now = wpilib.Timer.getFPGATimestamp()
+    odometry.update(now - 0.1, Rotation2d(), module_positions(0))
+    odometry.update(now, Rotation2d(), module_positions(0))
+
+    assert odometry.add_vision_measurement(Pose2d(1, 1, Rotation2d()), now)
+
+    gains = []
+    for state_std_dev, vision_std_dev in zip(state_std_devs, vision_std_devs):
+        q, r = state_std_dev ** 2, vision_std_dev ** 2
+        gains.append(q / (q + sqrt(q * r)))
+    assert gains[0] == pytest.approx(0.1)
+    assert pose_values(odometry.get_pose()) == pytest.approx((gains[0], gains[1], 0))
+
+
+def test_vision_measurement_replays_later_odometry():
+    odometry = Odometry(MockDrivetrain())
+    now = wpilib.Timer.getFPGATimestamp()
+    odometry.update(now - 0.2, Rotation2d(), module_positions(0))
+    odometry.update(now - 0.1, Rotation2d(), module_positions(0.5))
+    odometry.update(now, Rotation2d(), module_positions(1))
+
+    # Seen where the robot was 0.1 s ago, 1 m to the left of it
+    assert odometry.add_vision_measurement(Pose2d(0.5, 1, Rotation2d()), now - 0.1)
+
+    assert pose_values(odometry.get_pose()) == pytest.approx((1, 0.1, 0))
+    assert pose_values(odometry.pose_history.sample(now)) == pytest.approx((1, 0.1, 0))
+    assert pose_values(odometry.pose_history.sample(now - 0.2)) == pytest.approx((0, 0, 0))
+
+    # Odometry carries on from the corrected pose
+    odometry.update(now + 0.1, Rotation2d(), module_positions(1.5))
+    assert pose_values(odometry.get_pose()) == pytest.approx((1.5, 0.1, 0))
+
+
+def test_stale_vision_measurements_are_ignored():
+    odometry = Odometry(MockDrivetrain(), max_vision_delay=1.5)
+    now = wpilib.Timer.getFPGATimestamp()
+    odometry.update(now - 0.1, Rotation2d(), module_positions(0))
+
+    # Older than the delay allowed, and older than the pose history
+    assert not odometry.add_vision_measurement(Pose2d(1, 0, Rotation2d()), now - 2)
+    assert not odometry.add_vision_measurement(Pose2d(1, 0, Rotation2d()), now - 0.5)
+    assert pose_values(odometry.get_pose()) == pytest.approx((0, 0, 0))
@@ -0,0 +1,103 @@
+'''
+    Tests for the background odometry thread, driven by a mock signal source
+    in place of the Swerve Modules' status signals.
+'''
+
+import time
+
+from wpimath.geometry import Rotation2d, Translation2d
+from wpimath.kinematics import SwerveDrive4Kinematics, SwerveModulePosition
+
+from subsystems.odometry import Odometry
+from subsystems.odometry_thread import MockSignalSource, OdometryThread
+
+
+class MockDrivetrain():
+    kinematics = SwerveDrive4Kinematics(
+        Translation2d(0.250825, 0.250825),
+        Translation2d(0.250825, -0.250825),
+        Translation2d(-0.250825, 0.250825),
+        Translation2d(-0.250825, -0.250825),
+    )
+
+    def get_gyro_rotation(self):
+        return Rotation2d()
+
+    def get_module_positions(self):
+        return tuple(SwerveModulePosition() for _ in range(4))
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_odometry_thread_follows_signals():
+    odometry = Odometry(MockDrivetrain())
+    signal_source = MockSignalSource(frequency=250)
+    odometry_thread = OdometryThread(odometry, signal_source, frequency=250)
+    odometry_thread.start()
+    try:
+        signal_source.set_module_positions(SwerveModulePosition(1.5, Rotation2d()) for _ in range(4))
+        assert wait_for(lambda: abs(odometry.get_pose().X() - 1.5) < 1e-9)
+        assert odometry.get_pose().Y() == 0
+
+        # Updates arrive far faster than the 50 Hz robot loop.
+        start_count = odometry_thread.update_count
+        time.sleep(0.2)
+        assert odometry_thread.update_count - start_count > 20
+    finally:
+        odometry_thread.stop()
+    assert not odometry_thread.is_running()
+
+
+def test_odometry_thread_counts_missed_updates():
+    odometry = Odometry(MockDrivetrain())
+    signal_source = MockSignalSource(frequency=250)
+    signal_source.set_connected(False)
+    odometry_thread = OdometryThread(odometry, signal_source, frequency=250)
+    odometry_thread.start()
+    try:
+        assert wait_for(lambda: odometry_thread.missed_update_count >= 3)
+        assert odometry_thread.update_count == 0
+    finally:
+        odometry_thread.stop()
+
+
+def test_odometry_thread_pauses_while_signals_are_used():
+    odometry = Odometry(MockDrivetrain())
+    signal_source = MockSignalSource(frequency=250)
+    odometry_thread = OdometryThread(odometry, signal_source, frequency=250)
+    odometry_thread.start()
+    try:
+        assert wait_for(lambda: odometry_thread.update_count > 0)
+        thread = odometry_thread.thread
+        with odometry_thread.paused():
+            paused_count = odometry_thread.update_count
+            time.sleep(0.05)
+            assert odometry_thread.update_count == paused_count
+        # The same thread carries on rather than a new one being started
+        assert odometry_thread.thread is thread
+        assert wait_for(lambda: odometry_thread.update_count > paused_count)
+    finally:
+        odometry_thread.stop()
+    assert not odometry_thread.is_running()
+
+
+def test_odometry_thread_keeps_the_last_positions():
+    odometry = Odometry(MockDrivetrain())
+    signal_source = MockSignalSource(frequency=250)
+    odometry_thread = OdometryThread(odometry, signal_source, frequency=250)
+    assert odometry_thread.get_module_positions() is None
+    odometry_thread.start()
+    try:
+        signal_source.set_module_positions(SwerveModulePosition(0.5, Rotation2d()) for _ in range(4))
+
+        def distances():
+            module_positions = odometry_thread.get_module_positions()
+            return None if module_positions is None else [position.distance for position in module_positions]
+        assert wait_for(lambda: distances() == [0.5] * 4)
+    finally:
+        odometry_thread.stop()
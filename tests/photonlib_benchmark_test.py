@@ -0,0 +1,209 @@
+'''
+    Micro-benchmarks for decoding photonvision packets.
+
+    Synthetic frames are generated across a grid of target counts, detected
+    corner counts and multi-tag results, and each decode path is timed and
+    checked for allocations. A test fails when a frame allocates more than the
+    budgets below, so allocation regressions show up in the normal test run.
+    Wall-clock time depends on the machine, so the time budgets are only
+    checked with PHOTONLIB_BENCHMARK_TIMING=1. Run with ``-s`` to see the
+    timing report.
+'''
+
+import os
+import time
+import tracemalloc
+
+import ntcore
+import pytest
+
+from photonlibpy.packet import Packet
+from photonlibpy.photonCamera import PhotonCamera
+from photonlibpy.photonPipelineResult import PhotonPipelineResult
+from photonlibpy.photonTrackedTarget import PhotonTrackedTarget
+from sim_coprocessor import SimCoprocessor
+
+# Set PHOTONLIB_BENCHMARK_TIMING=1 to also fail on the time budgets.
+CHECK_TIMING = os.environ.get('PHOTONLIB_BENCHMARK_TIMING') == '1'
+
+# Per-frame budgets, in microseconds and bytes. The time budgets leave roughly
+# 4x headroom over a desktop run.
+FRAME_BUDGET_US = 150.0
+TARGET_BUDGET_US = 100.0
+LAZY_TARGET_BUDGET_US = 40.0
+FRAME_BUDGET_BYTES = 4096
+TARGET_BUDGET_BYTES = 2048
+
+TARGET_COUNTS = (0, 1, 4, 16, 32)
+CORNER_COUNTS = (0, 4, 8)
+MULTI_TAG = (False, True)
+
+# Frames decoded per round, and rounds timed; the fastest round is reported
+FRAMES = 50
+ROUNDS = 3
+
+
+def make_packet_data(target_count, corner_count, multi_tag):
+    # ntcore only allows a few instances at once, so destroy it when done
+    instance = ntcore.NetworkTableInstance.create()
+    coprocessor = SimCoprocessor(
+        'benchmark',
+        instance=instance,
+        targetCount=target_count,
+        detectedCornerCount=corner_count,
+        multiTag=multi_tag,
+        seed=target_count * 100 + corner_count * 10 + multi_tag,
+    )
+    result = coprocessor.makeResult()
+    del coprocessor
+    ntcore.NetworkTableInstance.destroy(instance)
+    return bytes(result.populatePacket(Packet()).getData())
+
+
+def time_per_frame(decode):
+    '''Fastest average time of one decode over several rounds, in microseconds.'''
+    decode()
+    best = float('inf')
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for _ in range(FRAMES):
+            decode()
+        best = min(best, (time.perf_counter() - start) / FRAMES)
+    return best * 1e6
+
+
+def peak_bytes_per_frame(decode):
+    '''Most memory held at once while decoding one frame, in bytes.'''
+    decode()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        decode()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - before
+
+
+def check_time(microseconds, budget_us):
+    if CHECK_TIMING:
+        assert microseconds <= budget_us
+
+
+def report(name, microseconds, peak_bytes):
+    print(
+        f'{name:<48} {microseconds:9.1f} us/frame {1e6 / microseconds:10.0f} '
+        f'frames/s {peak_bytes:8d} B peak'
+    )
+
+
+@pytest.mark.parametrize('multi_tag', MULTI_TAG)
+@pytest.mark.parametrize('corner_count', CORNER_COUNTS)
+@pytest.mark.parametrize('target_count', TARGET_COUNTS)
+@pytest.mark.parametrize('lazy', (False, True))
+def test_populate_from_packet(target_count, corner_count, multi_tag, lazy):
+    data = make_packet_data(target_count, corner_count, multi_tag)
+
+    def decode():
+        PhotonPipelineResult().populateFromPacket(Packet(data), lazy)
+
+    microseconds = time_per_frame(decode)
+    peak_bytes = peak_bytes_per_frame(decode)
+    report(
+        f'populateFromPacket t={target_count} c={corner_count} '
+        f'multitag={multi_tag} lazy={lazy}',
+        microseconds,
+        peak_bytes,
+    )
+
+    per_target_us = LAZY_TARGET_BUDGET_US if lazy else TARGET_BUDGET_US
+    check_time(microseconds, FRAME_BUDGET_US + per_target_us * target_count)
+    assert peak_bytes <= FRAME_BUDGET_BYTES + TARGET_BUDGET_BYTES * target_count
+
+
+@pytest.mark.parametrize('target_count', TARGET_COUNTS)
+def test_populate_from_packet_pooled(target_count):
+    data = make_packet_data(target_count, 4, True)
+    result = PhotonPipelineResult()
+
+    def decode():
+        result.populateFromPacket(Packet(data), reuse=True)
+
+    microseconds = time_per_frame(decode)
+    peak_bytes = peak_bytes_per_frame(decode)
+    report(f'populateFromPacket pooled t={target_count}', microseconds, peak_bytes)
+
+    check_time(microseconds, FRAME_BUDGET_US + TARGET_BUDGET_US * target_count)
+    assert peak_bytes <= FRAME_BUDGET_BYTES + TARGET_BUDGET_BYTES * target_count
+
+
+@pytest.mark.parametrize('corner_count', CORNER_COUNTS)
+def test_target_create_from_packet(corner_count):
+    data = make_packet_data(1, corner_count, False)
+    # Skip the latency and target count ahead of the first target
+    target_offset = 8 + 1
+    target = PhotonTrackedTarget()
+
+    def decode():
+        packet = Packet(data)
+        packet.skip(target_offset)
+        target.createFromPacket(packet)
+
+    microseconds = time_per_frame(decode)
+    peak_bytes = peak_bytes_per_frame(decode)
+    report(f'PhotonTrackedTarget c={corner_count}', microseconds, peak_bytes)
+
+    check_time(microseconds, TARGET_BUDGET_US)
+    assert peak_bytes <= TARGET_BUDGET_BYTES
+
+
+def test_packet_primitives():
+    packet = Packet()
+    for _ in range(FRAMES):
+        packet.encode8(1)
+        packet.encode16(2)
+        packet.encode32(3)
+        packet.encodeDouble(4.0)
+    data = bytes(packet.getData())
+
+    def decode():
+        packet = Packet(data)
+        for _ in range(FRAMES):
+            packet.decode8()
+            packet.decode16()
+            packet.decode32()
+            packet.decodeDouble()
+
+    microseconds = time_per_frame(decode)
+    peak_bytes = peak_bytes_per_frame(decode)
+    report(f'Packet {4 * FRAMES} primitives', microseconds, peak_bytes)
+
+    # About as much decoding as a frame with a handful of targets
+    check_time(microseconds, FRAME_BUDGET_US + TARGET_BUDGET_US * 4)
+    assert peak_bytes <= FRAME_BUDGET_BYTES
+
+
+@pytest.mark.parametrize('target_count', TARGET_COUNTS)
+def test_get_latest_result(target_count):
+    coprocessor = SimCoprocessor(
+        f'benchmark{target_count}', targetCount=target_count, seed=target_count
+    )
+    camera = PhotonCamera(f'benchmark{target_count}')
+    coprocessor.publishFrame()
+    assert camera.getLatestResult().getLatencyMillis() == coprocessor.latencyMillis
+
+    # Every call decodes the frame again while the cache is off
+    camera.setResultCacheEnabled(False)
+    microseconds = time_per_frame(camera.getLatestResult)
+    peak_bytes = peak_bytes_per_frame(camera.getLatestResult)
+    report(f'getLatestResult t={target_count}', microseconds, peak_bytes)
+
+    check_time(microseconds, FRAME_BUDGET_US + TARGET_BUDGET_US * target_count)
+    assert peak_bytes <= FRAME_BUDGET_BYTES + TARGET_BUDGET_BYTES * target_count
+
+    camera.setResultCacheEnabled(True)
+    microseconds = time_per_frame(camera.getLatestResult)
+    report(f'getLatestResult cached t={target_count}', microseconds, 0)
+
+    check_time(microseconds, FRAME_BUDGET_US)
@@ -0,0 +1,141 @@
+'''
+    Tests for how PhotonCamera hands out results, against frames published by a
+    SimCoprocessor on an isolated NetworkTables instance.
+'''
+
+import ntcore
+import pytest
+from wpilib.simulation import stepTimingAsync
+
+from photonlibpy.photonCamera import PhotonCamera
+from sim_coprocessor import SimCoprocessor
+
+
+@pytest.fixture
+def instance():
+    # ntcore only allows a few instances at once, so each test destroys its own
+    instance = ntcore.NetworkTableInstance.create()
+    instance.startLocal()
+    yield instance
+    ntcore.NetworkTableInstance.destroy(instance)
+
+
+def make_camera(instance, name, **kwargs):
+    coprocessor = SimCoprocessor(name, instance=instance, seed=0)
+    camera = PhotonCamera(name, instance=instance, **kwargs)
+    return coprocessor, camera
+
+
+def publish(coprocessor, latency_millis):
+    '''Publish a frame that can be told apart by its latency.'''
+    # Simulated time may be paused, so step it to give each frame its own timestamp
+    stepTimingAsync(0.01)
+    coprocessor.latencyMillis = latency_millis
+    coprocessor.publishFrame()
+
+
+def test_latest_result_is_cached_until_a_new_frame(instance):
+    coprocessor, camera = make_camera(instance, 'cache')
+    publish(coprocessor, 10.0)
+
+    first = camera.getLatestResult()
+    assert first.getLatencyMillis() == 10.0
+    assert camera.getLatestResult() is first
+    assert (camera.getResultCacheHits(), camera.getResultCacheMisses()) == (1, 1)
+
+    publish(coprocessor, 20.0)
+    second = camera.getLatestResult()
+    assert second is not first and second.getLatencyMillis() == 20.0
+    assert (camera.getResultCacheHits(), camera.getResultCacheMisses()) == (1, 2)
+
+    # Invalidating decodes the same frame again
+    camera.invalidateResultCache()
+    third = camera.getLatestResult()
+    assert third is not second and third.getLatencyMillis() == 20.0
+    assert (camera.getResultCacheHits(), camera.getResultCacheMisses()) == (1, 3)
+
+    # With the cache off every call decodes and neither counter moves
+    camera.setResultCacheEnabled(False)
+    assert camera.getLatestResult() is not camera.getLatestResult()
+    assert (camera.getResultCacheHits(), camera.getResultCacheMisses()) == (1, 3)
+
+
+
+def test_all_unread_results_in_order(instance):
+    coprocessor, camera = make_camera(instance, 'unread')
+    latencies = [10.0, 12.0, 14.0, 16.0]
+    for latency in latencies:
+        publish(coprocessor, latency)
+
+    results = camera.getAllUnreadResults()
+    assert [result.getLatencyMillis() for result in results] == latencies
+
+    # The queue is empty until the next frame
+    assert camera.getAllUnreadResults() == []
+    publish(coprocessor, 50.0)
+    assert [result.getLatencyMillis() for result in camera.getAllUnreadResults()] == [50.0]
+
+    # getLatestResult still decodes the newest frame itself, into a result of its own
+    latest = camera.getLatestResult()
+    assert latest.getLatencyMillis() == 50.0
+    assert all(latest is not result for result in results)
+    assert camera.getLatestResult() is latest
+    assert (camera.getResultCacheHits(), camera.getResultCacheMisses()) == (1, 1)
+
+
+def test_background_decoding(instance):
+    coprocessor, camera = make_camera(instance, 'background', lazyDecode=True)
+    coprocessor.targetCount = 3
+    coprocessor.multiTag = True
+    publish(coprocessor, 10.0)
+
+    # The frame already published is decoded straight away
+    camera.setBackgroundDecodingEnabled(True)
+    assert camera.getLatestResult().getLatencyMillis() == 10.0
+
+    publish(coprocessor, 20.0)
+    assert instance.waitForListenerQueue(1.0)
+    result = camera.getLatestResult()
+    assert result.getLatencyMillis() == 20.0 and len(result.getTargets()) == 3
+    assert camera.getLatestResult() is result
+
+    # Decoded in full on the listener thread despite lazyDecode
+    assert result._deferredPacket is None
+    assert all(target._deferredPacket is None for target in result.getTargets())
+    assert (camera.getResultCacheHits(), camera.getResultCacheMisses()) == (0, 0)
+
+    # Once stopped, new frames are only decoded when asked for
+    camera.setBackgroundDecodingEnabled(False)
+    publish(coprocessor, 30.0)
+    assert instance.waitForListenerQueue(1.0)
+    assert camera.getLatestResult().getLatencyMillis() == 30.0
+    assert (camera.getResultCacheHits(), camera.getResultCacheMisses()) == (0, 1)
+    camera.setBackgroundDecodingEnabled(False)
+
+
+def test_result_pool(instance):
+    coprocessor, camera = make_camera(instance, 'pool')
+    camera.setResultCacheEnabled(False)
+    camera.setResultPoolSize(2)
+
+    publish(coprocessor, 10.0)
+    first = camera.getLatestResult()
+    second = camera.getLatestResult()
+    assert second is not first
+    # The pool takes turns, so the third decode goes back into the first result
+    publish(coprocessor, 20.0)
+    assert camera.getLatestResult() is first
+    assert first.getLatencyMillis() == 20.0 and second.getLatencyMillis() == 10.0
+
+    # A detached result, or a copy, is left alone by later decodes
+    kept = camera.detachResult(second)
+    copy = first.copy()
+    publish(coprocessor, 30.0)
+    for _ in range(4):
+        assert camera.getLatestResult() is not kept
+    assert kept.getLatencyMillis() == 10.0
+    assert copy.getLatencyMillis() == 20.0
+
+    # Without a pool every decode makes a new result
+    camera.setResultPoolSize(0)
+    assert camera.getLatestResult() is not camera.getLatestResult()
@@ -0,0 +1,307 @@
+'''
+    Correctness tests for decoding photonvision packets: every fast path must
+    decode exactly what the straightforward field by field decode does.
+'''
+
+import random
+import struct
+from array import array
+
+import ntcore
+import numpy as np
+import pytest
+from wpimath.geometry import Rotation3d, Transform3d, Translation3d
+
+from photonlibpy.packet import Packet
+from photonlibpy.photonPipelineResult import PhotonPipelineResult
+from photonlibpy.photonTrackedTarget import PhotonTrackedTarget, TargetCornerArray
+from photonlibpy.targetColumns import TargetColumns
+from sim_coprocessor import SimCoprocessor
+
+# Layout of one serialized target ahead of its detected corners
+TARGET_PREFIX = struct.Struct('>4dl7d7dd8db')
+
+
+def random_target_bytes(rng, corner_count):
+    '''One serialized target with random values in every field.'''
+    values = [rng.uniform(-1e3, 1e3) for _ in range(4)]
+    values.append(rng.randint(-1, 2**31 - 1))
+    values += [rng.uniform(-10.0, 10.0) for _ in range(14)]
+    values.append(rng.uniform(-1.0, 1.0))
+    values += [rng.uniform(0.0, 1280.0) for _ in range(8)]
+    values.append(corner_count)
+    corners = [rng.uniform(0.0, 1280.0) for _ in range(2 * corner_count)]
+    return TARGET_PREFIX.pack(*values) + struct.pack(f'>{len(corners)}d', *corners)
+
+
+def decode_corners(packet, corner_count):
+    corners = array('d')
+    for _ in range(corner_count):
+        corners.append(packet.decodeDouble())
+        corners.append(packet.decodeDouble())
+    return TargetCornerArray(corners)
+
+
+def decode_target_per_field(packet):
+    '''The field by field decode that createFromPacket must stay bit-identical to.'''
+    target = PhotonTrackedTarget()
+    target.yaw = packet.decodeDouble()
+    target.pitch = packet.decodeDouble()
+    target.area = packet.decodeDouble()
+    target.skew = packet.decodeDouble()
+    target.fiducialId = packet.decode32()
+
+    target.bestCameraToTarget = packet.decodeTransform()
+    target.altCameraToTarget = packet.decodeTransform()
+
+    target.poseAmbiguity = packet.decodeDouble()
+
+    target.minAreaRectCorners = decode_corners(packet, 4)  # always four
+    target.detectedCorners = decode_corners(packet, packet.decode8())
+    return target
+
+
+TARGET_COUNTS = (0, 1, 4, 16, 32)
+CORNER_COUNTS = (0, 4, 8)
+MULTI_TAG = (False, True)
+
+# Frames are generated without a coprocessor on the network
+INSTANCE = ntcore.NetworkTableInstance.create()
+
+
+def make_result(target_count, corner_count, multi_tag):
+    coprocessor = SimCoprocessor(
+        'decode',
+        instance=INSTANCE,
+        targetCount=target_count,
+        detectedCornerCount=corner_count,
+        multiTag=multi_tag,
+        seed=target_count * 100 + corner_count * 10 + multi_tag,
+    )
+    return coprocessor.makeResult()
+
+
+def target_bits(target):
+    '''Every field of a target as raw bytes, so two targets compare bit for bit.'''
+    doubles = array('d', (target.yaw, target.pitch, target.area, target.skew, target.poseAmbiguity))
+    doubles.extend(Packet.transformToDoubles(target.bestCameraToTarget))
+    doubles.extend(Packet.transformToDoubles(target.altCameraToTarget))
+    doubles.extend(target.minAreaRectCorners.getData())
+    doubles.extend(target.detectedCorners.getData())
+    return target.fiducialId, len(target.detectedCorners), doubles.tobytes()
+
+
+def result_bits(result):
+    '''Every decoded field of a result as raw bytes, so two results compare bit for bit.'''
+    pnp = result.multiTagResult.estimatedPose
+    doubles = array('d', (result.latencyMillis, pnp.ambiguity, pnp.bestReprojError, pnp.altReprojError))
+    doubles.extend(Packet.transformToDoubles(pnp.best))
+    doubles.extend(Packet.transformToDoubles(pnp.alt))
+    return (
+        [target_bits(target) for target in result.targets],
+        pnp.isPresent,
+        list(result.multiTagResult.fiducialIDsUsed),
+        doubles.tobytes(),
+    )
+
+
+def encode(result):
+    return bytes(result.populatePacket(Packet()).getData())
+
+
+def assert_same_result(decoded, source):
+    '''
+    Check a decoded result against the result it was encoded from. Building a
+    rotation renormalizes its quaternion, so transforms only match to rounding.
+    '''
+    assert decoded.latencyMillis == source.latencyMillis
+    assert len(decoded.targets) == len(source.targets)
+    for decoded_target, source_target in zip(decoded.targets, source.targets):
+        assert (decoded_target.yaw, decoded_target.pitch, decoded_target.area, decoded_target.skew) == (
+            source_target.yaw, source_target.pitch, source_target.area, source_target.skew)
+        assert decoded_target.fiducialId == source_target.fiducialId
+        assert decoded_target.poseAmbiguity == source_target.poseAmbiguity
+        assert decoded_target.minAreaRectCorners == source_target.minAreaRectCorners
+        assert decoded_target.detectedCorners == source_target.detectedCorners
+        for name in ('bestCameraToTarget', 'altCameraToTarget'):
+            assert Packet.transformToDoubles(getattr(decoded_target, name)) == pytest.approx(
+                Packet.transformToDoubles(getattr(source_target, name)), abs=1e-12)
+
+    decoded_pnp = decoded.multiTagResult.estimatedPose
+    source_pnp = source.multiTagResult.estimatedPose
+    assert decoded.multiTagResult.fiducialIDsUsed == source.multiTagResult.fiducialIDsUsed
+    assert decoded_pnp.isPresent == source_pnp.isPresent
+    assert (decoded_pnp.ambiguity, decoded_pnp.bestReprojError, decoded_pnp.altReprojError) == (
+        source_pnp.ambiguity, source_pnp.bestReprojError, source_pnp.altReprojError)
+    for name in ('best', 'alt'):
+        assert Packet.transformToDoubles(getattr(decoded_pnp, name)) == pytest.approx(
+            Packet.transformToDoubles(getattr(source_pnp, name)), abs=1e-12)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_struct_decode_matches_field_by_field_decode(seed):
+    rng = random.Random(seed)
+    data = b''.join(random_target_bytes(rng, rng.randint(0, 8)) for _ in range(rng.randint(1, 8)))
+
+    fast_packet = Packet(data)
+    reference_packet = Packet(data)
+    while reference_packet.readPos < len(data):
+        fast_target = PhotonTrackedTarget()
+        fast_target.createFromPacket(fast_packet)
+        reference_target = decode_target_per_field(reference_packet)
+
+        assert target_bits(fast_target) == target_bits(reference_target)
+        assert fast_packet.readPos == reference_packet.readPos
+    assert not fast_packet.outOfBytes
+
+
+def test_packet_primitives_round_trip():
+    transform = Transform3d(Translation3d(1.5, -2.25, 0.125), Rotation3d(0.1, -0.2, 3.0))
+    packet = Packet()
+    packet.encode8(-7)
+    packet.encode16(-1234)
+    packet.encode32(2**31 - 1)
+    packet.encodeDouble(-0.1)
+    packet.encodeBoolean(True)
+    packet.encodeBoolean(False)
+    packet.encodeDoubleArray([1.0, 2.5, -3.75])
+    packet.encodeTransform(transform)
+
+    packet = Packet(bytes(packet.getData()))
+    assert packet.decode8() == -7
+    assert packet.decode16() == -1234
+    assert packet.decode32() == 2**31 - 1
+    assert packet.decodeDouble() == -0.1
+    assert packet.decodeBoolean() is True
+    assert packet.decodeBoolean() is False
+    assert packet.decodeDoubleArray(3) == [1.0, 2.5, -3.75]
+    assert Packet.transformToDoubles(packet.decodeTransform()) == Packet.transformToDoubles(transform)
+    assert packet.readPos == packet.getSize() and not packet.outOfBytes
+
+    # Reading past the end decodes zeros instead of raising
+    assert packet.decodeDouble() == 0.0
+    assert packet.outOfBytes
+
+
+@pytest.mark.parametrize('multi_tag', MULTI_TAG)
+@pytest.mark.parametrize('corner_count', CORNER_COUNTS)
+@pytest.mark.parametrize('target_count', TARGET_COUNTS)
+def test_result_round_trip(target_count, corner_count, multi_tag):
+    result = make_result(target_count, corner_count, multi_tag)
+    data = encode(result)
+
+    decoded = PhotonPipelineResult()
+    packet = decoded.populateFromPacket(Packet(data))
+
+    assert packet.readPos == len(data) and not packet.outOfBytes
+    assert_same_result(decoded, result)
+    assert decoded.multiTagResult.estimatedPose.isPresent == (multi_tag and target_count > 1)
+
+
+@pytest.mark.parametrize('multi_tag', MULTI_TAG)
+@pytest.mark.parametrize('corner_count', CORNER_COUNTS)
+@pytest.mark.parametrize('target_count', TARGET_COUNTS)
+def test_lazy_decode_matches_eager_decode(target_count, corner_count, multi_tag):
+    data = encode(make_result(target_count, corner_count, multi_tag))
+    eager = PhotonPipelineResult()
+    eager.populateFromPacket(Packet(data))
+    lazy = PhotonPipelineResult()
+    packet = lazy.populateFromPacket(Packet(data), lazy=True)
+
+    assert packet.readPos == len(data)
+    # Only the scalar fields are decoded up front
+    assert [target.yaw for target in lazy.targets] == [target.yaw for target in eager.targets]
+    assert all(target._deferredPacket is not None for target in lazy.targets)
+    assert lazy._deferredPacket is not None
+
+    assert result_bits(lazy) == result_bits(eager)
+    assert all(target._deferredPacket is None for target in lazy.targets)
+    assert lazy._deferredPacket is None
+
+
+@pytest.mark.parametrize('multi_tag', MULTI_TAG)
+@pytest.mark.parametrize('corner_count', CORNER_COUNTS)
+@pytest.mark.parametrize('target_count', TARGET_COUNTS)
+def test_columns_from_packet_match_columns_from_targets(target_count, corner_count, multi_tag):
+    decoded = PhotonPipelineResult()
+    decoded.populateFromPacket(Packet(encode(make_result(target_count, corner_count, multi_tag))))
+
+    from_packet = decoded.getTargetColumns()
+    from_targets = TargetColumns.fromTargets(decoded.targets)
+    assert len(from_packet) == len(from_targets) == target_count
+
+    for name in ('fiducialIds', 'yaw', 'pitch', 'area', 'skew', 'poseAmbiguity',
+                 'minAreaRectCorners', 'detectedCorners', 'numDetectedCorners'):
+        np.testing.assert_array_equal(getattr(from_packet, name), getattr(from_targets, name), err_msg=name)
+    # The packet holds the quaternion as sent, the targets hold it renormalized
+    for name in ('bestCameraToTarget', 'altCameraToTarget'):
+        np.testing.assert_allclose(getattr(from_packet, name), getattr(from_targets, name), rtol=0, atol=1e-12)
+
+    # Corner slots past each target's own count are padded with NaN
+    assert (from_packet.numDetectedCorners == corner_count).all()
+    assert np.isnan(from_packet.detectedCorners[:, corner_count:]).all()
+    assert not np.isnan(from_packet.detectedCorners[:, :corner_count]).any()
+
+
+def test_decoding_again_leaves_held_targets_alone():
+    first = encode(make_result(4, 4, True))
+    decoded = PhotonPipelineResult()
+    decoded.populateFromPacket(Packet(first))
+    latency_millis = decoded.latencyMillis
+    targets = list(decoded.targets)
+    multi_tag_result = decoded.multiTagResult
+    bits = result_bits(decoded)
+
+    for lazy in (False, True):
+        decoded.populateFromPacket(Packet(encode(make_result(3, 8, True))), lazy=lazy)
+        assert not any(new is old for new, old in zip(decoded.targets, targets))
+        assert decoded.multiTagResult is not multi_tag_result
+
+    kept = PhotonPipelineResult(latency_millis, -1.0, targets, multi_tag_result)
+    assert result_bits(kept) == bits
+
+
+def test_reusing_decodes_reuse_targets_and_multi_tag_result():
+    first = encode(make_result(4, 4, True))
+    second = encode(make_result(3, 8, True))
+    decoded = PhotonPipelineResult()
+    decoded.populateFromPacket(Packet(first), reuse=True)
+    targets = list(decoded.targets)
+    multi_tag_result = decoded.multiTagResult
+
+    decoded.populateFromPacket(Packet(second), reuse=True)
+    assert all(new is old for new, old in zip(decoded.targets, targets))
+    assert decoded.multiTagResult is multi_tag_result
+
+    # Lazy decodes whose multi-tag result is never read keep it for a later one
+    decoded.populateFromPacket(Packet(first), lazy=True, reuse=True)
+    decoded.populateFromPacket(Packet(second), lazy=True, reuse=True)
+    assert decoded.multiTagResult is multi_tag_result
+    fresh = PhotonPipelineResult()
+    fresh.populateFromPacket(Packet(second))
+    assert result_bits(decoded) == result_bits(fresh)
+
+
+def test_copy_is_independent_of_later_decodes():
+    source = make_result(4, 4, True)
+    decoded = PhotonPipelineResult()
+    decoded.populateFromPacket(Packet(encode(source)))
+    copy = decoded.copy()
+    bits = result_bits(decoded)
+
+    decoded.populateFromPacket(Packet(encode(make_result(3, 8, True))))
+
+    assert result_bits(copy) == bits
+    assert_same_result(copy, source)
+
+
+def test_decoding_again_leaves_held_fiducial_ids_alone():
+    decoded = PhotonPipelineResult()
+    decoded.populateFromPacket(Packet(encode(make_result(4, 4, True))))
+    ids = decoded.multiTagResult.fiducialIDsUsed
+    held = list(ids)
+
+    decoded.populateFromPacket(Packet(encode(make_result(3, 4, True))))
+
+    assert ids == held
+    assert decoded.multiTagResult.fiducialIDsUsed is not ids
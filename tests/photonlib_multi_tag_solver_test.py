@@ -0,0 +1,92 @@
+'''
+    Tests for the on-RIO multi-tag solver, on corners projected from a known
+    camera pose.
+'''
+
+import numpy as np
+import pytest
+from wpimath.geometry import Pose3d, Rotation3d, Translation3d
+
+from photonlibpy.multiTagSolver import MultiTagSolver, _Projector
+from photonlibpy.poseCandidates import poseToDoubles
+
+CAMERA_MATRIX = np.array(((914.0, 0.0, 640.0), (0.0, 914.0, 400.0), (0.0, 0.0, 1.0)))
+DISTORTION = np.array((0.05, -0.1, 0.001, -0.002, 0.02))
+
+# Three tags facing the camera from 3 to 4 meters away
+TAG_POSES = np.array(
+    [
+        poseToDoubles(Pose3d(4, 0, 1, Rotation3d(0, 0, np.pi))),
+        poseToDoubles(Pose3d(4, 1, 1.3, Rotation3d(0, 0, np.pi))),
+        poseToDoubles(Pose3d(3.5, -1, 0.8, Rotation3d(0, 0, np.pi - 0.3))),
+    ]
+)
+
+TRUE_POSE = Pose3d(Translation3d(0.5, 0.2, 0.6), Rotation3d(0.02, -0.1, 0.05))
+# Off by 15 cm and a few degrees
+SEED_POSE = Pose3d(Translation3d(0.6, 0.1, 0.65), Rotation3d(0.05, -0.05, 0.1))
+
+
+def make_problem(solver, dist_coeffs):
+    field_corners = solver.fieldCorners(TAG_POSES)
+    projector = _Projector(field_corners, CAMERA_MATRIX, dist_coeffs)
+    corners = projector.project(poseToDoubles(TRUE_POSE)[None, :])[0]
+    return corners, field_corners
+
+
+@pytest.mark.parametrize('dist_coeffs', (np.zeros(5), DISTORTION))
+def test_converges_to_the_true_pose(dist_coeffs):
+    solver = MultiTagSolver(maxIterations=50, timeBudgetSeconds=1.0)
+    corners, field_corners = make_problem(solver, dist_coeffs)
+
+    solution = solver.solve(
+        corners, field_corners, CAMERA_MATRIX, dist_coeffs, poseToDoubles(SEED_POSE)[None, :]
+    )
+
+    assert solution.converged
+    assert solution.reprojectionError < 0.1
+    pose = solution.cameraPose
+    assert pose.translation().distance(TRUE_POSE.translation()) < 1e-3
+    assert (pose.rotation() - TRUE_POSE.rotation()).angle < 1e-3
+
+
+def test_starts_from_the_best_seed():
+    solver = MultiTagSolver(maxIterations=0, timeBudgetSeconds=1.0)
+    corners, field_corners = make_problem(solver, np.zeros(5))
+    far_seed = Pose3d(Translation3d(-1, 2, 1), Rotation3d(0, 0, 0.5))
+    seeds = np.array((poseToDoubles(far_seed), poseToDoubles(TRUE_POSE)))
+
+    solution = solver.solve(corners, field_corners, CAMERA_MATRIX, np.zeros(5), seeds)
+
+    assert solution.iterations == 0
+    assert solution.reprojectionError < 1e-6
+
+
+def test_iteration_limit_returns_the_best_pose_so_far():
+    unlimited = MultiTagSolver(maxIterations=50, timeBudgetSeconds=1.0)
+    corners, field_corners = make_problem(unlimited, DISTORTION)
+    seeds = poseToDoubles(SEED_POSE)[None, :]
+    seed_error = MultiTagSolver(maxIterations=0).solve(
+        corners, field_corners, CAMERA_MATRIX, DISTORTION, seeds
+    ).reprojectionError
+
+    solution = MultiTagSolver(maxIterations=1, timeBudgetSeconds=1.0).solve(
+        corners, field_corners, CAMERA_MATRIX, DISTORTION, seeds
+    )
+
+    assert solution.iterations == 1
+    assert not solution.converged
+    assert solution.reprojectionError < seed_error
+
+
+def test_time_budget_stops_the_solve():
+    solver = MultiTagSolver(maxIterations=50, timeBudgetSeconds=0.0)
+    corners, field_corners = make_problem(solver, DISTORTION)
+    seed = poseToDoubles(SEED_POSE)
+
+    solution = solver.solve(corners, field_corners, CAMERA_MATRIX, DISTORTION, seed[None, :])
+
+    # Out of time before the first step, so the seed comes back unchanged
+    assert solution.iterations == 0
+    assert not solution.converged
+    assert poseToDoubles(solution.cameraPose) == pytest.approx(seed)
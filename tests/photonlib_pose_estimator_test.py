@@ -0,0 +1,237 @@
+'''
+    Tests for PhotonPoseEstimator's strategies, on a small field of tags with
+    hand-computed expected poses.
+'''
+
+from math import pi
+
+import pytest
+from robotpy_apriltag import AprilTag, AprilTagFieldLayout
+from wpimath.geometry import Pose2d, Pose3d, Rotation2d, Rotation3d, Transform3d, Translation3d
+
+from photonlibpy.multiTargetPNPResult import MultiTargetPNPResult, PNPResult
+from photonlibpy.photonPipelineResult import PhotonPipelineResult
+from photonlibpy.photonPoseEstimator import PhotonPoseEstimator, PoseStrategy
+from photonlibpy.photonTrackedTarget import PhotonTrackedTarget
+
+
+def make_tag(fiducial_id, pose):
+    tag = AprilTag()
+    tag.ID = fiducial_id
+    tag.pose = pose
+    return tag
+
+
+# Tags 1 and 2 face the robot from 4 meters away, 1 meter above the floor
+FIELD = AprilTagFieldLayout(
+    [
+        make_tag(1, Pose3d(4, 0, 1, Rotation3d(0, 0, 0))),
+        make_tag(2, Pose3d(4, 1, 1, Rotation3d(0, 0, 0))),
+    ],
+    16.5,
+    8.2,
+)
+
+
+def pose_values(pose):
+    return (pose.X(), pose.Y(), pose.Z(), pose.rotation().X(), pose.rotation().Y(), pose.rotation().Z())
+
+
+def test_multi_tag_on_coprocessor_uses_every_target():
+    estimator = PhotonPoseEstimator(FIELD, PoseStrategy.MULTI_TAG_PNP_ON_COPROCESSOR, None, Transform3d())
+    field_to_camera = Transform3d(Translation3d(1, 0.5, 1), Rotation3d(0, 0, 0.25))
+    targets = [
+        PhotonTrackedTarget(fiducialId=1, poseAmbiguity=0.1),
+        PhotonTrackedTarget(fiducialId=2, poseAmbiguity=0.1),
+        # Not part of the multi-tag solve, but still seen in the frame
+        PhotonTrackedTarget(fiducialId=7, poseAmbiguity=0.1),
+    ]
+    result = PhotonPipelineResult(20.0, 1.0, targets, MultiTargetPNPResult(PNPResult(True, field_to_camera), [1, 2]))
+
+    estimate = estimator.update(result)
+
+    assert estimate.strategy is PoseStrategy.MULTI_TAG_PNP_ON_COPROCESSOR
+    assert estimate.targetsUsed == result.targets
+    assert pose_values(estimate.estimatedPose) == pytest.approx((1, 0.5, 1, 0, 0, 0.25))
+
+
+def camera_to_tag(x, y, z):
+    # With the camera facing the same way as the tags, the camera sits at the
+    # tag's position minus this translation
+    return Transform3d(Translation3d(x, y, z), Rotation3d())
+
+
+def make_result(timestamp, *targets):
+    return PhotonPipelineResult(20.0, timestamp, list(targets))
+
+
+def test_closest_to_camera_height():
+    robot_to_camera = Transform3d(Translation3d(0, 0, 0.5), Rotation3d())
+    estimator = PhotonPoseEstimator(FIELD, PoseStrategy.CLOSEST_TO_CAMERA_HEIGHT, None, robot_to_camera)
+    # The alternate puts the camera 0.5 m up, at its mounting height
+    target = PhotonTrackedTarget(
+        fiducialId=1, bestCameraToTarget=camera_to_tag(3, 0, 0.8), altCameraToTarget=camera_to_tag(3, 0.2, 0.5), poseAmbiguity=0.3
+    )
+
+    estimate = estimator.update(make_result(1.0, target))
+
+    assert estimate.strategy is PoseStrategy.CLOSEST_TO_CAMERA_HEIGHT
+    assert pose_values(estimate.estimatedPose) == pytest.approx((1, -0.2, 0, 0, 0, 0))
+
+
+def test_closest_to_camera_height_prefers_the_alternate_on_a_tie():
+    robot_to_camera = Transform3d(Translation3d(0, 0, 0.5), Rotation3d())
+    estimator = PhotonPoseEstimator(FIELD, PoseStrategy.CLOSEST_TO_CAMERA_HEIGHT, None, robot_to_camera)
+    # Cameras 0.25 m below and above the mounting height
+    target = PhotonTrackedTarget(
+        fiducialId=1, bestCameraToTarget=camera_to_tag(3, 0, 0.75), altCameraToTarget=camera_to_tag(3, 0.5, 0.25), poseAmbiguity=0.3
+    )
+
+    estimate = estimator.update(make_result(1.0, target))
+
+    assert pose_values(estimate.estimatedPose) == pytest.approx((1, -0.5, 0.25, 0, 0, 0))
+
+
+def test_closest_to_reference_pose():
+    estimator = PhotonPoseEstimator(FIELD, PoseStrategy.CLOSEST_TO_REFERENCE_POSE, None, Transform3d())
+    targets = [
+        PhotonTrackedTarget(fiducialId=1, bestCameraToTarget=camera_to_tag(3, 0, 0.5), altCameraToTarget=camera_to_tag(2, 0, 0.5), poseAmbiguity=0.3),
+        PhotonTrackedTarget(fiducialId=2, bestCameraToTarget=camera_to_tag(3, 0.4, 0.5), altCameraToTarget=camera_to_tag(2.5, 0.4, 0.5), poseAmbiguity=0.3),
+    ]
+
+    # Without a reference there is nothing to compare against
+    assert estimator.update(make_result(1.0, *targets)) is None
+
+    # Closest to tag 2's alternate, which puts the robot at (1.5, 0.6)
+    estimator.referencePose = Pose2d(1.6, 0.6, Rotation2d())
+    estimate = estimator.update(make_result(2.0, *targets))
+
+    assert estimate.strategy is PoseStrategy.CLOSEST_TO_REFERENCE_POSE
+    assert pose_values(estimate.estimatedPose) == pytest.approx((1.5, 0.6, 0.5, 0, 0, 0))
+
+
+def test_closest_to_reference_pose_prefers_the_alternate_on_a_tie():
+    estimator = PhotonPoseEstimator(FIELD, PoseStrategy.CLOSEST_TO_REFERENCE_POSE, None, Transform3d())
+    target = PhotonTrackedTarget(
+        fiducialId=1, bestCameraToTarget=camera_to_tag(3, 0.5, 0), altCameraToTarget=camera_to_tag(3, -0.5, 0), poseAmbiguity=0.3
+    )
+    # Halfway between the robot poses at y = -0.5 and y = 0.5
+    estimator.referencePose = Pose3d(1, 0, 1, Rotation3d())
+
+    estimate = estimator.update(make_result(1.0, target))
+
+    assert pose_values(estimate.estimatedPose) == pytest.approx((1, 0.5, 1, 0, 0, 0))
+
+
+def test_closest_to_last_pose():
+    estimator = PhotonPoseEstimator(FIELD, PoseStrategy.CLOSEST_TO_LAST_POSE, None, Transform3d())
+
+    def target(best_y, alt_y):
+        return PhotonTrackedTarget(
+            fiducialId=1, bestCameraToTarget=camera_to_tag(3, best_y, 0.5), altCameraToTarget=camera_to_tag(3, alt_y, 0.5), poseAmbiguity=0.3
+        )
+
+    # Without a last pose there is nothing to compare against
+    assert estimator.update(make_result(1.0, target(0, 1))) is None
+
+    # Robot poses at y = 0 and y = -1, the first closest to the initial estimate
+    estimator.lastPose = Pose2d(1, 0.2, Rotation2d())
+    estimate = estimator.update(make_result(2.0, target(0, 1)))
+    assert estimate.strategy is PoseStrategy.CLOSEST_TO_LAST_POSE
+    assert pose_values(estimate.estimatedPose) == pytest.approx((1, 0, 0.5, 0, 0, 0))
+    assert estimator.lastPose == estimate.estimatedPose
+
+    # Robot poses at y = 0.6 and y = -0.3, the second closest to the last estimate
+    estimate = estimator.update(make_result(3.0, target(-0.6, 0.3)))
+    assert pose_values(estimate.estimatedPose) == pytest.approx((1, -0.3, 0.5, 0, 0, 0))
+
+    # An empty frame gives no estimate and keeps the last pose
+    assert estimator.update(make_result(4.0)) is None
+    assert pose_values(estimator.lastPose) == pytest.approx((1, -0.3, 0.5, 0, 0, 0))
+
+
+def test_average_best_targets():
+    estimator = PhotonPoseEstimator(FIELD, PoseStrategy.AVERAGE_BEST_TARGETS, None, Transform3d())
+    targets = [
+        # Best robot poses at y = 0 and y = 0.6, weighted 3 to 1 by ambiguity
+        PhotonTrackedTarget(fiducialId=1, bestCameraToTarget=camera_to_tag(3, 0, 0.5), altCameraToTarget=camera_to_tag(2, 2, 0), poseAmbiguity=0.1),
+        PhotonTrackedTarget(fiducialId=2, bestCameraToTarget=camera_to_tag(3, 0.4, 0.5), altCameraToTarget=camera_to_tag(2, 2, 0), poseAmbiguity=0.3),
+        # Ambiguity not computed, so left out
+        PhotonTrackedTarget(fiducialId=2, bestCameraToTarget=camera_to_tag(1, -3, 0), poseAmbiguity=-1),
+    ]
+
+    estimate = estimator.update(make_result(1.0, *targets))
+
+    assert estimate.strategy is PoseStrategy.AVERAGE_BEST_TARGETS
+    assert pose_values(estimate.estimatedPose) == pytest.approx((1, 0.15, 0.5, 0, 0, 0))
+
+
+def test_average_best_targets_uses_an_unambiguous_target_alone():
+    estimator = PhotonPoseEstimator(FIELD, PoseStrategy.AVERAGE_BEST_TARGETS, None, Transform3d())
+    targets = [
+        PhotonTrackedTarget(fiducialId=1, bestCameraToTarget=camera_to_tag(3, 0, 0.5), poseAmbiguity=0.1),
+        PhotonTrackedTarget(fiducialId=2, bestCameraToTarget=camera_to_tag(3, 0.4, 0.5), poseAmbiguity=0),
+    ]
+
+    estimate = estimator.update(make_result(1.0, *targets))
+
+    assert pose_values(estimate.estimatedPose) == pytest.approx((1, 0.6, 0.5, 0, 0, 0))
+
+
+def test_average_best_targets_without_ambiguity():
+    estimator = PhotonPoseEstimator(FIELD, PoseStrategy.AVERAGE_BEST_TARGETS, None, Transform3d())
+    targets = [
+        PhotonTrackedTarget(fiducialId=1, bestCameraToTarget=camera_to_tag(3, 0, 0.5), poseAmbiguity=-1),
+        PhotonTrackedTarget(fiducialId=2, bestCameraToTarget=camera_to_tag(3, 0.4, 0.5), poseAmbiguity=-1),
+    ]
+
+    assert estimator.update(make_result(1.0, *targets)) is None
+
+
+def test_new_field_tags_replace_the_cached_tag_poses():
+    estimator = PhotonPoseEstimator(FIELD, PoseStrategy.LOWEST_AMBIGUITY, None, Transform3d())
+    target = PhotonTrackedTarget(fiducialId=1, bestCameraToTarget=camera_to_tag(3, 0, 0.5), altCameraToTarget=camera_to_tag(3, 0, 0.5), poseAmbiguity=0.1)
+    assert pose_values(estimator.update(make_result(1.0, target)).estimatedPose) == pytest.approx((1, 0, 0.5, 0, 0, 0))
+    estimator.primaryStrategy = PoseStrategy.AVERAGE_BEST_TARGETS
+    assert pose_values(estimator.update(make_result(2.0, target)).estimatedPose) == pytest.approx((1, 0, 0.5, 0, 0, 0))
+
+    # Tag 1 moved 1 m further away
+    estimator.fieldTags = AprilTagFieldLayout([make_tag(1, Pose3d(5, 0, 1, Rotation3d()))], 16.5, 8.2)
+
+    assert pose_values(estimator.update(make_result(3.0, target)).estimatedPose) == pytest.approx((2, 0, 0.5, 0, 0, 0))
+    estimator.primaryStrategy = PoseStrategy.LOWEST_AMBIGUITY
+    assert pose_values(estimator.update(make_result(4.0, target)).estimatedPose) == pytest.approx((2, 0, 0.5, 0, 0, 0))
+
+
+def test_new_field_origin_is_used_once_field_tags_are_assigned_again():
+    field = AprilTagFieldLayout([make_tag(1, Pose3d(4, 0, 1, Rotation3d()))], 16.5, 8.2)
+    estimator = PhotonPoseEstimator(field, PoseStrategy.MULTI_TAG_PNP_ON_COPROCESSOR, None, Transform3d())
+    field_to_camera = Transform3d(Translation3d(1, 0.5, 1), Rotation3d(0, 0, 0.25))
+
+    def estimate(timestamp):
+        result = make_result(timestamp, PhotonTrackedTarget(fiducialId=1, poseAmbiguity=0.1))
+        result.multiTagResult = MultiTargetPNPResult(PNPResult(True, field_to_camera), [1])
+        return pose_values(estimator.update(result).estimatedPose)
+
+    assert estimate(1.0) == pytest.approx((1, 0.5, 1, 0, 0, 0.25))
+
+    # Measured from the far corner of the field, facing back
+    field.setOrigin(Pose3d(16.5, 8.2, 0, Rotation3d(0, 0, pi)))
+    estimator.fieldTags = field
+
+    assert estimate(2.0) == pytest.approx((15.5, 7.7, 1, 0, 0, 0.25 - pi))
+
+
+def test_new_robot_to_camera_replaces_the_cached_inverse():
+    estimator = PhotonPoseEstimator(FIELD, PoseStrategy.LOWEST_AMBIGUITY, None, Transform3d())
+    target = PhotonTrackedTarget(fiducialId=1, bestCameraToTarget=camera_to_tag(3, 0, 0.5), altCameraToTarget=camera_to_tag(3, 0, 0.5), poseAmbiguity=0.1)
+    assert pose_values(estimator.update(make_result(1.0, target)).estimatedPose) == pytest.approx((1, 0, 0.5, 0, 0, 0))
+    estimator.primaryStrategy = PoseStrategy.AVERAGE_BEST_TARGETS
+    assert pose_values(estimator.update(make_result(2.0, target)).estimatedPose) == pytest.approx((1, 0, 0.5, 0, 0, 0))
+
+    # Camera mounted 0.5 m ahead of the center of the robot and 0.5 m up
+    estimator.robotToCamera = Transform3d(Translation3d(0.5, 0, 0.5), Rotation3d())
+
+    assert pose_values(estimator.update(make_result(3.0, target)).estimatedPose) == pytest.approx((0.5, 0, 0, 0, 0, 0))
+    estimator.primaryStrategy = PoseStrategy.LOWEST_AMBIGUITY
+    assert pose_values(estimator.update(make_result(4.0, target)).estimatedPose) == pytest.approx((0.5, 0, 0, 0, 0, 0))
@@ -0,0 +1,120 @@
+'''
+    Tests for converting NetworkTables server timestamps into FPGA time, fed
+    with synthetic timestamp streams of known offset, drift and transit time.
+'''
+
+import random
+
+import pytest
+
+from photonlibpy.ntTimeBase import NTTimeBase
+
+OFFSET_MICROS = 5_000_000
+DRIFT_PPM = 50.0
+MIN_TRANSIT_MICROS = 1000
+START_MICROS = 1_000_000
+PERIOD_MICROS = 20_000
+
+
+def true_offset(server_time):
+    return OFFSET_MICROS + DRIFT_PPM * 1e-6 * (server_time - START_MICROS)
+
+
+def feed(time_base, count=100, seed=0):
+    '''Feed frames every 20 ms. Every tenth arrives after the minimum transit time,
+    the rest up to 3 ms later than that.'''
+    rng = random.Random(seed)
+    server_time = START_MICROS
+    for i in range(count):
+        server_time = START_MICROS + i * PERIOD_MICROS
+        jitter = 0 if i % 10 == 0 else rng.randint(1, 3000)
+        local_time = server_time + true_offset(server_time) + MIN_TRANSIT_MICROS + jitter
+        time_base.addSample(server_time, round(local_time))
+    return server_time
+
+
+def test_follows_offset_and_drift_through_jitter():
+    time_base = NTTimeBase()
+    newest = feed(time_base)
+
+    assert time_base.getSampleCount() == 100
+    # The offset includes the minimum transit time, but none of the jitter
+    assert time_base.getOffsetSeconds() == pytest.approx(
+        (true_offset(newest) + MIN_TRANSIT_MICROS) * 1e-6, abs=5e-6
+    )
+    assert time_base.getDriftPpm() == pytest.approx(DRIFT_PPM, abs=3.0)
+
+    # Drift carries the conversion past the newest sample
+    later = newest + 1_000_000
+    assert time_base.toFpgaSeconds(later) == pytest.approx(
+        (later + true_offset(later) + MIN_TRANSIT_MICROS) * 1e-6, abs=10e-6
+    )
+
+
+def test_server_times_are_used_unchanged_on_the_server():
+    time_base = NTTimeBase()
+    time_base.setLocalIsServer(True)
+    server_time = START_MICROS
+    # The server's clock is the FPGA clock, so values only arrive late by transit
+    for i in range(20):
+        server_time = START_MICROS + i * PERIOD_MICROS
+        time_base.addSample(server_time, server_time + MIN_TRANSIT_MICROS + 100 * i)
+
+    assert time_base.toFpgaSeconds(server_time) == server_time * 1e-6
+    assert time_base.getOffsetSeconds() == 0.0
+
+
+def test_transit_is_taken_out_with_the_ntcore_offset():
+    time_base = NTTimeBase()
+    newest = feed(time_base)
+    # ntcore measures server - local from the round trip of its pings
+    time_base.setServerTimeOffset(-round(true_offset(newest)))
+
+    assert time_base.getTransitSeconds() == pytest.approx(MIN_TRANSIT_MICROS * 1e-6, abs=5e-6)
+    assert time_base.getOffsetSeconds() == pytest.approx(true_offset(newest) * 1e-6, abs=5e-6)
+    later = newest + 1_000_000
+    assert time_base.toFpgaSeconds(later) == pytest.approx(
+        (later + true_offset(later)) * 1e-6, abs=10e-6
+    )
+
+
+def test_only_the_most_recent_samples_are_used():
+    time_base = NTTimeBase(windowSize=20)
+    newest = feed(time_base)
+
+    assert time_base.getSampleCount() == 20
+    assert time_base.getOffsetSeconds() == pytest.approx(
+        (true_offset(newest) + MIN_TRANSIT_MICROS) * 1e-6, abs=5e-6
+    )
+
+
+def test_ignores_duplicate_and_old_samples():
+    time_base = NTTimeBase()
+    newest = feed(time_base)
+    offset = time_base.getOffsetSeconds()
+    drift = time_base.getDriftPpm()
+
+    # The same value reported again, and a value older than the newest one
+    time_base.addSample(newest, newest - 10_000_000)
+    time_base.addSample(newest - PERIOD_MICROS // 2, newest - 10_000_000)
+
+    assert time_base.getSampleCount() == 100
+    assert time_base.getOffsetSeconds() == offset
+    assert time_base.getDriftPpm() == drift
+
+
+def test_reset_forgets_every_sample():
+    time_base = NTTimeBase()
+    feed(time_base)
+
+    time_base.reset()
+
+    assert time_base.getSampleCount() == 0
+    assert time_base.getOffsetSeconds() == 0.0
+    assert time_base.getDriftPpm() == 0.0
+    assert time_base.toFpgaSeconds(START_MICROS) == START_MICROS * 1e-6
+
+    # Samples from before the reset are accepted again
+    time_base.addSample(START_MICROS, START_MICROS + 2000)
+    assert time_base.getSampleCount() == 1
+    assert time_base.getOffsetSeconds() == pytest.approx(2000e-6)
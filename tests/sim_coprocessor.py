@@ -0,0 +1,187 @@
+'''
+    Test fixture that publishes synthetic PhotonVision frames in place of a coprocessor.
+'''
+
+import random
+import threading
+import time
+
+import ntcore
+from wpimath.geometry import Rotation3d, Transform3d, Translation3d
+
+from photonlibpy.multiTargetPNPResult import MultiTargetPNPResult, PNPResult
+from photonlibpy.packet import Packet
+from photonlibpy.photonCamera import PHOTONVISION_VERSION
+from photonlibpy.photonPipelineResult import PhotonPipelineResult
+from photonlibpy.photonTrackedTarget import PhotonTrackedTarget, TargetCorner
+
+
+class SimCoprocessor:
+    """
+    Stand-in for a PhotonVision coprocessor that publishes synthetic frames.
+
+    Frames are published to the same NetworkTables topics a real coprocessor uses, so a
+    PhotonCamera with the same name on the same instance decodes them as usual. Use it to
+    exercise PhotonCamera, Vision and PhotonPoseEstimator at realistic frame rates
+    without hardware.
+    """
+
+    def __init__(
+        self,
+        cameraName: str,
+        instance: ntcore.NetworkTableInstance | None = None,
+        frameRate: float = 30.0,
+        targetCount: int = 2,
+        detectedCornerCount: int = 4,
+        multiTag: bool = True,
+        latencyMillis: float = 20.0,
+        seed: int | None = None,
+        cameraMatrix: list[float] | None = None,
+        distCoeffs: list[float] | None = None,
+    ):
+        """
+        :param cameraName: Name of the camera to publish as.
+        :param instance: NetworkTables instance to publish on. Defaults to the default instance.
+        :param frameRate: Frames per second published by :meth:`start`.
+        :param targetCount: Number of targets in each frame.
+        :param detectedCornerCount: Number of detected corners on each target.
+        :param multiTag: Whether frames carry a multi-tag PnP result.
+        :param latencyMillis: Pipeline latency reported with each frame.
+        :param seed: Seed for the generated targets, for repeatable frames.
+        :param cameraMatrix: Row-major 3x3 intrinsic matrix to publish as the camera's
+                             calibration. Defaults to a 1280x800 camera with a 70
+                             degree horizontal field of view.
+        :param distCoeffs: Distortion coefficients to publish. Defaults to none.
+        """
+        if instance is None:
+            instance = ntcore.NetworkTableInstance.getDefault()
+
+        self.frameRate = frameRate
+        self.targetCount = targetCount
+        self.detectedCornerCount = detectedCornerCount
+        self.multiTag = multiTag
+        self.latencyMillis = latencyMillis
+        self._random = random.Random(seed)
+
+        photonvisionRootTable = instance.getTable("photonvision")
+        cameraTable = photonvisionRootTable.getSubTable(cameraName)
+        self._rawBytesPublisher = cameraTable.getRawTopic("rawBytes").publish(
+            "rawBytes", ntcore.PubSubOptions(sendAll=True, keepDuplicates=True)
+        )
+        self._heartbeatPublisher = cameraTable.getIntegerTopic("heartbeat").publish()
+        self._versionPublisher = photonvisionRootTable.getStringTopic(
+            "version"
+        ).publish()
+        self._versionPublisher.set(PHOTONVISION_VERSION)
+        self._cameraIntrinsicsPublisher = cameraTable.getDoubleArrayTopic(
+            "cameraIntrinsics"
+        ).publish()
+        self._cameraIntrinsicsPublisher.set(
+            cameraMatrix or [914.0, 0.0, 640.0, 0.0, 914.0, 400.0, 0.0, 0.0, 1.0]
+        )
+        self._cameraDistortionPublisher = cameraTable.getDoubleArrayTopic(
+            "cameraDistortion"
+        ).publish()
+        self._cameraDistortionPublisher.set(distCoeffs or [0.0] * 5)
+
+        self._heartbeat = 0
+        self._framesPublished = 0
+        self._thread: threading.Thread | None = None
+        self._stopEvent = threading.Event()
+
+    def makeResult(self) -> PhotonPipelineResult:
+        """Generate one synthetic frame with the configured shape."""
+        targets = [self._makeTarget() for _ in range(self.targetCount)]
+
+        multiTagResult = MultiTargetPNPResult()
+        if self.multiTag and len(targets) > 1:
+            multiTagResult = MultiTargetPNPResult(
+                PNPResult(
+                    True,
+                    self._makeTransform(),
+                    self._makeTransform(),
+                    self._random.uniform(0.0, 0.2),
+                    self._random.uniform(0.0, 2.0),
+                    self._random.uniform(0.0, 2.0),
+                ),
+                [target.fiducialId for target in targets][: MultiTargetPNPResult._MAX_IDS],
+            )
+
+        return PhotonPipelineResult(self.latencyMillis, -1.0, targets, multiTagResult)
+
+    def publishFrame(self, result: PhotonPipelineResult | None = None) -> None:
+        """
+        Publish one frame and bump the heartbeat.
+
+        :param result: Frame to publish. Defaults to a newly generated one.
+        """
+        if result is None:
+            result = self.makeResult()
+        self._rawBytesPublisher.set(bytes(result.populatePacket(Packet()).getData()))
+        self._heartbeat += 1
+        self._heartbeatPublisher.set(self._heartbeat)
+        self._framesPublished += 1
+
+    def getFramesPublished(self) -> int:
+        return self._framesPublished
+
+    def start(self) -> None:
+        """Publish frames at the configured frame rate on a background thread."""
+        if self._thread is not None:
+            return
+        self._stopEvent.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="SimCoprocessor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop publishing frames and wait for the background thread to finish."""
+        if self._thread is None:
+            return
+        self._stopEvent.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        period = 1.0 / self.frameRate
+        nextFrame = time.monotonic()
+        while not self._stopEvent.is_set():
+            self.publishFrame()
+            nextFrame += period
+            self._stopEvent.wait(max(0.0, nextFrame - time.monotonic()))
+
+    def _makeTransform(self) -> Transform3d:
+        return Transform3d(
+            Translation3d(
+                self._random.uniform(1.0, 6.0),
+                self._random.uniform(-2.0, 2.0),
+                self._random.uniform(-0.5, 1.5),
+            ),
+            Rotation3d(
+                self._random.uniform(-0.2, 0.2),
+                self._random.uniform(-0.2, 0.2),
+                self._random.uniform(-3.14, 3.14),
+            ),
+        )
+
+    def _makeCorner(self) -> TargetCorner:
+        return TargetCorner(
+            self._random.uniform(0.0, 1280.0), self._random.uniform(0.0, 800.0)
+        )
+
+    def _makeTarget(self) -> PhotonTrackedTarget:
+        return PhotonTrackedTarget(
+            yaw=self._random.uniform(-35.0, 35.0),
+            pitch=self._random.uniform(-20.0, 20.0),
+            area=self._random.uniform(0.1, 5.0),
+            skew=self._random.uniform(-5.0, 5.0),
+            fiducialId=self._random.randint(1, 16),
+            bestCameraToTarget=self._makeTransform(),
+            altCameraToTarget=self._makeTransform(),
+            minAreaRectCorners=[self._makeCorner() for _ in range(4)],
+            detectedCorners=[
+                self._makeCorner() for _ in range(self.detectedCornerCount)
+            ],
+            poseAmbiguity=self._random.uniform(0.0, 0.5),
+        )
@@ -0,0 +1,19 @@
+'''
+    Tests for the startup profiler.
+'''
+
+from subsystems.startup_profiler import StartupProfiler
+
+
+def test_records_imports_and_construction():
+    profiler = StartupProfiler(False)
+
+    with profiler.measure('import json'):
+        import json
+    with profiler.measure('Construct'):
+        json.dumps({})
+
+    assert [name for name, _ in profiler.records] == ['import json', 'Construct']
+    assert all(seconds >= 0 for _, seconds in profiler.records)
+    report = profiler.report()
+    assert 'import json' in report and 'Total' in report
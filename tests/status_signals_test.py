@@ -0,0 +1,29 @@
+'''
+    Tests for the batched status signal refresh, using simulated Phoenix 6 devices
+    on the same CAN buses as the Swerve Modules.
+'''
+
+import phoenix6
+
+from subsystems.status_signals import StatusSignalRegistry
+
+
+def test_refreshes_signals_on_every_can_bus():
+    talonfx = phoenix6.hardware.TalonFX(60, "CANivore")
+    cancoder = phoenix6.hardware.CANcoder(61, "rio")
+    odometry_signals = (talonfx.get_position(), talonfx.get_velocity())
+    steering_offset_signals = (cancoder.get_absolute_position(),)
+    registry = StatusSignalRegistry()
+    registry.register("odometry", talonfx.network, odometry_signals, 250)
+    registry.register("steering_offset", cancoder.network, steering_offset_signals, 10)
+
+    # Give the simulated devices time to start sending.
+    for signals in (odometry_signals, steering_offset_signals):
+        phoenix6.BaseStatusSignal.wait_for_all(1.0, *signals)
+
+    # A single refresh across both buses would fail with an invalid network.
+    assert registry.refresh()
+    assert registry.statuses == {"CANivore": phoenix6.StatusCode.OK, "rio": phoenix6.StatusCode.OK}
+
+    assert registry.refresh(("steering_offset",))
+    assert [bus for bus, _ in registry.refresh_lists[("steering_offset",)]] == ["rio"]
@@ -0,0 +1,111 @@
+'''
+    Checks the vectorized swerve kinematics against WPILib's kinematics and
+    module state optimization, which SwerveDrive.move_robot used before, and
+    times both. Run with ``-s`` to see the timing report.
+'''
+
+import math
+import random
+import time
+
+import numpy as np
+import pytest
+from wpimath.geometry import Rotation2d, Translation2d
+from wpimath.kinematics import ChassisSpeeds, SwerveDrive4Kinematics, SwerveModuleState
+
+from subsystems.swerve_kinematics import SwerveKinematics
+
+MODULE_LOCATIONS = (
+    Translation2d(0.250825, 0.250825),
+    Translation2d(0.250825, -0.250825),
+    Translation2d(-0.250825, 0.250825),
+    Translation2d(-0.250825, -0.250825),
+)
+MAX_MODULE_SPEED = 5.21208
+MAX_ROTATION_SPEED = 14.6934998988
+
+# Per-call budget for the vectorized pass, in microseconds, with plenty of
+# headroom for slower machines
+CALCULATE_BUDGET_US = 100.0
+CALLS = 2000
+
+
+def random_inputs(rng, count):
+    '''Joystick inputs and robot angles, with stops and full-speed moves mixed in.'''
+    inputs = []
+    for _ in range(count):
+        choice = rng.random()
+        if choice < 0.1:
+            forward, strafe, rotation = 0.0, 0.0, 0.0
+        elif choice < 0.2:
+            forward, strafe, rotation = rng.choice((-1.0, 1.0)), rng.choice((-1.0, 1.0)), rng.choice((-1.0, 1.0))
+        else:
+            forward, strafe, rotation = rng.uniform(-1, 1), rng.uniform(-1, 1), rng.uniform(-1, 1)
+        inputs.append((forward, strafe, rotation, rng.uniform(-180, 180)))
+    return inputs
+
+
+class ReferenceDrive():
+    '''The module commands move_robot sent using wpimath objects.'''
+
+    def __init__(self):
+        self.kinematics = SwerveDrive4Kinematics(*MODULE_LOCATIONS)
+        self.current_angles = [Rotation2d.fromDegrees(0)] * 4
+
+    def move(self, forward, strafe, rotation, robot_angle):
+        robot_speeds = ChassisSpeeds.fromFieldRelativeSpeeds(forward * MAX_MODULE_SPEED, strafe * MAX_MODULE_SPEED, rotation * MAX_ROTATION_SPEED, Rotation2d.fromDegrees(robot_angle))
+        states = self.kinematics.desaturateWheelSpeeds(self.kinematics.toSwerveModuleStates(robot_speeds), MAX_MODULE_SPEED)
+        commands = []
+        for index, state in enumerate(states):
+            state = SwerveModuleState.optimize(state, self.current_angles[index])
+            self.current_angles[index] = state.angle
+            commands.append((state.speed, state.angle.degrees()))
+        return commands
+
+
+class VectorizedDrive():
+    '''The module commands move_robot sends now.'''
+
+    def __init__(self):
+        self.kinematics = SwerveKinematics(MODULE_LOCATIONS, MAX_MODULE_SPEED)
+        self.current_angles = np.zeros(4)
+        self.module_angles = np.zeros(4)
+
+    def move(self, forward, strafe, rotation, robot_angle):
+        np.radians(self.current_angles, out=self.module_angles)
+        speeds, angles = self.kinematics.calculate(forward * MAX_MODULE_SPEED, strafe * MAX_MODULE_SPEED, rotation * MAX_ROTATION_SPEED, math.radians(robot_angle), self.module_angles)
+        np.degrees(angles, out=self.current_angles)
+        return list(zip(speeds.tolist(), self.current_angles.tolist()))
+
+
+def test_matches_wpilib():
+    rng = random.Random(5096)
+    reference = ReferenceDrive()
+    vectorized = VectorizedDrive()
+    for inputs in random_inputs(rng, 5000):
+        for (expected_speed, expected_angle), (speed, angle) in zip(reference.move(*inputs), vectorized.move(*inputs)):
+            assert speed == pytest.approx(expected_speed, abs=1e-9)
+            # Compare the steering setpoints SwerveModule.set computes from the angles
+            angle_error = ((-angle + 360) % 360) - ((-expected_angle + 360) % 360)
+            assert min(abs(angle_error), 360 - abs(angle_error)) < 1e-7
+
+
+def test_keeps_headings_when_stopped():
+    vectorized = VectorizedDrive()
+    vectorized.move(0, 1, 0, 0)
+    for speed, angle in vectorized.move(0, 0, 0, 0):
+        assert speed == 0
+        assert angle == pytest.approx(90)
+
+
+def test_calculate_speed():
+    inputs = random_inputs(random.Random(2024), CALLS)
+    timings = {}
+    for name, drive in (('wpimath', ReferenceDrive()), ('vectorized', VectorizedDrive())):
+        start = time.perf_counter()
+        for forward, strafe, rotation, robot_angle in inputs:
+            drive.move(forward, strafe, rotation, robot_angle)
+        timings[name] = (time.perf_counter() - start) / CALLS * 1e6
+        print(f'{name:<12} {timings[name]:7.1f} us/call')
+
+    assert timings['vectorized'] <= CALCULATE_BUDGET_US
@@ -0,0 +1,53 @@
+'''
+    Tests for the change-only, rate-limited telemetry publisher.
+'''
+
+import ntcore
+
+from subsystems.telemetry import Telemetry, TelemetryTopic
+
+
+class RecordingPublisher():
+    def __init__(self):
+        self.values = []
+
+    def set(self, value):
+        self.values.append(value)
+
+
+def test_publishes_only_changes_no_faster_than_period():
+    publisher = RecordingPublisher()
+    topic = TelemetryTopic(publisher, 0.0, 0.1)
+
+    assert not topic.publish(1.0)
+    topic.set(1.0)
+    assert topic.publish(1.0)
+    topic.set(2.0)
+    assert not topic.publish(1.05)
+    topic.set(3.0)
+    assert topic.publish(1.1)
+    assert not topic.publish(1.3)
+
+    # The default is published on creation
+    assert publisher.values == [0.0, 1.0, 3.0]
+
+
+def test_publish_reports_its_cost():
+    telemetry = Telemetry(table='TelemetryTest')
+    topic = telemetry.add_double('Value')
+    topic.set(1.0)
+
+    assert telemetry.publish() == 1
+    assert telemetry.publish_seconds > 0
+    assert telemetry.publish_time_topic is not None
+
+
+def test_widget_with_int_default_is_a_double():
+    telemetry = Telemetry(table='TelemetryTest')
+    topic = telemetry.add_widget('TelemetryTest', 'Count', 0)
+    topic.set(2.5)
+    topic.publish(1.0)
+
+    entry = ntcore.NetworkTableInstance.getDefault().getEntry('/Shuffleboard/TelemetryTest/Count')
+    assert entry.getType() == ntcore.NetworkTableType.kDouble
+    assert entry.getDouble(0) == 2.5